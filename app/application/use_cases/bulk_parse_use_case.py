@@ -0,0 +1,55 @@
+# application/use_cases/bulk_parse_use_case.py
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from app.domain.entities import ParseConfiguration
+from app.domain.services.parse_service import ParseService
+
+logger = logging.getLogger(__name__)
+
+ChunkResult = List[Tuple[Optional[List[Dict[str, str]]], Optional[str], Dict[str, Any]]]
+
+class BulkParseUseCase:
+    def __init__(self, parse_service: ParseService,
+                 parse_chunks: Optional[Callable[[List[List[str]], ParseConfiguration], Iterator[ChunkResult]]] = None,
+                 chunk_size: int = 256):
+        self.parse_service = parse_service
+        # Parses the chunks elsewhere (e.g. a process pool) and yields their results in order.
+        # Without it, or for a single chunk, everything is parsed in this process.
+        self.parse_chunks = parse_chunks
+        self.chunk_size = max(1, chunk_size)
+        logger.info("BulkParseUseCase initialized")
+
+    def execute(self, responses: List[str], config: ParseConfiguration) -> List[Dict[str, Any]]:
+        return list(self.execute_stream(responses, config))
+
+    def execute_stream(self, responses: List[str], config: ParseConfiguration,
+                       cancel_event: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        # Compiled eagerly so an invalid configuration fails before any result is produced.
+        self.parse_service.plan_cache.get_or_compile(config)
+        logger.info(f"Parsing {len(responses)} responses in chunks of {self.chunk_size}")
+        return self._stream(responses, config, cancel_event)
+
+    def _stream(self, responses: List[str], config: ParseConfiguration,
+                cancel_event: Optional[threading.Event]) -> Iterator[Dict[str, Any]]:
+        chunks = [responses[i:i + self.chunk_size] for i in range(0, len(responses), self.chunk_size)]
+        if self.parse_chunks is None or len(chunks) <= 1:
+            chunk_results = (self.parse_service.parse_many(chunk, config) for chunk in chunks)
+        else:
+            chunk_results = self.parse_chunks(chunks, config)
+
+        index = 0
+        try:
+            for results in chunk_results:
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info("Bulk parse cancelled")
+                    return
+                for entries, error, stats in results:
+                    event = {"index": index, "entries": entries} if error is None else {"index": index, "error": error}
+                    event["parse_stats"] = stats
+                    yield event
+                    index += 1
+        finally:
+            close = getattr(chunk_results, "close", None)
+            if callable(close):
+                close()
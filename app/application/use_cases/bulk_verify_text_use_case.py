@@ -0,0 +1,129 @@
+# application/use_cases/bulk_verify_text_use_case.py
+import logging
+from concurrent.futures import Executor
+from app.domain.entities import ParsedResult, VerificationProcess, VerificationMethodType
+from app.domain.services.verifier_service import VerifierService
+from app.domain.services.verification_planner import VerificationPlanner
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def _text_to_check(result: ParsedResult) -> Optional[str]:
+    # Same selection as VerifyTextUseCase: first value of the first entry.
+    if not result.entries or not result.entries[0].data:
+        return None
+    return next(iter(result.entries[0].data.values()))
+
+class BulkVerifyTextUseCase:
+    def __init__(self, verifier_service: VerifierService,
+                 similarity_matrix: Callable[[List[str], List[str]], np.ndarray],
+                 generate_responses: Callable[[str, str, int, int], List[str]],
+                 score_continuations: Optional[Callable[[str, str, List[str]], List[float]]] = None,
+                 count_tokens: Optional[Callable[[str], int]] = None,
+                 planner: Optional[VerificationPlanner] = None,
+                 executor: Optional[Executor] = None):
+        self.verifier_service = verifier_service
+        self.similarity_matrix = similarity_matrix
+        self.generate_responses = generate_responses
+        self.score_continuations = score_continuations
+        self.count_tokens = count_tokens
+        self.planner = planner or VerificationPlanner()
+        self.executor = executor
+        logger.info("BulkVerifyTextUseCase initialized")
+
+    def execute(self, results: List[ParsedResult], process: VerificationProcess) -> List[ParsedResult]:
+        logger.info(f"Verifying {len(results)} results with process: {process}")
+        eliminatorios, acumulativos = self.planner.plan(process)
+        positions = {id(m): i for i, m in enumerate(process.methods)}
+        outcomes: List[Dict[int, bool]] = [{} for _ in results]
+        acumulativos_superados = [0] * len(results)
+        # Indices of results whose status is not decided yet.
+        active = list(range(len(results)))
+
+        for method in eliminatorios:
+            if not active:
+                break
+            passed = self._run_method(method, [results[i] for i in active])
+            still_active = []
+            for i, ok in zip(active, passed):
+                outcomes[i][positions[id(method)]] = ok
+                if ok:
+                    still_active.append(i)
+                else:
+                    results[i].final_status = "descartada"
+            logger.debug(f"Method {method.name}: {sum(passed)}/{len(passed)} passed, {len(still_active)} candidates remain")
+            active = still_active
+
+        pending = len(acumulativos)
+        active = self._finalize_decided(results, process, active, acumulativos_superados, pending)
+        for method in acumulativos:
+            if not active:
+                break
+            passed = self._run_method(method, [results[i] for i in active])
+            for i, ok in zip(active, passed):
+                outcomes[i][positions[id(method)]] = ok
+                acumulativos_superados[i] += ok
+            pending -= 1
+            logger.debug(f"Method {method.name}: {sum(passed)}/{len(passed)} passed")
+            active = self._finalize_decided(results, process, active, acumulativos_superados, pending)
+
+        for result, result_outcomes in zip(results, outcomes):
+            # Methods are reported in process order, as in VerifyTextUseCase
+            for position, method in enumerate(process.methods):
+                if position not in result_outcomes:
+                    result.verification_methods_skipped.append(method.name)
+                else:
+                    target = result.verification_methods_passed if result_outcomes[position] else result.verification_methods_failed
+                    target.append(method.name)
+
+        logger.info(f"Bulk verification finished: {sum(1 for r in results if r.final_status == 'confirmada')} confirmed "
+                    f"out of {len(results)}")
+        return results
+
+    def _finalize_decided(self, results: List[ParsedResult], process: VerificationProcess, active: List[int],
+                          acumulativos_superados: List[int], pending: int) -> List[int]:
+        # Candidates whose status can no longer change skip the remaining acumulativo methods.
+        still_active = []
+        for i in active:
+            if self.planner.outcome_decided(acumulativos_superados[i], pending, process):
+                results[i].final_status = self.verifier_service.resolve_final_status(acumulativos_superados[i], process)
+            else:
+                still_active.append(i)
+        return still_active
+
+    def _run_method(self, method, candidates: List[ParsedResult]) -> List[bool]:
+        if method.method_type == VerificationMethodType.EMBEDDING:
+            passed = [False] * len(candidates)
+            texts: Dict[int, str] = {}
+            for i, candidate in enumerate(candidates):
+                text = _text_to_check(candidate)
+                if text is None:
+                    logger.warning("No entries or data found in result")
+                else:
+                    texts[i] = text
+            # One vectorized similarity pass over every candidate that has text to check.
+            batch_passed = self.verifier_service.verify_embedding_method_batch(
+                method, self.similarity_matrix, list(texts.values())
+            )
+            for i, ok in zip(texts.keys(), batch_passed):
+                passed[i] = ok
+            return passed
+
+        elif method.method_type == VerificationMethodType.CONSENSUS:
+            # Candidates are verified concurrently when an executor is available, which lets the
+            # LLM adapter batch their generate calls together.
+            if self.executor is None:
+                return [self._run_consensus(method, candidate) for candidate in candidates]
+            return list(self.executor.map(lambda candidate: self._run_consensus(method, candidate), candidates))
+
+        return [False] * len(candidates)
+
+    def _run_consensus(self, method, candidate: ParsedResult) -> bool:
+        stats = {}
+        passed = self.verifier_service.verify_consensus_method(
+            method, self.generate_responses, candidate.entries, self.score_continuations, self.count_tokens, stats
+        )
+        if stats:
+            candidate.verification_stats[method.name] = stats
+        return passed
@@ -1,7 +1,11 @@
 # application/use_cases/generate_text_use_case.py
 import logging
-from typing import List, Dict
+import threading
+from typing import Any, Iterator, List, Dict, Optional, Tuple
 from app.domain.entities import GeneratedResult
+from app.domain.services.deduplicator import SemanticDeduplicator
+from app.domain.services.execution_planner import ExecutionPlanner
+from app.domain.services.prompt_template import PromptTemplate
 from app.domain.ports.llm_port import LLMPort
 import re
 
@@ -23,16 +27,145 @@ def validate_and_replace_placeholders(prompt: str, data: Dict[str, str]) -> str:
     return prompt
 
 class GenerateTextUseCase:
-    def __init__(self, llm: LLMPort):
+    def __init__(self, llm: LLMPort, planner: Optional[ExecutionPlanner] = None,
+                 deduplicator: Optional[SemanticDeduplicator] = None):
         self.llm = llm
+        self.planner = planner or ExecutionPlanner()
+        self.deduplicator = deduplicator
         logger.info("GenerateTextUseCase initialized")
 
     def execute(self, system_prompt: str, user_prompt: str, num_return_sequences: int, max_new_tokens: int,
-                num_executions: int, reference_data: Dict[str, str]) -> List[GeneratedResult]:
+                num_executions: int, reference_data: Dict[str, str], deduplicate: bool = False) -> List[GeneratedResult]:
         logger.info(f"Executing text generation with system_prompt: {system_prompt}, user_prompt: {user_prompt}, "
                     f"num_return_sequences: {num_return_sequences}, max_new_tokens: {max_new_tokens}, "
                     f"num_executions: {num_executions}, reference_data: {reference_data}")
 
+        if deduplicate and self.deduplicator is None:
+            raise ValueError("Deduplication requested but no deduplicator configured")
+        system_prompt, user_prompt = self._prepare_prompts(system_prompt, user_prompt, num_return_sequences,
+                                                           max_new_tokens, num_executions, reference_data)
+
+        # Every execution uses the same prompt, so the samples are merged into as few generate
+        # calls as the planner allows. Results keep the flat execution-major order of before.
+        results = []
+        for num_sequences in self.planner.plan(num_executions, num_return_sequences, max_new_tokens):
+            # Wrap in try-except when calling the LLM
+            try:
+                responses = self.llm.generate(system_prompt, user_prompt, num_sequences, max_new_tokens)
+                for resp in responses:
+                    results.append(GeneratedResult(resp))
+            except Exception as e:
+                logger.exception(f"Error generating text: {str(e)}")
+                raise RuntimeError(f"Error generating text: {str(e)}")
+
+        logger.info(f"Generated {len(results)} results")
+        return self.deduplicate(results) if deduplicate else results
+
+    def deduplicate(self, results: List[GeneratedResult]) -> List[GeneratedResult]:
+        # Keeps the first result of every cluster of near-identical responses, with its cluster size.
+        try:
+            dedup = self.deduplicator.deduplicate([r.response for r in results])
+        except Exception as e:
+            logger.exception(f"Error deduplicating results: {str(e)}")
+            raise RuntimeError(f"Error deduplicating results: {str(e)}")
+        kept = []
+        for cluster, index in enumerate(dedup.representatives):
+            results[index].cluster_size = dedup.cluster_sizes[cluster]
+            kept.append(results[index])
+        logger.info(f"Kept {len(kept)} of {len(results)} results after deduplication")
+        return kept
+
+    def plan(self, system_prompt: str, user_prompt: str, num_return_sequences: int, max_new_tokens: int,
+             num_executions: int, reference_data: Dict[str, str]) -> List[int]:
+        # Sequences per generate call that execute() would use, after the same validation.
+        self._prepare_prompts(system_prompt, user_prompt, num_return_sequences, max_new_tokens, num_executions, reference_data)
+        return self.planner.plan(num_executions, num_return_sequences, max_new_tokens)
+
+    def execute_stream(self, system_prompt: str, user_prompt: str, num_return_sequences: int, max_new_tokens: int,
+                       num_executions: int, reference_data: Dict[str, str],
+                       cancel_event: Optional[threading.Event] = None,
+                       sequences_per_call: int = 1) -> Iterator[Dict[str, Any]]:
+        # Validation runs eagerly so callers can reject the request before streaming starts.
+        logger.info(f"Executing streamed text generation with system_prompt: {system_prompt}, user_prompt: {user_prompt}, "
+                    f"num_return_sequences: {num_return_sequences}, max_new_tokens: {max_new_tokens}, "
+                    f"num_executions: {num_executions}, reference_data: {reference_data}")
+        system_prompt, user_prompt = self._prepare_prompts(system_prompt, user_prompt, num_return_sequences,
+                                                           max_new_tokens, num_executions, reference_data)
+        # One sequence per generate call by default: only single-sequence calls stream their text token by
+        # token, and each response is emitted as soon as it is decoded. Larger calls batch better, but their
+        # responses all arrive together when the call finishes.
+        plan = self.planner.plan(num_executions, num_return_sequences, max_new_tokens, sequences_per_call)
+        return self._stream(system_prompt, user_prompt, num_return_sequences, max_new_tokens, plan, cancel_event)
+
+    def _stream(self, system_prompt: str, user_prompt: str, num_return_sequences: int, max_new_tokens: int,
+                plan: List[int], cancel_event: Optional[threading.Event]) -> Iterator[Dict[str, Any]]:
+        # Events carry the execution and sequence index the result would have in execute().
+        offset = 0
+        for num_sequences in plan:
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info("Streamed generation cancelled")
+                return
+            try:
+                for event in self.llm.generate_stream(system_prompt, user_prompt, num_sequences, max_new_tokens, cancel_event):
+                    position = offset + event.pop("sequence")
+                    event["execution"] = position // num_return_sequences
+                    event["sequence"] = position % num_return_sequences
+                    yield event
+            except Exception as e:
+                logger.exception(f"Error generating text: {str(e)}")
+                raise RuntimeError(f"Error generating text: {str(e)}")
+            offset += num_sequences
+
+    def execute_dataset_stream(self, system_prompt: str, user_prompt: str, num_return_sequences: int, max_new_tokens: int,
+                               rows: List[Dict[str, str]], cancel_event: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        # Generates for every row of reference data. The templates are compiled once and every row is
+        # rendered (and validated) eagerly, so a bad row rejects the request before streaming starts.
+        logger.info(f"Executing dataset generation over {len(rows)} rows with system_prompt: {system_prompt}, "
+                    f"user_prompt: {user_prompt}, num_return_sequences: {num_return_sequences}, max_new_tokens: {max_new_tokens}")
+        if num_return_sequences <= 0 or max_new_tokens <= 0:
+            logger.error("num_return_sequences and max_new_tokens must be greater than 0")
+            raise ValueError("num_return_sequences and max_new_tokens must be greater than 0")
+        system_template, user_template = PromptTemplate(system_prompt), PromptTemplate(user_prompt)
+        prompts = []
+        for i, row in enumerate(rows):
+            try:
+                prompts.append((system_template.render(row), user_template.render(row)))
+            except ValueError as e:
+                logger.error(f"Row {i}: {str(e)}")
+                raise ValueError(f"Row {i}: {str(e)}")
+        return self._stream_dataset(prompts, num_return_sequences, max_new_tokens, cancel_event)
+
+    def _stream_dataset(self, prompts: List[Tuple[str, str]], num_return_sequences: int, max_new_tokens: int,
+                        cancel_event: Optional[threading.Event]) -> Iterator[Dict[str, Any]]:
+        # Events are {"row": i, "sequence": s, "response": "..."}, in generation order (longest prompts first).
+        try:
+            lengths = [self.llm.count_tokens(s) + self.llm.count_tokens(u) for s, u in prompts]
+            if num_return_sequences <= self.planner.max_sequences_per_call(max_new_tokens):
+                calls = [(batch, num_return_sequences, 0)
+                         for batch in self.planner.plan_rows(lengths, num_return_sequences, max_new_tokens)]
+            else:
+                # A single row already fills a call: its sequences are split over several calls instead.
+                calls = []
+                for batch in self.planner.plan_rows(lengths, num_return_sequences, max_new_tokens):
+                    offset = 0
+                    for num_sequences in self.planner.plan(1, num_return_sequences, max_new_tokens):
+                        calls.append((batch, num_sequences, offset))
+                        offset += num_sequences
+
+            for rows, num_sequences, offset in calls:
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info("Dataset generation cancelled")
+                    return
+                outputs = self.llm.generate_batch([prompts[i] for i in rows], num_sequences, max_new_tokens)
+                for row, responses in zip(rows, outputs):
+                    for s, response in enumerate(responses):
+                        yield {"row": row, "sequence": offset + s, "response": response}
+        except Exception as e:
+            logger.exception(f"Error generating text: {str(e)}")
+            raise RuntimeError(f"Error generating text: {str(e)}")
+
+    def _prepare_prompts(self, system_prompt: str, user_prompt: str, num_return_sequences: int, max_new_tokens: int,
+                         num_executions: int, reference_data: Dict[str, str]) -> Tuple[str, str]:
         # Validate num_return_sequences
         if num_return_sequences <= 0 or max_new_tokens <= 0 or num_executions <= 0:
             logger.error("num_return_sequences, max_new_tokens and num_executions must be greater than 0")
@@ -44,28 +177,8 @@ class GenerateTextUseCase:
             logger.error("Placeholders defined but no reference data provided.")
             raise ValueError("Placeholders defined but no reference data provided.")
 
-        results = []
         if reference_data:
-            final_system = validate_and_replace_placeholders(system_prompt, reference_data)
-            final_user = validate_and_replace_placeholders(user_prompt, reference_data)
-            for _ in range(num_executions):
-                # Wrap in try-except when calling the LLM
-                try:
-                    responses = self.llm.generate(final_system, final_user, num_return_sequences, max_new_tokens)
-                    for resp in responses:
-                        results.append(GeneratedResult(resp))
-                except Exception as e:
-                    logger.exception(f"Error generating text: {str(e)}")
-                    raise RuntimeError(f"Error generating text: {str(e)}")
-        else:
-            for _ in range(num_executions):
-                try:
-                    responses = self.llm.generate(system_prompt, user_prompt, num_return_sequences, max_new_tokens)
-                    for resp in responses:
-                        results.append(GeneratedResult(resp))
-                except Exception as e:
-                    logger.exception(f"Error generating text: {str(e)}")
-                    raise RuntimeError(f"Error generating text: {str(e)}")
+            system_prompt = validate_and_replace_placeholders(system_prompt, reference_data)
+            user_prompt = validate_and_replace_placeholders(user_prompt, reference_data)
 
-        logger.info(f"Generated {len(results)} results")
-        return results
\ No newline at end of file
+        return system_prompt, user_prompt
\ No newline at end of file
@@ -0,0 +1,89 @@
+# application/use_cases/job_queue_use_case.py
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.domain.entities import Job, JobStatus
+from app.domain.ports.job_store_port import JobStorePort
+
+logger = logging.getLogger(__name__)
+
+class JobHandler:
+    # Splits one kind of job into units and runs them. Units must come out the same for the stored
+    # payload, so an interrupted job can resume from the first unit it did not complete.
+    def prepare(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        # Validates the request (ValueError if it cannot run) and returns the payload to store,
+        # with anything its units depend on (chunk sizes, plans) pinned, and the number of units.
+        raise NotImplementedError
+
+    def run_unit(self, payload: Dict[str, Any], unit_index: int) -> List[Any]:
+        raise NotImplementedError
+
+class JobQueueUseCase:
+    def __init__(self, store: JobStorePort, handlers: Dict[str, JobHandler]):
+        self.store = store
+        self.handlers = handlers
+        logger.info(f"JobQueueUseCase initialized with job kinds: {list(handlers)}")
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        handler = self.handlers.get(kind)
+        if handler is None:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        payload, total_units = handler.prepare(payload)
+        job = self.store.create(kind, payload, total_units)
+        logger.info(f"Submitted {kind} job {job.job_id} with {total_units} units")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def results(self, job_id: str, offset: int, limit: int) -> Tuple[Optional[Job], List[Any]]:
+        job = self.store.get(job_id)
+        if job is None:
+            return None, []
+        return job, self.store.results(job_id, offset, limit)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        return self.store.request_cancel(job_id)
+
+    def recover(self, stale_after_s: float) -> int:
+        recovered = self.store.requeue_running(stale_after_s)
+        if recovered:
+            logger.info(f"Re-queued {recovered} interrupted jobs")
+        return recovered
+
+    def heartbeat(self, stale_after_s: float) -> None:
+        # Called periodically: keeps this process's running jobs alive and re-queues those of
+        # processes that stopped (including a previous run of this one).
+        self.store.heartbeat()
+        self.recover(stale_after_s)
+
+    def run_next(self, should_stop: Optional[Callable[[], bool]] = None) -> bool:
+        # Claims the oldest queued job and runs it to the end; False if the queue is empty.
+        job = self.store.claim_next()
+        if job is None:
+            return False
+        self.run(job, should_stop)
+        return True
+
+    def run(self, job: Job, should_stop: Optional[Callable[[], bool]] = None) -> None:
+        # When should_stop turns true (the process is shutting down), the job goes back to the queue
+        # after its current unit, so another process resumes it without waiting for it to go stale.
+        handler = self.handlers[job.kind]
+        logger.info(f"Running {job.kind} job {job.job_id} from unit {job.completed_units}/{job.total_units}")
+        try:
+            for unit_index in range(job.completed_units, job.total_units):
+                if should_stop is not None and should_stop():
+                    logger.info(f"Job {job.job_id} released after {unit_index} units")
+                    self.store.release(job.job_id)
+                    return
+                current = self.store.get(job.job_id)
+                if current is None or current.cancel_requested:
+                    logger.info(f"Job {job.job_id} cancelled after {unit_index} units")
+                    self.store.finish(job.job_id, JobStatus.CANCELLED)
+                    return
+                self.store.complete_unit(job.job_id, unit_index, handler.run_unit(job.payload, unit_index))
+        except Exception as e:
+            logger.exception(f"Job {job.job_id} failed: {str(e)}")
+            self.store.finish(job.job_id, JobStatus.FAILED, str(e))
+            return
+        self.store.finish(job.job_id, JobStatus.COMPLETED)
+        logger.info(f"Job {job.job_id} completed")
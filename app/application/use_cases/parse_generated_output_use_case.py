@@ -12,8 +12,10 @@ class ParseGeneratedOutputUseCase:
 
     def execute(self, result: GeneratedResult, config: ParseConfiguration) -> ParsedResult:
         logger.info(f"Parsing result: {result.response} with config: {config}")
-        entries_data = self.parse_service.parse_text(result.response, config)
+        stats = {}
+        entries_data = self.parse_service.parse_text(result.response, config, stats)
         entries = [ParseEntry(e) for e in entries_data]
         parsed_result = ParsedResult(entries)
+        parsed_result.parse_stats = stats
         logger.debug(f"Parsed result: {parsed_result.entries}")
         return parsed_result
\ No newline at end of file
@@ -0,0 +1,130 @@
+# application/use_cases/pipeline_use_case.py
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+from app.domain.entities import GeneratedResult, ParseConfiguration, VerificationProcess
+from app.application.use_cases.generate_text_use_case import GenerateTextUseCase
+from app.application.use_cases.parse_generated_output_use_case import ParseGeneratedOutputUseCase
+from app.application.use_cases.verify_text_use_case import VerifyTextUseCase
+
+logger = logging.getLogger(__name__)
+
+class GenerateParseVerifyUseCase:
+    # Chains generation, parsing and verification in memory. Responses are parsed and verified on the
+    # executor as soon as their generate call finishes, while the following calls are still decoding.
+    # Overlap therefore only happens across calls: with one sequence per call (the default) every
+    # response overlaps with the next one's decode; a single large call runs the stages one after another.
+    def __init__(self, generate_use_case: GenerateTextUseCase, parse_use_case: ParseGeneratedOutputUseCase,
+                 verify_use_case: VerifyTextUseCase, executor: Executor):
+        self.generate_use_case = generate_use_case
+        self.parse_use_case = parse_use_case
+        self.verify_use_case = verify_use_case
+        # Must not be the executor the verify use case runs its methods on: a task waiting for
+        # its own methods there could starve the pool.
+        self.executor = executor
+        logger.info("GenerateParseVerifyUseCase initialized")
+
+    def execute_stream(self, system_prompt: str, user_prompt: str, num_return_sequences: int, max_new_tokens: int,
+                       num_executions: int, reference_data: Dict[str, str], config: ParseConfiguration,
+                       process: VerificationProcess, cancel_event: Optional[threading.Event] = None,
+                       sequences_per_call: int = 1) -> Iterator[Dict[str, Any]]:
+        # Prompts and parse configuration are validated eagerly, before streaming starts.
+        self.parse_use_case.parse_service.plan_cache.get_or_compile(config)
+        cancel_event = cancel_event or threading.Event()
+        events = self.generate_use_case.execute_stream(system_prompt, user_prompt, num_return_sequences, max_new_tokens,
+                                                       num_executions, reference_data, cancel_event, sequences_per_call)
+        return self._stream(events, config, process, cancel_event)
+
+    def _stream(self, events: Iterator[Dict[str, Any]], config: ParseConfiguration, process: VerificationProcess,
+                cancel_event: threading.Event) -> Iterator[Dict[str, Any]]:
+        # Results are yielded in completion order, tagged with their execution and sequence index,
+        # followed by one {"summary": ...} event with the time spent in each stage.
+        started = time.perf_counter()
+        # Decoded responses, finished parse+verify tasks and the end of generation all arrive here.
+        inbox: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+
+        def produce():
+            try:
+                for event in events:
+                    if "response" in event:
+                        inbox.put(("response", event))
+                inbox.put(("generated", None))
+            except Exception as e:
+                inbox.put(("failed", e))
+
+        threading.Thread(target=produce, name="pipeline-generation", daemon=True).start()
+        totals = {"generation_ms": 0.0, "parse_ms": 0.0, "verify_ms": 0.0}
+        pending: Set[Future] = set()
+        generating = True
+        count = errors = 0
+        try:
+            while (generating or pending) and not cancel_event.is_set():
+                kind, item = inbox.get()
+                if kind == "response":
+                    generated_ms = (time.perf_counter() - started) * 1000
+                    future = self.executor.submit(self._parse_and_verify, item, config, process, generated_ms)
+                    pending.add(future)
+                    future.add_done_callback(lambda f: inbox.put(("result", f)))
+                elif kind == "result":
+                    pending.discard(item)
+                    result = item.result()
+                    count, errors = count + 1, errors + ("error" in result)
+                    for key in ("parse_ms", "verify_ms"):
+                        totals[key] += result["timings"].get(key, 0.0)
+                    yield result
+                elif kind == "generated":
+                    generating = False
+                    totals["generation_ms"] = (time.perf_counter() - started) * 1000
+                else:
+                    raise item
+        finally:
+            # Also reached when the consumer stops early: stop decoding and drop queued work.
+            cancel_event.set()
+            for future in pending:
+                future.cancel()
+
+        summary = {"results": count, "errors": errors, **totals, "total_ms": (time.perf_counter() - started) * 1000}
+        logger.info(f"Pipeline finished: {summary}")
+        yield {"summary": summary}
+
+    def _parse_and_verify(self, event: Dict[str, Any], config: ParseConfiguration, process: VerificationProcess,
+                          generated_ms: float) -> Dict[str, Any]:
+        output = {"execution": event["execution"], "sequence": event["sequence"], "response": event["response"]}
+        timings = {"generated_ms": generated_ms}
+        output["timings"] = timings
+
+        parse_started = time.perf_counter()
+        try:
+            parsed = self.parse_use_case.execute(GeneratedResult(event["response"]), config)
+        except ValueError as e:
+            # A response without the expected fields cannot be verified: it is reported and dropped.
+            logger.warning(f"Pipeline parse failed for execution {event['execution']}, sequence {event['sequence']}: {str(e)}")
+            timings["parse_ms"] = (time.perf_counter() - parse_started) * 1000
+            output["error"] = str(e)
+            output["final_status"] = "descartada"
+            return output
+        timings["parse_ms"] = (time.perf_counter() - parse_started) * 1000
+
+        verify_started = time.perf_counter()
+        try:
+            verified = self.verify_use_case.execute(parsed, process)
+        except Exception as e:
+            logger.exception(f"Pipeline verification failed: {str(e)}")
+            timings["verify_ms"] = (time.perf_counter() - verify_started) * 1000
+            output["error"] = f"Error verifying text: {str(e)}"
+            return output
+        timings["verify_ms"] = (time.perf_counter() - verify_started) * 1000
+
+        output.update({
+            "entries": [e.data for e in verified.entries],
+            "parse_stats": verified.parse_stats,
+            "verification_methods_passed": verified.verification_methods_passed,
+            "verification_methods_failed": verified.verification_methods_failed,
+            "verification_methods_skipped": verified.verification_methods_skipped,
+            "verification_stats": verified.verification_stats,
+            "final_status": verified.final_status
+        })
+        return output
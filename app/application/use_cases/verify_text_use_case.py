@@ -1,60 +1,131 @@
 # application/use_cases/verify_text_use_case.py
 import logging
-from app.domain.entities import ParsedResult, VerificationProcess, VerificationMethodType, VerificationMethodMode
+from concurrent.futures import Executor, as_completed
+from app.domain.entities import ParsedResult, VerificationProcess, VerificationMethod, VerificationMethodType
 from app.domain.services.verifier_service import VerifierService
-from typing import Callable, List
+from app.domain.services.verification_planner import VerificationPlanner
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
 class VerifyTextUseCase:
-    def __init__(self, verifier_service: VerifierService, get_similarity: Callable[[str, str], float], generate_responses: Callable[[str, str, int, int], List[str]]):
+    def __init__(self, verifier_service: VerifierService, get_similarity: Callable[[str, str], float], generate_responses: Callable[[str, str, int, int], List[str]],
+                 score_continuations: Optional[Callable[[str, str, List[str]], List[float]]] = None,
+                 count_tokens: Optional[Callable[[str], int]] = None,
+                 planner: Optional[VerificationPlanner] = None,
+                 executor: Optional[Executor] = None,
+                 similarity_matrix: Optional[Callable[[List[str], List[str]], np.ndarray]] = None):
         self.verifier_service = verifier_service
         self.get_similarity = get_similarity
         self.generate_responses = generate_responses
+        self.score_continuations = score_continuations
+        self.count_tokens = count_tokens
+        self.planner = planner or VerificationPlanner()
+        # Without an executor the 'acumulativo' methods run one by one, still cheapest first.
+        self.executor = executor
+        # Preferred over get_similarity when given: the references are embedded once per method.
+        self.similarity_matrix = similarity_matrix
         logger.info("VerifyTextUseCase initialized")
 
     def execute(self, result: ParsedResult, process: VerificationProcess) -> ParsedResult:
         logger.info(f"Verifying text with result: {result.entries} and process: {process}")
-        acumulativos_superados = 0
-        for method in process.methods:
-            passed = False
-            if method.method_type == VerificationMethodType.EMBEDDING:
-                # Take text from some placeholder. Here we simplify: take first entry and first placeholder available:
-                if not result.entries or not result.entries[0].data:
-                    passed = False
-                    logger.warning("No entries or data found in result")
-                else:
-                    # First value of the dict:
-                    text_to_check = next(iter(result.entries[0].data.values()))
-                    passed = self.verifier_service.verify_embedding_method(method, self.get_similarity, text_to_check)
-                    logger.debug(f"Embedding verification result: {passed}")
-
-            elif method.method_type == VerificationMethodType.CONSENSUS:
-                passed = self.verifier_service.verify_consensus_method(method, self.generate_responses, result.entries)
-                logger.debug(f"Consensus verification result: {passed}")
+        eliminatorios, acumulativos = self.planner.plan(process)
+        # Outcome of every method that ran, keyed by its position in process.methods
+        outcomes: Dict[int, bool] = {}
+        positions = {id(m): i for i, m in enumerate(process.methods)}
 
+        for method in eliminatorios:
+            passed = self._apply(method, result, self._run_method(method, result))
+            outcomes[positions[id(method)]] = passed
             if not passed:
-                result.verification_methods_failed.append(method.name)
                 logger.debug(f"Method {method.name} failed verification")
-                if method.mode == VerificationMethodMode.ELIMINATORIO:
-                    result.final_status = "descartada"
-                    logger.info("Final status set to 'descartada'")
-                    return result
-            else:
-                result.verification_methods_passed.append(method.name)
-                logger.debug(f"Method {method.name} passed verification")
-                if method.mode == VerificationMethodMode.ACUMULATIVO:
-                    acumulativos_superados += 1
-
-        if acumulativos_superados >= process.required_for_confirmed:
-            result.final_status = "confirmada"
-            logger.info("Final status set to 'confirmada'")
-        elif acumulativos_superados >= process.required_for_review:
-            result.final_status = "a revisar"
-            logger.info("Final status set to 'a revisar'")
-        else:
-            result.final_status = "descartada"
-            logger.info("Final status set to 'descartada'")
+                self._record_outcomes(result, process, outcomes)
+                result.final_status = "descartada"
+                logger.info("Final status set to 'descartada'")
+                return result
+
+        acumulativos_superados = self._run_acumulativos(result, process, acumulativos, outcomes, positions)
+        self._record_outcomes(result, process, outcomes)
+
+        result.final_status = self.verifier_service.resolve_final_status(acumulativos_superados, process)
+        logger.info(f"Final status set to '{result.final_status}'")
 
         logger.debug(f"Final verification result: {result}")
-        return result
\ No newline at end of file
+        return result
+
+    def _run_acumulativos(self, result: ParsedResult, process: VerificationProcess, acumulativos: List[VerificationMethod],
+                          outcomes: Dict[int, bool], positions: Dict[int, int]) -> int:
+        acumulativos_superados = 0
+        pending = len(acumulativos)
+        if self.planner.outcome_decided(acumulativos_superados, pending, process):
+            return acumulativos_superados
+
+        if self.executor is None:
+            for method in acumulativos:
+                passed = self._apply(method, result, self._run_method(method, result))
+                outcomes[positions[id(method)]] = passed
+                acumulativos_superados += passed
+                pending -= 1
+                if self.planner.outcome_decided(acumulativos_superados, pending, process):
+                    logger.debug(f"Outcome decided with {pending} acumulativo methods left")
+                    break
+            return acumulativos_superados
+
+        # Methods are submitted cheapest first; pending ones are cancelled once the outcome is decided.
+        # Methods already running then finish on their own, but their results (and stats) are ignored:
+        # only what was merged here before returning reaches the result.
+        futures = {self.executor.submit(self._run_method, method, result): method for method in acumulativos}
+        try:
+            for future in as_completed(futures):
+                method = futures[future]
+                passed = self._apply(method, result, future.result())
+                outcomes[positions[id(method)]] = passed
+                acumulativos_superados += passed
+                pending -= 1
+                if self.planner.outcome_decided(acumulativos_superados, pending, process):
+                    logger.debug(f"Outcome decided with {pending} acumulativo methods left")
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+        return acumulativos_superados
+
+    def _apply(self, method: VerificationMethod, result: ParsedResult, outcome: Tuple[bool, Dict[str, Any]]) -> bool:
+        passed, stats = outcome
+        if stats:
+            result.verification_stats[method.name] = stats
+        return passed
+
+    def _run_method(self, method: VerificationMethod, result: ParsedResult) -> Tuple[bool, Dict[str, Any]]:
+        # Does not modify result: it may still be running when execute has already returned.
+        passed = False
+        stats: Dict[str, Any] = {}
+        if method.method_type == VerificationMethodType.EMBEDDING:
+            # Take text from some placeholder. Here we simplify: take first entry and first placeholder available:
+            if not result.entries or not result.entries[0].data:
+                passed = False
+                logger.warning("No entries or data found in result")
+            else:
+                # First value of the dict:
+                text_to_check = next(iter(result.entries[0].data.values()))
+                passed = self.verifier_service.verify_embedding_method(method, self.get_similarity, text_to_check,
+                                                                      self.similarity_matrix)
+                logger.debug(f"Embedding verification result: {passed}")
+
+        elif method.method_type == VerificationMethodType.CONSENSUS:
+            passed = self.verifier_service.verify_consensus_method(method, self.generate_responses, result.entries,
+                                                               self.score_continuations, self.count_tokens, stats)
+            logger.debug(f"Consensus verification result: {passed}")
+        return passed, stats
+
+    def _record_outcomes(self, result: ParsedResult, process: VerificationProcess, outcomes: Dict[int, bool]) -> None:
+        # Methods are reported in process order; those that did not run (the outcome was already decided)
+        # are reported as skipped.
+        for i, method in enumerate(process.methods):
+            if i not in outcomes:
+                result.verification_methods_skipped.append(method.name)
+            elif outcomes[i]:
+                result.verification_methods_passed.append(method.name)
+            else:
+                result.verification_methods_failed.append(method.name)
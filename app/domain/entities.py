@@ -4,8 +4,10 @@ from typing import Any, Dict, List, Optional
 from enum import Enum
 
 class GeneratedResult:
-    def __init__(self, response: str):
+    def __init__(self, response: str, cluster_size: Optional[int] = None):
         self.response = response
+        # Set by deduplication: number of generated results this one represents (itself included).
+        self.cluster_size = cluster_size
 
 class ParseEntry:
     def __init__(self, data: Dict[str, Any]):
@@ -16,6 +18,10 @@ class ParsedResult:
         self.entries = entries
         self.verification_methods_passed: List[str] = []
         self.verification_methods_failed: List[str] = []
+        # Methods that did not run because the final status was already decided.
+        self.verification_methods_skipped: List[str] = []
+        self.verification_stats: Dict[str, Dict[str, Any]] = {}
+        self.parse_stats: Dict[str, Any] = {}
         self.final_status: Optional[str] = None
 
 class VerificationPrompt:
@@ -37,11 +43,33 @@ class VerificationMethodMode(Enum):
     ELIMINATORIO = "eliminatorio"
     ACUMULATIVO = "acumulativo"
 
+class ConsensusMode(Enum):
+    SAMPLING = "sampling"
+    LOGPROB = "logprob"
+
+class EmbeddingAggregation(Enum):
+    MAX = "max"
+    MEAN = "mean"
+    TOP_K = "top_k"
+
 class EmbeddingVerificationSettings:
-    def __init__(self, lower_threshold: float, upper_threshold: float, reference_text: str):
+    def __init__(self, lower_threshold: float, upper_threshold: float, reference_text: Optional[str] = None,
+                 reference_texts: Optional[List[str]] = None, aggregation: EmbeddingAggregation = EmbeddingAggregation.MAX,
+                 top_k: int = 1):
         self.lower_threshold = lower_threshold
         self.upper_threshold = upper_threshold
         self.reference_text = reference_text
+        # Several references are reduced to one similarity per response with 'aggregation'
+        # (mean of the top_k most similar references for TOP_K).
+        self.reference_texts = reference_texts or []
+        self.aggregation = aggregation
+        self.top_k = top_k
+
+    @property
+    def references(self) -> List[str]:
+        if self.reference_text is not None:
+            return [self.reference_text] + self.reference_texts
+        return self.reference_texts
 
 class ConsensusVerificationSettings:
     def __init__(self, 
@@ -51,7 +79,12 @@ class ConsensusVerificationSettings:
                  positive_responses: List[str],
                  num_responses: int,
                  num_positive_required: int,
-                 max_new_tokens: int):
+                 max_new_tokens: int,
+                 mode: ConsensusMode = ConsensusMode.SAMPLING,
+                 negative_responses: Optional[List[str]] = None,
+                 probability_threshold: float = 0.5,
+                 batch_size: Optional[int] = None,
+                 length_normalized: bool = True):
         self.system_prompt = system_prompt
         self.user_prompt = user_prompt
         self.placeholders = placeholders
@@ -59,6 +92,13 @@ class ConsensusVerificationSettings:
         self.num_responses = num_responses
         self.num_positive_required = num_positive_required
         self.max_new_tokens = max_new_tokens
+        self.mode = mode
+        self.negative_responses = negative_responses or []
+        self.probability_threshold = probability_threshold
+        # Responses generated per step in sampling mode; None adapts it to the positives still needed
+        self.batch_size = batch_size
+        # Logprob mode: compare answers by mean per-token log-probability, so longer ones are not penalized
+        self.length_normalized = length_normalized
 
 class VerificationMethod:
     def __init__(self, 
@@ -126,5 +166,34 @@ class ParseRule:
         self.multiple_strategy = multiple_strategy
 
 class ParseConfiguration:
-    def __init__(self, rules: List[ParseRule]):
+    def __init__(self, rules: List[ParseRule], rule_timeout_ms: Optional[int] = None, total_timeout_ms: Optional[int] = None):
         self.rules = rules
+        # Time budgets for REGEX rules: each rule, and all of them for one text. None uses the
+        # ParseService defaults; 0 means unlimited.
+        self.rule_timeout_ms = rule_timeout_ms
+        self.total_timeout_ms = total_timeout_ms
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class Job:
+    def __init__(self, job_id: str, kind: str, payload: Dict[str, Any], status: JobStatus, total_units: int,
+                 completed_units: int = 0, completed_items: int = 0, error: Optional[str] = None,
+                 cancel_requested: bool = False, created_at: float = 0.0, updated_at: float = 0.0):
+        self.job_id = job_id
+        self.kind = kind
+        # The original request, kept so the job can be resumed after a restart.
+        self.payload = payload
+        self.status = status
+        # A job is split into units of work; results are stored unit by unit.
+        self.total_units = total_units
+        self.completed_units = completed_units
+        self.completed_items = completed_items
+        self.error = error
+        self.cancel_requested = cancel_requested
+        self.created_at = created_at
+        self.updated_at = updated_at
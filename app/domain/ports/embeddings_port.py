@@ -1,5 +1,20 @@
 # domain/ports/embeddings_port.py
 
+from typing import List
+import numpy as np
+
 class EmbeddingsPort:
     def get_similarity(self, text1: str, text2: str) -> float:
         raise NotImplementedError
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        # Returns a (len(texts), dim) matrix of L2-normalized embeddings, in input order.
+        raise NotImplementedError
+
+    def similarity_matrix(self, queries: List[str], references: List[str]) -> np.ndarray:
+        # Returns a (len(queries), len(references)) matrix of cosine similarities.
+        raise NotImplementedError
+
+    def reference_matrix(self, references: List[str]) -> np.ndarray:
+        # Like embed_many, for reference sets reused across calls: implementations may cache the matrix.
+        raise NotImplementedError
@@ -0,0 +1,39 @@
+# domain/ports/job_store_port.py
+from typing import Any, Dict, List, Optional
+from app.domain.entities import Job, JobStatus
+
+class JobStorePort:
+    def create(self, kind: str, payload: Dict[str, Any], total_units: int) -> Job:
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Job]:
+        raise NotImplementedError
+
+    def claim_next(self) -> Optional[Job]:
+        # Marks the oldest queued job as running and returns it.
+        raise NotImplementedError
+
+    def complete_unit(self, job_id: str, unit_index: int, results: List[Any]) -> None:
+        # Stores the results of one unit and advances the job's progress, atomically.
+        raise NotImplementedError
+
+    def finish(self, job_id: str, status: JobStatus, error: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    def release(self, job_id: str) -> None:
+        # Returns a job this process is running to the queue, keeping the units it completed.
+        raise NotImplementedError
+
+    def request_cancel(self, job_id: str) -> Optional[Job]:
+        raise NotImplementedError
+
+    def results(self, job_id: str, offset: int, limit: int) -> List[Any]:
+        raise NotImplementedError
+
+    def heartbeat(self) -> int:
+        # Marks the jobs this store's process is running as alive; returns how many.
+        raise NotImplementedError
+
+    def requeue_running(self, stale_after_s: float) -> int:
+        # Running jobs without a heartbeat for stale_after_s (their process stopped) go back to the queue.
+        raise NotImplementedError
@@ -1,7 +1,32 @@
 # domain/ports/llm_port.py
 
-from typing import List
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 class LLMPort:
-    def generate(self, system_prompt: str, user_prompt: str, num_responses:int=1, max_new_tokens:int=100) -> List[str]:
+    def generate(self, system_prompt: str, user_prompt: str, num_responses:int=1, max_new_tokens:int=100,
+                 stop_sequences: Optional[List[str]] = None, draft_model: Optional[str] = None) -> List[str]:
+        # Each sequence stops early once its text contains one of stop_sequences (case-insensitive).
+        # draft_model names a small model of the same tokenizer family for assisted decoding; None uses
+        # the deployment default and '' disables it. Implementations without it ignore the argument.
+        raise NotImplementedError
+
+    def generate_batch(self, prompts: List[Tuple[str, str]], num_responses:int=1, max_new_tokens:int=100,
+                       stop_sequences: Optional[List[str]] = None, draft_model: Optional[str] = None) -> List[List[str]]:
+        # prompts is a list of (system_prompt, user_prompt); returns num_responses strings per prompt, in order.
+        raise NotImplementedError
+
+    def count_tokens(self, text: str) -> int:
+        raise NotImplementedError
+
+    def generate_stream(self, system_prompt: str, user_prompt: str, num_responses:int=1, max_new_tokens:int=100,
+                        cancel_event: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        # Yields {"sequence": i, "token": str} while decoding (when supported) and {"sequence": i, "response": str}
+        # for every finished sequence. Setting cancel_event stops the generation.
+        raise NotImplementedError
+
+    def score_continuations(self, system_prompt: str, user_prompt: str, continuations: List[str],
+                            length_normalized: bool = False) -> List[float]:
+        # Returns the total log-probability of each continuation right after the prompt, or its mean
+        # per token with length_normalized. Empty continuations are rejected with ValueError.
         raise NotImplementedError
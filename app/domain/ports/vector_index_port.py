@@ -0,0 +1,16 @@
+# domain/ports/vector_index_port.py
+
+from typing import Tuple
+import numpy as np
+
+class VectorIndexPort:
+    # Inner-product index that grows as vectors are added. Ids are assigned in insertion order, from 0.
+    def add(self, vectors: np.ndarray) -> None:
+        raise NotImplementedError
+
+    def search(self, queries: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        # Returns (scores, ids), both (len(queries), k), best first. Missing neighbours have id -1.
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
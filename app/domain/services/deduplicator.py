@@ -0,0 +1,60 @@
+# domain/services/deduplicator.py
+import logging
+from typing import Callable, List
+import numpy as np
+from app.domain.ports.vector_index_port import VectorIndexPort
+
+logger = logging.getLogger(__name__)
+
+class DeduplicationResult:
+    def __init__(self, representatives: List[int], clusters: List[int]):
+        # Input index of each cluster's representative (its first member), by cluster id.
+        self.representatives = representatives
+        # Cluster id of every input.
+        self.clusters = clusters
+        self.cluster_sizes = [0] * len(representatives)
+        for cluster in clusters:
+            self.cluster_sizes[cluster] += 1
+
+class SemanticDeduplicator:
+    # Greedy clustering in input order: a text joins the cluster of the most similar representative
+    # if the cosine similarity reaches the threshold, otherwise it becomes a new representative.
+    # Only representatives are indexed, and texts are embedded and searched a batch at a time.
+    def __init__(self, embed_many: Callable[[List[str]], np.ndarray], index_factory: Callable[[int], VectorIndexPort],
+                 threshold: float = 0.95, batch_size: int = 64):
+        if not -1.0 <= threshold <= 1.0:
+            raise ValueError("Deduplication threshold must be between -1 and 1")
+        self.embed_many = embed_many
+        self.index_factory = index_factory
+        self.threshold = threshold
+        self.batch_size = max(1, batch_size)
+
+    def deduplicate(self, texts: List[str]) -> DeduplicationResult:
+        representatives: List[int] = []
+        clusters: List[int] = []
+        index = None
+        for start in range(0, len(texts), self.batch_size):
+            vectors = np.asarray(self.embed_many(texts[start:start + self.batch_size]), dtype=np.float32)
+            if index is None:
+                index = self.index_factory(vectors.shape[1])
+            scores, ids = index.search(vectors, 1)
+            indexed = len(representatives)
+            # Representatives found in this batch are not in the index yet: compared directly.
+            new: List[int] = []
+            for j, vector in enumerate(vectors):
+                best_score, best = float(scores[j, 0]), int(ids[j, 0])
+                if new:
+                    local = vectors[new] @ vector
+                    k = int(np.argmax(local))
+                    if best < 0 or local[k] > best_score:
+                        best_score, best = float(local[k]), indexed + k
+                if best >= 0 and best_score >= self.threshold:
+                    clusters.append(best)
+                else:
+                    clusters.append(len(representatives))
+                    representatives.append(start + j)
+                    new.append(j)
+            if new:
+                index.add(vectors[new])
+        logger.info(f"Deduplicated {len(texts)} texts into {len(representatives)} clusters")
+        return DeduplicationResult(representatives, clusters)
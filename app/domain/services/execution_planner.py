@@ -0,0 +1,43 @@
+# domain/services/execution_planner.py
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+class ExecutionPlanner:
+    # Merges num_executions × num_return_sequences identical samples into as few generate
+    # calls as possible. max_batch_tokens bounds sequences × max_new_tokens per call, which
+    # is what drives the KV-cache memory of a batched decode (0 disables the ceiling).
+    def __init__(self, max_sequences_per_batch: int = 16, max_batch_tokens: int = 0):
+        self.max_sequences_per_batch = max_sequences_per_batch
+        self.max_batch_tokens = max_batch_tokens
+        logger.info(f"ExecutionPlanner initialized with max_sequences_per_batch: {max_sequences_per_batch}, "
+                    f"max_batch_tokens: {max_batch_tokens}")
+
+    def max_sequences_per_call(self, max_new_tokens: int) -> int:
+        limit = self.max_sequences_per_batch
+        if self.max_batch_tokens > 0:
+            limit = min(limit, self.max_batch_tokens // max_new_tokens)
+        return max(1, limit)
+
+    def plan_rows(self, prompt_lengths: List[int], num_return_sequences: int, max_new_tokens: int) -> List[List[int]]:
+        # Groups dataset rows (by index) into generate_batch calls of num_return_sequences each.
+        # Longest prompts go first and rows of similar length share a call, which keeps left padding low.
+        per_call = max(1, self.max_sequences_per_call(max_new_tokens) // num_return_sequences)
+        order = sorted(range(len(prompt_lengths)), key=lambda i: -prompt_lengths[i])
+        batches = [order[i:i + per_call] for i in range(0, len(order), per_call)]
+        logger.debug(f"Planned {len(batches)} generate calls for {len(prompt_lengths)} rows")
+        return batches
+
+    def plan(self, num_executions: int, num_return_sequences: int, max_new_tokens: int,
+             max_sequences: Optional[int] = None) -> List[int]:
+        # max_sequences lowers the per-call limit for callers that want results sooner rather than fewer calls.
+        total = num_executions * num_return_sequences
+        limit = self.max_sequences_per_call(max_new_tokens)
+        if max_sequences is not None:
+            limit = max(1, min(limit, max_sequences))
+        chunks = [limit] * (total // limit)
+        if total % limit:
+            chunks.append(total % limit)
+        logger.debug(f"Planned {len(chunks)} generate calls for {total} sequences: {chunks}")
+        return chunks
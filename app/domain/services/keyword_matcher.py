@@ -0,0 +1,80 @@
+# domain/services/keyword_matcher.py
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterable, List
+
+# From this many distinct keywords on, one Aho-Corasick pass over the text beats scanning it once
+# per keyword with str.find, which runs in C: benchmarks/keyword_parse_benchmark.py measures the
+# crossover between 150 and 200 keywords, for texts of 200 to 10000 lines.
+AUTOMATON_MIN_PATTERNS = 160
+
+class _AhoCorasick:
+    def __init__(self, patterns: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._lengths = [len(p) for p in patterns]
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(pattern_id)
+
+        # Breadth-first, so every failure target is complete before it is inherited.
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, nxt in self._goto[state].items():
+                pending.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0) if state else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, text: str) -> List[List[int]]:
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        starts: List[List[int]] = [[] for _ in lengths]
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern_id in out[state]:
+                starts[pattern_id].append(i - lengths[pattern_id] + 1)
+        return starts
+
+class KeywordMatcher:
+    # Built once per parse plan from the keywords of its KEYWORD rules. find_all returns every
+    # start offset of every keyword, overlapping ones included, so a rule's str.find loop can be
+    # replayed on the offsets with next_occurrence.
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = sorted({p for p in patterns if p})
+        self._automaton = _AhoCorasick(self.patterns) if len(self.patterns) >= AUTOMATON_MIN_PATTERNS else None
+
+    def find_all(self, text: str) -> Dict[str, List[int]]:
+        if self._automaton is not None:
+            return dict(zip(self.patterns, self._automaton.scan(text)))
+        occurrences = {}
+        for pattern in self.patterns:
+            starts = []
+            pos = text.find(pattern)
+            while pos != -1:
+                starts.append(pos)
+                pos = text.find(pattern, pos + 1)
+            occurrences[pattern] = starts
+        return occurrences
+
+def next_occurrence(starts: List[int], length: int, start: int, end: int) -> int:
+    # Same result as text.find(pattern, start, end), given the sorted starts of pattern in text.
+    i = bisect_left(starts, start)
+    if i < len(starts) and starts[i] + length <= end:
+        return starts[i]
+    return -1
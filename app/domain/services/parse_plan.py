@@ -0,0 +1,86 @@
+# domain/services/parse_plan.py
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from app.domain.entities import ParseConfiguration, ParseRule, ParseMode, ParseScope
+from app.domain.services.keyword_matcher import KeywordMatcher
+from app.domain.services.regex_guard import GuardedRegex
+
+logger = logging.getLogger(__name__)
+
+def configuration_key(config: ParseConfiguration) -> str:
+    # Content hash of the configuration: identical rule sets share a plan across requests.
+    payload = [
+        [r.label, r.mode.value, r.pattern, r.secondary_pattern, r.scope.value,
+         r.fallback_strategy.value, r.fallback_value, r.multiple_strategy.value]
+        for r in config.rules
+    ]
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+class CompiledRule:
+    def __init__(self, rule: ParseRule):
+        self.rule = rule
+        self.regex: Optional[GuardedRegex] = GuardedRegex(rule.pattern) if rule.mode == ParseMode.REGEX else None
+
+class ParsePlan:
+    # Precompiled form of a ParseConfiguration: compiled regexes, the keyword rules grouped by
+    # scope (the keyword search plan), a matcher over all their keywords, and whether the text
+    # needs to be split into lines.
+    def __init__(self, config: ParseConfiguration):
+        self.key = configuration_key(config)
+        self.rules = [CompiledRule(rule) for rule in config.rules]
+        self.needs_lines = any(rule.scope == ParseScope.LINE_BY_LINE for rule in config.rules)
+        self.keyword_rules: Dict[ParseScope, List[int]] = {scope: [] for scope in ParseScope}
+        for i, compiled in enumerate(self.rules):
+            if compiled.rule.mode == ParseMode.KEYWORD:
+                self.keyword_rules[compiled.rule.scope].append(i)
+        # Both scopes search the whole text once; line rules then only visit lines with a hit.
+        self.keyword_matcher = KeywordMatcher(
+            self.rules[i].rule.pattern for indices in self.keyword_rules.values() for i in indices
+        )
+
+class ParsePlanCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._plans: "OrderedDict[str, ParsePlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compile(self, config: ParseConfiguration) -> ParsePlan:
+        key = configuration_key(config)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+
+        # Invalid regexes raise re.error here, before anything is cached.
+        plan = ParsePlan(config)
+        logger.debug(f"Compiled parse plan {key} with {len(plan.rules)} rules")
+        with self._lock:
+            self._plans[key] = plan
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+        return plan
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._plans),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+_default_cache = ParsePlanCache()
+
+def get_parse_plan_cache() -> ParsePlanCache:
+    return _default_cache
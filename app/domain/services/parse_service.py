@@ -1,43 +1,90 @@
 # domain/services/parse_service.py
 import logging
-import re
-from typing import Dict, List, Optional
-from app.domain.entities import (ParseConfiguration, ParseRule, ParseMode, ParseScope, ParseFallbackStrategy, ParseMultipleStrategy)
+import time
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+from app.domain.entities import (ParseConfiguration, ParseRule, ParseScope, ParseFallbackStrategy, ParseMultipleStrategy)
+from app.domain.services.parse_plan import CompiledRule, ParsePlanCache, get_parse_plan_cache
+from app.domain.services.keyword_matcher import next_occurrence
+from app.domain.services.regex_guard import RegexTimeout
 
 logger = logging.getLogger(__name__)
 
 class ParseService:
-    def __init__(self):
+    def __init__(self, plan_cache: Optional[ParsePlanCache] = None, rule_timeout_ms: int = 0, total_timeout_ms: int = 0,
+                 linear_engine: bool = False):
+        # Plans are shared process-wide by default, so repeated configurations skip compilation.
+        self.plan_cache = plan_cache or get_parse_plan_cache()
+        # REGEX time budgets (0 = unlimited). They are ceilings: a ParseConfiguration can only lower them.
+        self.rule_timeout_ms = rule_timeout_ms
+        self.total_timeout_ms = total_timeout_ms
+        # Run patterns that fit the RE2 subset on the linear-time engine, when it is installed.
+        self.linear_engine = linear_engine
         logger.info("ParseService initialized")
 
-    def parse_text(self, text: str, config: ParseConfiguration) -> List[Dict[str, str]]:
+    def parse_text(self, text: str, config: ParseConfiguration, stats: Optional[Dict[str, Any]] = None) -> List[Dict[str, str]]:
         logger.info(f"Parsing text: {text} with config: {config}")
+        plan = self.plan_cache.get_or_compile(config)
+        rule_timeout_ms = self._effective_timeout(self.rule_timeout_ms, config.rule_timeout_ms)
+        total_timeout_ms = self._effective_timeout(self.total_timeout_ms, config.total_timeout_ms)
+        # Shared by every REGEX rule of this text.
+        deadline = time.monotonic() + total_timeout_ms / 1000 if total_timeout_ms else None
+        rule_ms: Dict[str, float] = {}
+        timed_out: List[str] = []
+        started = time.perf_counter()
+        # Split once; every LINE_BY_LINE rule works on the same lines.
+        lines = text.splitlines() if plan.needs_lines else []
+        # One search for every keyword of the configuration; KEYWORD rules replay their find loop on it.
+        hits = plan.keyword_matcher.find_all(text)
+        line_starts, line_ends = self._line_spans(text, lines) if plan.keyword_rules[ParseScope.LINE_BY_LINE] else ([], [])
         # Return a list of dictionaries. Each dictionary is a set of placeholders for a "row".
         # First, extract all matches per rule.
         all_rule_matches = []
-        for rule in config.rules:
-            if rule.scope == ParseScope.LINE_BY_LINE:
-                raw_matches = self._parse_line_by_line_all(text, rule)
-            else:
-                raw_matches = self._parse_all_text_all(text, rule)
-
-            if not raw_matches:
-                # Nothing found
-                if rule.fallback_strategy == ParseFallbackStrategy.ERROR:
-                    logger.error(f"No match found for '{rule.label}'")
-                    raise ValueError(f"No match found for '{rule.label}'")
-                elif rule.fallback_strategy == ParseFallbackStrategy.EMPTY:
-                    raw_matches = [""]
-                elif rule.fallback_strategy == ParseFallbackStrategy.CUSTOM:
-                    raw_matches = [rule.fallback_value]
-
-            # Apply multiple_strategy
-            if rule.multiple_strategy == ParseMultipleStrategy.FIRST:
-                raw_matches = [raw_matches[0]]  # only first match
-
-            # Save the final matches for this rule
-            # raw_matches is the final list of strings for this rule
-            all_rule_matches.append((rule.label, raw_matches))
+        try:
+            for compiled in plan.rules:
+                rule = compiled.rule
+                rule_started = time.perf_counter()
+                rule_timed_out = False
+                if compiled.regex is not None:
+                    try:
+                        raw_matches = self._run_regex(compiled, text, lines, rule_timeout_ms, deadline)
+                    except RegexTimeout:
+                        # A rule that runs out of time is treated as finding nothing.
+                        logger.warning(f"Regex for '{rule.label}' exceeded its time budget")
+                        raw_matches = []
+                        rule_timed_out = True
+                        timed_out.append(rule.label)
+                elif rule.scope == ParseScope.LINE_BY_LINE:
+                    raw_matches = self._parse_keyword_lines(text, line_starts, line_ends, rule, hits)
+                else:
+                    raw_matches = self._extract_keyword(text, rule, hits, 0, len(text))
+                rule_ms[rule.label] = rule_ms.get(rule.label, 0.0) + (time.perf_counter() - rule_started) * 1000
+
+                if not raw_matches:
+                    # Nothing found
+                    if rule.fallback_strategy == ParseFallbackStrategy.ERROR:
+                        message = (f"Regex for '{rule.label}' exceeded its time budget" if rule_timed_out
+                                   else f"No match found for '{rule.label}'")
+                        logger.error(message)
+                        raise ValueError(message)
+                    elif rule.fallback_strategy == ParseFallbackStrategy.EMPTY:
+                        raw_matches = [""]
+                    elif rule.fallback_strategy == ParseFallbackStrategy.CUSTOM:
+                        raw_matches = [rule.fallback_value]
+
+                # Apply multiple_strategy
+                if rule.multiple_strategy == ParseMultipleStrategy.FIRST:
+                    raw_matches = [raw_matches[0]]  # only first match
+
+                # Save the final matches for this rule
+                # raw_matches is the final list of strings for this rule
+                all_rule_matches.append((rule.label, raw_matches))
+        finally:
+            # Filled also when a rule raises, so callers can report where the time went.
+            if stats is not None:
+                stats["rule_ms"] = rule_ms
+                stats["timed_out"] = timed_out
+                stats["total_ms"] = (time.perf_counter() - started) * 1000
 
         # Combine the matches of all rules
         # Find the minimum length of the lists "all"
@@ -55,55 +102,97 @@ class ParseService:
         logger.debug(f"Parsed entries: {entries}")
         return entries
 
-    def _parse_line_by_line_all(self, text: str, rule: ParseRule) -> List[str]:
-        lines = text.splitlines()
+    def parse_many(self, texts: List[str], config: ParseConfiguration
+                   ) -> List[Tuple[Optional[List[Dict[str, str]]], Optional[str], Dict[str, Any]]]:
+        # (entries, None, stats) per parsed text; a text that fails (fallback 'error') yields
+        # (None, message, stats) instead of aborting the rest.
+        self.plan_cache.get_or_compile(config)
         results = []
-        for line in lines:
-            matches = self._apply_rule_on_text_all(line, rule)
-            results.extend(matches)
+        for text in texts:
+            stats: Dict[str, Any] = {}
+            try:
+                results.append((self.parse_text(text, config, stats), None, stats))
+            except ValueError as e:
+                results.append((None, str(e), stats))
         return results
 
-    def _parse_all_text_all(self, text: str, rule: ParseRule) -> List[str]:
-        return self._apply_rule_on_text_all(text, rule)
+    def _effective_timeout(self, server_ms: int, requested_ms: Optional[int]) -> int:
+        # A requested budget can shorten the server's one but never lift it; non-positive values are ignored.
+        if requested_ms is None or requested_ms <= 0:
+            return server_ms
+        return min(server_ms, requested_ms) if server_ms > 0 else requested_ms
 
-    def _apply_rule_on_text_all(self, text: str, rule: ParseRule) -> List[str]:
-        if rule.mode == ParseMode.REGEX:
-            # For multiple matches we use findall
-            matches = re.findall(rule.pattern, text)
-            if not matches:
-                return []
-            return matches if isinstance(matches, list) else [matches]
+    def _run_regex(self, compiled: CompiledRule, text: str, lines: List[str], rule_timeout_ms: int,
+                   deadline: Optional[float]) -> List[str]:
+        # The rule budget covers all the lines of a LINE_BY_LINE rule; the deadline is shared by all rules.
+        limit = time.monotonic() + rule_timeout_ms / 1000 if rule_timeout_ms else None
+        if deadline is not None:
+            limit = deadline if limit is None else min(limit, deadline)
+        results = []
+        for target in (lines if compiled.rule.scope == ParseScope.LINE_BY_LINE else [text]):
+            timeout = None if limit is None else limit - time.monotonic()
+            results.extend(compiled.regex.findall(target, timeout, self.linear_engine))
+        # Engines that cannot be interrupted are held to the budget once they return.
+        if limit is not None and time.monotonic() > limit:
+            raise RegexTimeout()
+        return results
+
+    def _parse_keyword_lines(self, text: str, line_starts: List[int], line_ends: List[int], rule: ParseRule,
+                             hits: Dict[str, List[int]]) -> List[str]:
+        if rule.pattern:
+            # Only lines that contain the keyword can produce a match.
+            length = len(rule.pattern)
+            candidates = []
+            for pos in hits[rule.pattern]:
+                line = bisect_right(line_starts, pos) - 1
+                if pos + length <= line_ends[line] and (not candidates or candidates[-1] != line):
+                    candidates.append(line)
         else:
-            # KEYWORD mode with multiple matches
-            # Search for all appearances
-            results = []
-            start_idx = 0
-            while True:
-                start_pos = text.find(rule.pattern, start_idx) if rule.pattern else 0
-                if rule.pattern and start_pos == -1:
+            candidates = range(len(line_starts))
+        results = []
+        for line in candidates:
+            results.extend(self._extract_keyword(text, rule, hits, line_starts[line], line_ends[line]))
+        return results
+
+    def _line_spans(self, text: str, lines: List[str]) -> Tuple[List[int], List[int]]:
+        # Offsets of each str.splitlines() line within text, separators excluded.
+        starts, ends = [], []
+        offset = 0
+        for line, chunk in zip(lines, text.splitlines(keepends=True)):
+            starts.append(offset)
+            ends.append(offset + len(line))
+            offset += len(chunk)
+        return starts, ends
+
+    def _extract_keyword(self, text: str, rule: ParseRule, hits: Dict[str, List[int]], lo: int, hi: int) -> List[str]:
+        # Every "<pattern> ... <secondary_pattern>" match within text[lo:hi], with the primary keyword
+        # looked up in the precomputed offsets instead of searching the text again.
+        results = []
+        starts = hits.get(rule.pattern, [])
+        start_idx = lo
+        while True:
+            if rule.pattern:
+                start_pos = next_occurrence(starts, len(rule.pattern), start_idx, hi)
+                if start_pos == -1:
                     break
-                if rule.pattern:
-                    start_search = start_pos + len(rule.pattern)
-                else:
-                    start_search = start_idx
-
-                end_pos = len(text)
-                if rule.secondary_pattern:
-                    sec_pos = text.find(rule.secondary_pattern, start_search)
-                    if sec_pos == -1:
-                        # no more matches
-                        break
-                    end_pos = sec_pos
-
-                extracted = text[start_search:end_pos].strip()
-                if extracted:
-                    results.append(extracted)
-
-                # advance start_idx
-                if rule.pattern:
-                    start_idx = end_pos + (len(rule.secondary_pattern) if rule.secondary_pattern else 0)
-                else:
-                    # If no initial pattern, avoid infinite loop
+                start_search = start_pos + len(rule.pattern)
+            else:
+                start_search = start_idx
+
+            end_pos = hi
+            if rule.secondary_pattern:
+                sec_pos = text.find(rule.secondary_pattern, start_search, hi)
+                if sec_pos == -1:
                     break
+                end_pos = sec_pos
+
+            extracted = text[start_search:end_pos].strip()
+            if extracted:
+                results.append(extracted)
 
-            return results
\ No newline at end of file
+            if rule.pattern:
+                start_idx = end_pos + (len(rule.secondary_pattern) if rule.secondary_pattern else 0)
+            else:
+                break
+
+        return results
@@ -0,0 +1,29 @@
+# domain/services/prompt_template.py
+import re
+from typing import Dict, List
+
+_PLACEHOLDER = re.compile(r"{([^{}]+)}")
+
+class PromptTemplate:
+    # A prompt with {placeholders}, split once into literal parts and placeholder names so that it can
+    # be rendered for many rows of reference data. Same placeholder syntax and errors as
+    # validate_and_replace_placeholders, but values are inserted in a single pass (a value that
+    # itself looks like a placeholder is left as is).
+    def __init__(self, template: str):
+        self.template = template
+        parts = _PLACEHOLDER.split(template)
+        self._literals: List[str] = parts[0::2]
+        self.placeholders: List[str] = parts[1::2]
+
+    def render(self, data: Dict[str, str]) -> str:
+        if not self.placeholders:
+            return self.template
+        if not data:
+            raise ValueError("Placeholders defined but no reference data provided.")
+        out = [self._literals[0]]
+        for name, literal in zip(self.placeholders, self._literals[1:]):
+            if name not in data:
+                raise ValueError(f"Missing placeholder '{name}' in reference data")
+            out.append(str(data[name]))
+            out.append(literal)
+        return "".join(out)
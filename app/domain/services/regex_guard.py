@@ -0,0 +1,63 @@
+# domain/services/regex_guard.py
+import logging
+import re
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 'regex' (a transformers dependency) can abort a match after a timeout; 're' cannot be interrupted.
+try:
+    import regex as _regex
+except ImportError:
+    _regex = None
+    logger.warning("'regex' is not installed: parse regex time budgets are only checked after each match")
+
+# Optional linear-time engine (google-re2). Only used when enabled and the pattern fits its subset.
+try:
+    import re2 as _re2
+except ImportError:
+    _re2 = None
+
+class RegexTimeout(Exception):
+    pass
+
+class GuardedRegex:
+    # A REGEX rule pattern compiled for every available engine. 're' stays the reference: it
+    # validates the pattern (invalid patterns raise re.error) and runs it when there is no budget.
+    def __init__(self, pattern: str):
+        self.pattern = re.compile(pattern)
+        self._interruptible = None
+        if _regex is not None:
+            try:
+                self._interruptible = _regex.compile(pattern)
+            except _regex.error:
+                logger.debug(f"Pattern not supported by 'regex', it will run without preemption: {pattern}")
+        self._linear = None
+        if _re2 is not None:
+            try:
+                self._linear = _re2.compile(pattern)
+            except Exception:
+                # Backreferences, lookarounds, etc. are outside the RE2 subset.
+                self._linear = None
+
+    def engine(self, timeout: Optional[float], linear: bool = False) -> str:
+        if linear and self._linear is not None:
+            return "re2"
+        if timeout is not None and self._interruptible is not None:
+            return "regex"
+        return "re"
+
+    def findall(self, text: str, timeout: Optional[float] = None, linear: bool = False) -> List[Any]:
+        # timeout is in seconds; None means unlimited. Raises RegexTimeout when the match is aborted.
+        if timeout is not None and timeout <= 0:
+            raise RegexTimeout()
+        engine = self.engine(timeout, linear)
+        if engine == "re2":
+            return self._linear.findall(text)
+        if engine == "regex":
+            try:
+                # concurrent=True releases the GIL, so a slow match does not stall other threads.
+                return self._interruptible.findall(text, timeout=timeout, concurrent=True)
+            except TimeoutError:
+                raise RegexTimeout()
+        return self.pattern.findall(text)
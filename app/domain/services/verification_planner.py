@@ -0,0 +1,45 @@
+# domain/services/verification_planner.py
+import logging
+from typing import List, Tuple
+from app.domain.entities import (VerificationMethod, VerificationMethodType, VerificationMethodMode,
+                                 VerificationProcess, ConsensusMode)
+
+logger = logging.getLogger(__name__)
+
+# Relative cost of one LLM forward pass compared to one embedding forward pass
+LLM_FORWARD_COST = 10.0
+
+class VerificationPlanner:
+    def estimate_cost(self, method: VerificationMethod) -> float:
+        # Rough cost in embedding-forward-pass units; only the relative order matters.
+        if method.method_type == VerificationMethodType.EMBEDDING:
+            return 1.0
+        cs = method.consensus_settings
+        if cs is None:
+            return LLM_FORWARD_COST
+        if cs.mode == ConsensusMode.LOGPROB:
+            return LLM_FORWARD_COST
+        return LLM_FORWARD_COST * cs.num_responses * cs.max_new_tokens
+
+    def plan(self, process: VerificationProcess) -> Tuple[List[VerificationMethod], List[VerificationMethod]]:
+        # 'eliminatorio' methods come first, cheapest first, so a cheap rejection skips expensive
+        # methods. 'acumulativo' methods follow, also cheapest first. Any failed 'eliminatorio'
+        # discards the result wherever it appears in the process, so this does not change the
+        # final status.
+        eliminatorios = sorted((m for m in process.methods if m.mode == VerificationMethodMode.ELIMINATORIO),
+                               key=self.estimate_cost)
+        acumulativos = sorted((m for m in process.methods if m.mode == VerificationMethodMode.ACUMULATIVO),
+                              key=self.estimate_cost)
+        logger.debug(f"Planned eliminatorios: {[m.name for m in eliminatorios]}, "
+                     f"acumulativos: {[m.name for m in acumulativos]}")
+        return eliminatorios, acumulativos
+
+    def outcome_decided(self, acumulativos_superados: int, pending_acumulativos: int, process: VerificationProcess) -> bool:
+        # Once every 'eliminatorio' has passed, the status only depends on the acumulativo count.
+        # It is decided when the pending methods can no longer move it to another status.
+        best_case = acumulativos_superados + pending_acumulativos
+        if acumulativos_superados >= process.required_for_confirmed:
+            return True
+        if best_case < process.required_for_review:
+            return True
+        return acumulativos_superados >= process.required_for_review and best_case < process.required_for_confirmed
@@ -1,25 +1,114 @@
 # domain/services/verifier_service.py
 import logging
-from app.domain.entities import VerificationMethod, VerificationMethodType
+import math
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.domain.entities import (VerificationMethod, VerificationMethodType, VerificationProcess,
+                                 ConsensusMode, ConsensusVerificationSettings, EmbeddingAggregation,
+                                 EmbeddingVerificationSettings)
 
 logger = logging.getLogger(__name__)
 
+def _logsumexp(values: List[float]) -> float:
+    top = max(values)
+    if top == float("-inf"):
+        return top
+    return top + math.log(sum(math.exp(v - top) for v in values))
+
+def _aggregate_similarities(sims: np.ndarray, es: EmbeddingVerificationSettings) -> np.ndarray:
+    # (responses, references) similarities -> one similarity per response.
+    if es.aggregation == EmbeddingAggregation.MEAN:
+        return sims.mean(axis=1)
+    if es.aggregation == EmbeddingAggregation.TOP_K and es.top_k > 1:
+        k = min(es.top_k, sims.shape[1])
+        return np.partition(sims, sims.shape[1] - k, axis=1)[:, sims.shape[1] - k:].mean(axis=1)
+    return sims.max(axis=1)
+
 class VerifierService:
     def __init__(self):
         logger.info("VerifierService initialized")
 
-    def verify_embedding_method(self, method: VerificationMethod, get_similarity, response: str) -> bool:
+    def verify_embedding_method(self, method: VerificationMethod, get_similarity, response: str,
+                                similarity_matrix=None) -> bool:
         logger.info(f"Verifying embedding method with response: {response}")
-        sim = get_similarity(method.embedding_settings.reference_text, response)
+        es = method.embedding_settings
+        if similarity_matrix is not None:
+            # One product of the response vector with the (cached) reference matrix.
+            sim = float(_aggregate_similarities(similarity_matrix([response], es.references), es)[0])
+        elif len(es.references) == 1:
+            sim = get_similarity(es.references[0], response)
+        else:
+            sims = np.array([[get_similarity(reference, response) for reference in es.references]])
+            sim = float(_aggregate_similarities(sims, es)[0])
         low = method.embedding_settings.lower_threshold
         up = method.embedding_settings.upper_threshold
         result = (sim > low) and (sim < up)
         logger.debug(f"Similarity: {sim}, Lower Threshold: {low}, Upper Threshold: {up}, Result: {result}")
         return result
 
-    def verify_consensus_method(self, method: VerificationMethod, generate_responses, entries) -> bool:
+    def verify_embedding_method_batch(self, method: VerificationMethod, similarity_matrix, responses: List[str]) -> List[bool]:
+        logger.info(f"Verifying embedding method in batch with {len(responses)} responses")
+        if not responses:
+            return []
+        sims = _aggregate_similarities(similarity_matrix(responses, method.embedding_settings.references),
+                                       method.embedding_settings)
+        low = method.embedding_settings.lower_threshold
+        up = method.embedding_settings.upper_threshold
+        results = [bool(sim > low and sim < up) for sim in sims]
+        logger.debug(f"Lower Threshold: {low}, Upper Threshold: {up}, Passed: {sum(results)}/{len(results)}")
+        return results
+
+    def verify_consensus_method(self, method: VerificationMethod, generate_responses, entries, score_continuations=None,
+                                count_tokens=None, stats: Optional[Dict[str, Any]] = None) -> bool:
         logger.info(f"Verifying consensus method with entries: {entries}")
         cs = method.consensus_settings
+        prompts = self._fill_consensus_prompts(cs, entries)
+        if prompts is None:
+            return False
+        final_system, final_user = prompts
+
+        if cs.mode == ConsensusMode.LOGPROB:
+            return self._verify_consensus_logprob(cs, score_continuations, final_system, final_user)
+
+        # Responses are generated in batches and generation stops as soon as the outcome is
+        # decided: enough positives, or too few responses left to reach num_positive_required.
+        # Each sequence also stops as soon as it contains a positive response.
+        positives = 0
+        generated = 0
+        saved_tokens = 0
+        while positives < cs.num_positive_required and positives + (cs.num_responses - generated) >= cs.num_positive_required:
+            remaining = cs.num_responses - generated
+            # By default at least the positives still needed, and half of the remaining responses, so a
+            # check that keeps failing needs about log2(num_responses) batched calls rather than one per response.
+            needed = cs.num_positive_required - positives
+            batch_size = cs.batch_size or max(needed, math.ceil(remaining / 2))
+            batch_size = max(1, min(batch_size, remaining))
+            responses = generate_responses(final_system, final_user, batch_size, cs.max_new_tokens,
+                                           stop_sequences=cs.positive_responses)
+            if not responses:
+                break
+            generated += len(responses)
+            for r in responses:
+                if any(p.lower() in r.lower() for p in cs.positive_responses):
+                    positives += 1
+                    if count_tokens is not None:
+                        saved_tokens += max(0, cs.max_new_tokens - count_tokens(r))
+            logger.debug(f"Consensus batch of {batch_size}: {positives} positives after {generated} responses")
+
+        skipped = cs.num_responses - generated
+        saved_tokens += skipped * cs.max_new_tokens
+        result = positives >= cs.num_positive_required
+        logger.debug(f"Positive responses count: {positives}, Required: {cs.num_positive_required}, Result: {result}, "
+                     f"Skipped sequences: {skipped}, Saved tokens (estimate): {saved_tokens}")
+        if stats is not None:
+            stats.update({
+                "generated_sequences": generated,
+                "skipped_sequences": skipped,
+                "saved_tokens": saved_tokens
+            })
+        return result
+
+    def _fill_consensus_prompts(self, cs: ConsensusVerificationSettings, entries) -> Optional[Tuple[str, str]]:
         # Try to fill placeholders from entries
         placeholder_values = {}
         for ph in cs.placeholders:
@@ -31,16 +120,41 @@ class VerifierService:
                     break
             if not found:
                 logger.warning(f"Placeholder {ph} not found in entries")
-                return False
+                return None
 
         final_system = cs.system_prompt
         final_user = cs.user_prompt
         for ph, val in placeholder_values.items():
             final_system = final_system.replace("{" + ph + "}", val)
             final_user = final_user.replace("{" + ph + "}", val)
+        return final_system, final_user
 
-        responses = generate_responses(final_system, final_user, cs.num_responses, cs.max_new_tokens)
-        positives = sum(any(p.lower() in r.lower() for p in cs.positive_responses) for r in responses)
-        result = positives >= cs.num_positive_required
-        logger.debug(f"Positive responses count: {positives}, Required: {cs.num_positive_required}, Result: {result}")
-        return result
\ No newline at end of file
+    def _verify_consensus_logprob(self, cs: ConsensusVerificationSettings, score_continuations,
+                                  final_system: str, final_user: str) -> bool:
+        # Instead of sampling num_responses generations, score every positive and negative answer as a
+        # continuation of the prompt in one forward pass. The probability of the positives is normalized
+        # over all candidate answers (a softmax of their scores), which is why negatives are required: the
+        # raw mass of a few literal strings is tiny and says nothing about the threshold.
+        if score_continuations is None:
+            logger.error("Logprob consensus requires an LLM able to score continuations")
+            raise ValueError("Logprob consensus requires an LLM able to score continuations")
+        if not cs.positive_responses:
+            logger.warning("No positive responses defined for logprob consensus")
+            return False
+        if not cs.negative_responses:
+            logger.error("Logprob consensus requires negative_responses")
+            raise ValueError("Logprob consensus requires negative_responses")
+
+        scores = score_continuations(final_system, final_user, cs.positive_responses + cs.negative_responses,
+                                     cs.length_normalized)
+        probability = math.exp(_logsumexp(scores[:len(cs.positive_responses)]) - _logsumexp(scores))
+        result = probability >= cs.probability_threshold
+        logger.debug(f"Positive probability: {probability}, Threshold: {cs.probability_threshold}, Result: {result}")
+        return result
+
+    def resolve_final_status(self, acumulativos_superados: int, process: VerificationProcess) -> str:
+        if acumulativos_superados >= process.required_for_confirmed:
+            return "confirmada"
+        elif acumulativos_superados >= process.required_for_review:
+            return "a revisar"
+        return "descartada"
\ No newline at end of file
@@ -1,7 +1,39 @@
 # infrastructure/adapters/embeddings_service.py
 
+from typing import Optional
+from app.infrastructure import settings
 from app.infrastructure.embeddings.embedder_model import EmbedderModel
+from app.infrastructure.embeddings.embedding_cache import get_embedding_cache
+from app.infrastructure.embeddings.onnx_embedder_model import OnnxEmbedderModel
+from app.infrastructure.registry.model_registry import get_model_registry
+from app.infrastructure.registry.load_profiles import get_load_profile
+from app.infrastructure.remote.inference_client import RemoteEmbedder, get_inference_client
 from app.domain.ports.embeddings_port import EmbeddingsPort
 
-def get_embedder(model_name:str="sentence-transformers/all-MiniLM-L6-v2") -> EmbeddingsPort:
-    return EmbedderModel(model_name)
+def get_embedder(model_name:str="sentence-transformers/all-MiniLM-L6-v2", backend: Optional[str] = None) -> EmbeddingsPort:
+    # backend: 'torch' or 'onnx' (default EMBEDDER_BACKEND). Through the inference server, its own setting applies.
+    if settings.INFERENCE_SERVER_SOCKET:
+        return get_model_registry().get_or_load("embedder", model_name,
+                                                lambda: RemoteEmbedder(model_name, get_inference_client()))
+    return get_local_embedder(model_name, backend)
+
+def get_local_embedder(model_name:str="sentence-transformers/all-MiniLM-L6-v2", backend: Optional[str] = None) -> EmbeddingsPort:
+    backend = backend or settings.EMBEDDER_BACKEND
+    if backend not in ("torch", "onnx"):
+        raise ValueError(f"Unknown embedder backend '{backend}'; expected 'torch' or 'onnx'")
+    if backend == "onnx":
+        quantize = bool(settings.ONNX_EMBEDDER_QUANTIZE)
+        return get_model_registry().get_or_load(
+            "embedder", model_name,
+            lambda: OnnxEmbedderModel(model_name, get_embedding_cache(), settings.EMBEDDING_BATCH_SIZE,
+                                      settings.EMBEDDING_REFERENCE_SETS_CACHED, settings.ONNX_EMBEDDER_DIR, quantize,
+                                      settings.ONNX_EMBEDDER_THREADS),
+            {"backend": "onnx", "quantized": quantize}
+        )
+    profile = get_load_profile(settings.EMBEDDER_LOAD_PROFILE)
+    return get_model_registry().get_or_load(
+        "embedder", model_name,
+        lambda: EmbedderModel(model_name, get_embedding_cache(), settings.EMBEDDING_BATCH_SIZE,
+                              settings.EMBEDDING_REFERENCE_SETS_CACHED, profile),
+        {"profile": profile.name}
+    )
@@ -1,7 +1,40 @@
 # infrastructure/adapters/llm_service.py
 
+from typing import List, Optional
+from app.infrastructure import settings
+from app.infrastructure.llm.assisted_decoding import DraftModelLLM
 from app.infrastructure.llm.instruct_model import InstructModel
+from app.infrastructure.llm.batch_scheduler import BatchingLLM
+from app.infrastructure.llm.prefix_cache import get_prefix_cache
+from app.infrastructure.registry.model_registry import get_model_registry
+from app.infrastructure.registry.load_profiles import get_load_profile
+from app.infrastructure.remote.inference_client import RemoteLLM, get_inference_client
 from app.domain.ports.llm_port import LLMPort
+from app.domain.services.execution_planner import ExecutionPlanner
 
 def get_llm(model_name:str="EleutherAI/gpt-neo-125M") -> LLMPort:
-    return InstructModel(model_name)
+    # With INFERENCE_SERVER_SOCKET set, the model lives in the shared inference server process.
+    if settings.INFERENCE_SERVER_SOCKET:
+        return get_model_registry().get_or_load("llm", model_name, lambda: RemoteLLM(model_name, get_inference_client()))
+    return get_local_llm(model_name)
+
+def get_local_llm(model_name:str="EleutherAI/gpt-neo-125M") -> LLMPort:
+    profile = get_load_profile(settings.LLM_LOAD_PROFILE)
+    draft_model = settings.LLM_DRAFT_MODEL or None
+    return get_model_registry().get_or_load(
+        "llm", model_name,
+        lambda: BatchingLLM(InstructModel(model_name, get_prefix_cache(), profile, draft_model, settings.LLM_DRAFT_MODELS),
+                            settings.LLM_BATCH_MAX_SIZE, settings.LLM_BATCH_MAX_WAIT_MS,
+                            ExecutionPlanner(settings.GENERATION_MAX_SEQUENCES_PER_BATCH, settings.GENERATION_MAX_BATCH_TOKENS)),
+        {"profile": profile.name, "draft": draft_model}
+    )
+
+def allowed_draft_models() -> List[str]:
+    return ([settings.LLM_DRAFT_MODEL] if settings.LLM_DRAFT_MODEL else []) + settings.LLM_DRAFT_MODELS
+
+def with_draft_model(llm: LLMPort, draft_model: Optional[str]) -> LLMPort:
+    # Per-request draft model for assisted decoding; None keeps the deployment default (LLM_DRAFT_MODEL).
+    # Requests can only pick a configured draft, never download an arbitrary model.
+    if draft_model and draft_model not in allowed_draft_models():
+        raise ValueError(f"Draft model '{draft_model}' is not allowed; set LLM_DRAFT_MODEL or LLM_DRAFT_MODELS")
+    return llm if draft_model is None else DraftModelLLM(llm, draft_model)
@@ -0,0 +1,95 @@
+# infrastructure/embeddings/caching_embedder.py
+
+import threading
+from collections import OrderedDict
+import numpy as np
+from typing import Any, Dict, List, Optional
+from app.domain.ports.embeddings_port import EmbeddingsPort
+from app.infrastructure.embeddings.embedding_cache import EmbeddingCache, text_hash
+
+class CachingEmbedder(EmbeddingsPort):
+    # What every embedder backend shares: the embedding cache, cached reference matrices and
+    # length-sorted padded batches. Backends set tokenizer, dim and tensor_type, and implement
+    # _encode_batch (padded batch -> L2-normalized float32 vectors).
+    tensor_type = "np"
+
+    def __init__(self, model_name: str, cache: Optional[EmbeddingCache] = None, batch_size: int = 32,
+                 max_reference_sets: int = 64, cache_key: Optional[str] = None):
+        self.model_name = model_name
+        self.cache = cache
+        self.batch_size = batch_size
+        # Vectors from different backends or precisions differ slightly: each has its own cache entries.
+        self.cache_key = cache_key or model_name
+        # Stacked, read-only embedding matrices of recently used reference sets (LRU).
+        self.max_reference_sets = max_reference_sets
+        self._reference_sets: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._reference_lock = threading.Lock()
+        self.tokenizer: Any = None
+        self.dim = 0
+
+    def get_similarity(self, text1: str, text2:str) -> float:
+        embeddings = self.embed_many([text1, text2])
+        return float(np.dot(embeddings[0], embeddings[1]))
+
+    def similarity_matrix(self, queries: List[str], references: List[str]) -> np.ndarray:
+        query_embeddings = self.embed_many(queries)
+        reference_embeddings = self.reference_matrix(references)
+        return np.ascontiguousarray(query_embeddings @ reference_embeddings.T)
+
+    def reference_matrix(self, references: List[str]) -> np.ndarray:
+        # Large reference sets are reused by every check of a method: keeping the stacked matrix
+        # avoids a cache lookup and a copy per reference on each call.
+        key = text_hash("\x00".join(references)) + f":{len(references)}"
+        with self._reference_lock:
+            matrix = self._reference_sets.get(key)
+            if matrix is not None:
+                self._reference_sets.move_to_end(key)
+                return matrix
+        matrix = self.embed_many(references)
+        matrix.setflags(write=False)
+        if self.max_reference_sets > 0:
+            with self._reference_lock:
+                self._reference_sets[key] = matrix
+                while len(self._reference_sets) > self.max_reference_sets:
+                    self._reference_sets.popitem(last=False)
+        return matrix
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        vectors: Dict[str, np.ndarray] = {}
+        missing = []
+        for text in dict.fromkeys(texts):
+            cached = self.cache.get(self.cache_key, text) if self.cache is not None else None
+            if cached is not None:
+                vectors[text] = cached
+            else:
+                missing.append(text)
+
+        if missing:
+            encoded = self._encode_texts(missing)
+            for text, vector in zip(missing, encoded):
+                vectors[text] = vector
+            if self.cache is not None:
+                self.cache.put_many(self.cache_key, list(zip(missing, encoded)))
+
+        result = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            result[i] = vectors[text]
+        return result
+
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        # Sort by token length so each padded batch holds sequences of similar length.
+        encoded = self.tokenizer(texts, max_length=512, truncation=True)
+        order = sorted(range(len(texts)), key=lambda i: len(encoded["input_ids"][i]))
+        result = np.empty((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            bucket = order[start:start + self.batch_size]
+            batch = self.tokenizer.pad(
+                {key: [encoded[key][i] for i in bucket] for key in encoded.keys()},
+                padding=True,
+                return_tensors=self.tensor_type
+            )
+            result[bucket] = self._encode_batch(batch)
+        return result
+
+    def _encode_batch(self, batch) -> np.ndarray:
+        raise NotImplementedError
@@ -1,25 +1,33 @@
 # infrastructure/embeddings/embedder_model.py
 
+import numpy as np
 import torch
 import torch.nn.functional as F
 from transformers import AutoModel, AutoTokenizer
-from app.domain.ports.embeddings_port import EmbeddingsPort
+from typing import Optional
+from app.infrastructure.embeddings.caching_embedder import CachingEmbedder
+from app.infrastructure.embeddings.embedding_cache import EmbeddingCache
+from app.infrastructure.registry.load_profiles import LoadProfile, get_load_profile
 
-class EmbedderModel(EmbeddingsPort):
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+class EmbedderModel(CachingEmbedder):
+    tensor_type = "pt"
+
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", cache: Optional[EmbeddingCache] = None,
+                 batch_size: int = 32, max_reference_sets: int = 64, load_profile: Optional[LoadProfile] = None):
+        self.load_profile = load_profile or get_load_profile("default")
+        cache_key = model_name if self.load_profile.name == "default" else f"{model_name}#{self.load_profile.name}"
+        super().__init__(model_name, cache, batch_size, max_reference_sets, cache_key)
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModel.from_pretrained(model_name)
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        self.model.to(self.device)
+        self.model = self.load_profile.load(AutoModel, model_name, self.device)
+        self.dim = self.model.config.hidden_size
 
-    def get_similarity(self, text1: str, text2:str) -> float:
-        emb1 = self._get_embedding(text1)
-        emb2 = self._get_embedding(text2)
-        return (emb1 @ emb2.T).item()
+    def memory_footprint(self) -> int:
+        return self.model.get_memory_footprint()
 
-    def _get_embedding(self, text: str) -> torch.Tensor:
-        tokens = self.tokenizer(text, max_length=512, padding=True, truncation=True, return_tensors='pt').to(self.device)
-        with torch.no_grad():
-            output = self.model(**tokens)
-        embedding = F.normalize(output.last_hidden_state[:, 0], p=2, dim=1)
-        return embedding
+    def _encode_batch(self, batch) -> np.ndarray:
+        batch = batch.to(self.device)
+        with torch.inference_mode():
+            output = self.model(**batch)
+            embeddings = F.normalize(output.last_hidden_state[:, 0], p=2, dim=1)
+        return embeddings.float().cpu().numpy()
@@ -0,0 +1,204 @@
+# infrastructure/embeddings/embedding_cache.py
+
+import fcntl
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.infrastructure import settings
+
+logger = logging.getLogger(__name__)
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class _DiskVectorStore:
+    # One directory per model: 'vectors.npy' is a memory-mapped (capacity, dim) float32 matrix
+    # and 'index.tsv' is an append-only "<text hash>\t<row>" log mapping hashes to rows.
+    # Several processes (e.g. uvicorn workers) can share a directory: writers hold an exclusive
+    # flock on 'lock' and catch up with the index tail first, so rows are allocated from what every
+    # process has appended, and the file is only replaced (when it grows) under that lock.
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, "vectors.npy")
+        self.index_path = os.path.join(directory, "index.tsv")
+        self.lock_path = os.path.join(directory, "lock")
+        self.index: Dict[str, int] = {}
+        self.vectors: Optional[np.memmap] = None
+        # Next free row and how much of index.tsv has been read.
+        self.rows = 0
+        self._index_offset = 0
+        self._vectors_inode: Optional[int] = None
+        # flock excludes other processes; this lock excludes the threads of this one.
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._refresh()
+        logger.info(f"Loaded {len(self.index)} cached embeddings from {directory}")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self.index.get(key)
+            if row is None:
+                # Another process may have added it since the last read of the index.
+                self._refresh()
+                row = self.index.get(key)
+                if row is None:
+                    return None
+            return np.array(self.vectors[row], dtype=np.float32)
+
+    def put_many(self, items: List[Tuple[str, np.ndarray]]) -> None:
+        with self._lock:
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._refresh()
+                    new = [(key, vector) for key, vector in dict(items).items() if key not in self.index]
+                    if not new:
+                        return
+                    first = self.rows
+                    self._ensure_capacity(first + len(new), new[0][1].shape[0])
+                    for offset, (_, vector) in enumerate(new):
+                        self.vectors[first + offset] = vector
+                    self.vectors.flush()
+                    # The rows are written before the index lines, so a crash never indexes a missing vector.
+                    with open(self.index_path, "a", encoding="utf-8") as f:
+                        f.write("".join(f"{key}\t{first + offset}\n" for offset, (key, _) in enumerate(new)))
+                    self._refresh()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        # Reopens the matrix if another process replaced it and reads index lines appended since the last call.
+        if os.path.exists(self.vectors_path):
+            inode = os.stat(self.vectors_path).st_ino
+            if inode != self._vectors_inode:
+                self.vectors = np.load(self.vectors_path, mmap_mode="r+")
+                self._vectors_inode = inode
+        if self.vectors is None or not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_offset)
+            tail = f.read()
+        for line in tail.splitlines(keepends=True):
+            parts = line.decode("utf-8").rstrip("\n").split("\t")
+            # A line still being appended, or a row of a matrix grown after it was opened above, is read on a later call.
+            if not line.endswith(b"\n") or (len(parts) == 2 and int(parts[1]) >= self.vectors.shape[0]):
+                break
+            self._index_offset += len(line)
+            if len(parts) == 2:
+                self.index[parts[0]] = int(parts[1])
+                self.rows = max(self.rows, int(parts[1]) + 1)
+
+    def _ensure_capacity(self, rows: int, dim: int) -> None:
+        if self.vectors is not None and self.vectors.shape[1] != dim:
+            raise ValueError(f"Embedding dimension {dim} does not match cached dimension {self.vectors.shape[1]}")
+        capacity = self.vectors.shape[0] if self.vectors is not None else 0
+        if rows <= capacity:
+            return
+        new_capacity = max(self.INITIAL_CAPACITY, capacity * 2, rows)
+        tmp_path = f"{self.vectors_path}.{os.getpid()}.tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(new_capacity, dim))
+        if self.vectors is not None:
+            grown[:capacity] = self.vectors[:capacity]
+        grown.flush()
+        del grown
+        # Processes that still map the old file keep reading valid rows from it until their next refresh.
+        os.replace(tmp_path, self.vectors_path)
+        self._refresh()
+
+class EmbeddingCache:
+    def __init__(self, max_entries: int = 10000, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._memory: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._disk_stores: Dict[str, _DiskVectorStore] = {}
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        logger.info(f"EmbeddingCache initialized with max_entries: {max_entries}, disk_dir: {disk_dir}")
+
+    def get(self, model_name: str, text: str) -> Optional[np.ndarray]:
+        key = text_hash(text)
+        with self._lock:
+            vector = self._memory.get((model_name, key))
+            if vector is not None:
+                self._memory.move_to_end((model_name, key))
+                self.memory_hits += 1
+                return vector
+            store = self._disk_store(model_name)
+        # Disk reads and writes hold the store's own locks, not this one.
+        vector = store.get(key) if store is not None else None
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+                return None
+            self._remember(model_name, key, vector)
+            self.disk_hits += 1
+            return vector
+
+    def put(self, model_name: str, text: str, vector: np.ndarray) -> None:
+        self.put_many(model_name, [(text, vector)])
+
+    def put_many(self, model_name: str, items: List[Tuple[str, np.ndarray]]) -> None:
+        # One disk write (and one flush) for the whole batch.
+        entries = [(text_hash(text), np.ascontiguousarray(vector, dtype=np.float32).reshape(-1)) for text, vector in items]
+        with self._lock:
+            for key, vector in entries:
+                self._remember(model_name, key, vector)
+            store = self._disk_store(model_name)
+        if store is not None and entries:
+            store.put_many(entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_entries": sum(len(s.index) for s in self._disk_stores.values()),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    def _remember(self, model_name: str, key: str, vector: np.ndarray) -> None:
+        if self.max_entries <= 0:
+            return
+        self._memory[(model_name, key)] = vector
+        self._memory.move_to_end((model_name, key))
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_store(self, model_name: str) -> Optional[_DiskVectorStore]:
+        if not self.disk_dir:
+            return None
+        store = self._disk_stores.get(model_name)
+        if store is None:
+            safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+            store = _DiskVectorStore(os.path.join(self.disk_dir, safe_name))
+            self._disk_stores[model_name] = store
+        return store
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(settings.EMBEDDING_CACHE_MAX_ENTRIES, settings.EMBEDDING_CACHE_DIR or None)
+    return _cache
@@ -0,0 +1,103 @@
+# infrastructure/embeddings/onnx_embedder_model.py
+
+import inspect
+import logging
+import os
+import re
+import threading
+import numpy as np
+from typing import Optional
+from transformers import AutoConfig, AutoTokenizer
+from app.infrastructure.embeddings.caching_embedder import CachingEmbedder
+from app.infrastructure.embeddings.embedding_cache import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+_export_lock = threading.Lock()
+
+def export_onnx(model_name: str, directory: str, quantize: bool = True) -> str:
+    # Exports the encoder (last_hidden_state) to '<directory>/<model>/model.onnx' and, with quantize,
+    # its dynamically int8-quantized copy 'model.int8.onnx'. Existing files are reused, so only the
+    # first start pays for the export (which needs torch; running the exported graph does not).
+    target_dir = os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name))
+    fp32_path = os.path.join(target_dir, "model.onnx")
+    int8_path = os.path.join(target_dir, "model.int8.onnx")
+    path = int8_path if quantize else fp32_path
+    with _export_lock:
+        if os.path.exists(path):
+            return path
+        os.makedirs(target_dir, exist_ok=True)
+        if not os.path.exists(fp32_path):
+            import torch
+            from transformers import AutoModel
+
+            tokenizer = AutoTokenizer.from_pretrained(model_name)
+            model = AutoModel.from_pretrained(model_name).eval()
+            sample = tokenizer(["an example sentence", "another one"], padding=True, return_tensors="pt")
+            names = list(sample.keys())
+
+            class _LastHiddenState(torch.nn.Module):
+                def __init__(self):
+                    super().__init__()
+                    self.model = model
+
+                def forward(self, *inputs):
+                    return self.model(**dict(zip(names, inputs))).last_hidden_state
+
+            logger.info(f"Exporting '{model_name}' to ONNX at {fp32_path}")
+            tmp_path = fp32_path + ".tmp"
+            # The TorchScript exporter (dynamo=False where torch has the newer exporter) takes dynamic_axes.
+            legacy = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+            with torch.inference_mode():
+                torch.onnx.export(
+                    _LastHiddenState(), tuple(sample[name] for name in names), tmp_path,
+                    input_names=names, output_names=["last_hidden_state"],
+                    dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in names},
+                                  "last_hidden_state": {0: "batch", 1: "sequence"}},
+                    opset_version=14, **legacy
+                )
+            os.replace(tmp_path, fp32_path)
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            logger.info(f"Quantizing '{model_name}' to int8 at {int8_path}")
+            tmp_path = int8_path + ".tmp"
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+    return path
+
+class OnnxEmbedderModel(CachingEmbedder):
+    # Same embeddings as EmbedderModel (CLS token, L2-normalized), computed by ONNX Runtime on CPU
+    # from an exported, optionally int8-quantized graph.
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", cache: Optional[EmbeddingCache] = None,
+                 batch_size: int = 32, max_reference_sets: int = 64, directory: str = "onnx_models",
+                 quantize: bool = True, num_threads: int = 0):
+        if ort is None:
+            raise RuntimeError("The ONNX embedder backend requires onnxruntime (pip install onnxruntime)")
+        super().__init__(model_name, cache, batch_size, max_reference_sets,
+                         f"{model_name}#onnx-int8" if quantize else f"{model_name}#onnx")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.path = export_onnx(model_name, directory, quantize)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.dim = AutoConfig.from_pretrained(model_name).hidden_size
+        logger.info(f"OnnxEmbedderModel loaded {self.path} (dim {self.dim})")
+
+    def memory_footprint(self) -> int:
+        return os.path.getsize(self.path)
+
+    def _encode_batch(self, batch) -> np.ndarray:
+        feed = {name: np.asarray(batch[name], dtype=np.int64) for name in self.input_names}
+        hidden = self.session.run(None, feed)[0]
+        embeddings = hidden[:, 0].astype(np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
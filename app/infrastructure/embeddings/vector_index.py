@@ -0,0 +1,70 @@
+# infrastructure/embeddings/vector_index.py
+
+import logging
+from typing import Tuple
+import numpy as np
+from app.domain.ports.vector_index_port import VectorIndexPort
+from app.infrastructure import settings
+
+logger = logging.getLogger(__name__)
+
+# Optional approximate index (faiss-cpu). Without it every search is a matrix product over all vectors.
+try:
+    import faiss as _faiss
+except ImportError:
+    _faiss = None
+
+class ExactVectorIndex(VectorIndexPort):
+    # Vectors kept in one float32 matrix whose capacity doubles, so adding stays amortized O(1).
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._vectors = np.empty((64, dim), dtype=np.float32)
+        self._size = 0
+
+    def add(self, vectors: np.ndarray) -> None:
+        needed = self._size + len(vectors)
+        if needed > len(self._vectors):
+            grown = np.empty((max(needed, 2 * len(self._vectors)), self.dim), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+        self._vectors[self._size:needed] = vectors
+        self._size = needed
+
+    def search(self, queries: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        if self._size == 0:
+            return scores, ids
+        sims = queries @ self._vectors[:self._size].T
+        found = min(k, self._size)
+        top = np.argsort(-sims, axis=1)[:, :found]
+        scores[:, :found] = np.take_along_axis(sims, top, axis=1)
+        ids[:, :found] = top
+        return scores, ids
+
+    def __len__(self) -> int:
+        return self._size
+
+class HNSWVectorIndex(VectorIndexPort):
+    # faiss HNSW graph: logarithmic search instead of a scan over every stored vector.
+    def __init__(self, dim: int, m: int = 32):
+        self.index = _faiss.IndexHNSWFlat(dim, m, _faiss.METRIC_INNER_PRODUCT)
+
+    def add(self, vectors: np.ndarray) -> None:
+        self.index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+
+    def search(self, queries: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        scores, ids = self.index.search(np.ascontiguousarray(queries, dtype=np.float32), k)
+        return scores, ids.astype(np.int64)
+
+    def __len__(self) -> int:
+        return self.index.ntotal
+
+def create_vector_index(dim: int) -> VectorIndexPort:
+    # DEDUP_VECTOR_INDEX: 'hnsw' needs faiss, 'exact' never uses it, 'auto' uses it when installed.
+    kind = settings.DEDUP_VECTOR_INDEX
+    if kind == "hnsw" or (kind == "auto" and _faiss is not None):
+        if _faiss is None:
+            raise RuntimeError("DEDUP_VECTOR_INDEX=hnsw requires faiss (pip install faiss-cpu)")
+        return HNSWVectorIndex(dim, settings.DEDUP_HNSW_M)
+    return ExactVectorIndex(dim)
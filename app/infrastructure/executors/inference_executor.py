@@ -0,0 +1,151 @@
+# infrastructure/executors/inference_executor.py
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.infrastructure import settings
+
+logger = logging.getLogger(__name__)
+
+class InferenceRejected(Exception):
+    pass
+
+class InferenceQueueFull(InferenceRejected):
+    pass
+
+class InferenceDeadlineExceeded(InferenceRejected):
+    pass
+
+class InferenceExecutor:
+    # Runs model calls on a fixed number of threads, so concurrent requests queue here instead of
+    # contending for the same cores. Submissions beyond max_queue waiting tasks are rejected
+    # (0 = unbounded), and a task whose deadline passes while it waits is dropped without running.
+    # Open streams run elsewhere (on the model's batcher worker) but count against max_queue too.
+    WAIT_WINDOW = 1000
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 16):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._expired = 0
+        self._cancelled = 0
+        self._streams = 0
+        # Queue wait (ms) of the most recent tasks that started.
+        self._waits: "deque[float]" = deque(maxlen=self.WAIT_WINDOW)
+        logger.info(f"InferenceExecutor initialized with max_workers: {self.max_workers}, max_queue: {max_queue}")
+
+    def open_stream(self) -> Callable[[], None]:
+        # For work that does not go through submit (streams): admits it like a queued task and holds its
+        # place until the returned release function is called (calling it again does nothing).
+        with self._lock:
+            self._check_admission()
+            self._streams += 1
+        released = threading.Event()
+
+        def release() -> None:
+            with self._lock:
+                if not released.is_set():
+                    released.set()
+                    self._streams -= 1
+
+        return release
+
+    def _check_admission(self) -> None:
+        if self.max_queue > 0 and self._queued + self._streams >= self.max_queue:
+            self._rejected += 1
+            raise InferenceQueueFull(f"Inference queue is full ({self._queued} waiting, {self._streams} streams)")
+
+    def submit(self, fn: Callable[..., Any], *args: Any, deadline: Optional[float] = None) -> Future:
+        # 'deadline' is a time.monotonic() value. The check and the increment share the lock, so
+        # concurrent submits cannot exceed max_queue.
+        with self._lock:
+            self._check_admission()
+            self._queued += 1
+        enqueued = time.monotonic()
+
+        def task() -> Any:
+            started = time.monotonic()
+            with self._lock:
+                self._queued -= 1
+                self._waits.append((started - enqueued) * 1000)
+                if deadline is not None and started >= deadline:
+                    self._expired += 1
+                    raise InferenceDeadlineExceeded("Request deadline expired while waiting for inference")
+                self._running += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        future = self._pool.submit(task)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        # A future can only be cancelled before its task starts: it leaves the queue here.
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+                self._cancelled += 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        # 'timeout' bounds the queue wait only: a task still waiting after it is cancelled, while one
+        # that already started is awaited to the end, since its result would otherwise be thrown away
+        # after occupying a worker anyway. A request cancelled by its client cancels a queued task.
+        deadline = time.monotonic() + timeout if timeout else None
+        future = self.submit(fn, *args, deadline=deadline)
+        waiter = asyncio.wrap_future(future)
+        try:
+            done, _ = await asyncio.wait({waiter}, timeout=timeout or None)
+            if not done and future.cancel():
+                raise InferenceDeadlineExceeded(f"Request waited more than {timeout:.1f}s for inference")
+            return await waiter
+        except asyncio.CancelledError:
+            # asyncio.wait does not cancel what it waits for: without this the task would still run.
+            future.cancel()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "streams": self._streams,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "expired": self._expired,
+                "cancelled": self._cancelled,
+                "wait_ms": {
+                    "samples": len(waits),
+                    "mean": sum(waits) / len(waits) if waits else 0.0,
+                    "p50": waits[len(waits) // 2] if waits else 0.0,
+                    "p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                    "max": waits[-1] if waits else 0.0
+                }
+            }
+
+_executor: Optional[InferenceExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_inference_executor() -> InferenceExecutor:
+    # Shared by every route that runs a model.
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = InferenceExecutor(settings.INFERENCE_MAX_WORKERS, settings.INFERENCE_MAX_QUEUE)
+    return _executor
@@ -0,0 +1,56 @@
+# infrastructure/executors/parse_pool.py
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.domain.entities import ParseConfiguration
+from app.domain.services.parse_service import ParseService
+from app.infrastructure import settings
+
+logger = logging.getLogger(__name__)
+
+ChunkResult = List[Tuple[Optional[List[Dict[str, str]]], Optional[str], Dict[str, Any]]]
+
+# Per worker process state, created on the first chunk the worker receives.
+_worker_service: Optional[ParseService] = None
+
+def _parse_chunk(texts: List[str], config: ParseConfiguration) -> ChunkResult:
+    global _worker_service
+    if _worker_service is None:
+        # Workers only log warnings and errors; the parent already logs the request.
+        logging.getLogger().setLevel(logging.WARNING)
+        _worker_service = ParseService(rule_timeout_ms=settings.PARSE_REGEX_RULE_TIMEOUT_MS,
+                                       total_timeout_ms=settings.PARSE_REGEX_TOTAL_TIMEOUT_MS,
+                                       linear_engine=bool(settings.PARSE_REGEX_LINEAR_ENGINE))
+    # The worker's plan cache is keyed by configuration, so each configuration is compiled once per worker.
+    return _worker_service.parse_many(texts, config)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    # Shared by every bulk parse, so concurrent requests cannot add processes beyond PARSE_MAX_WORKERS.
+    # Workers come from a forkserver: forking the multithreaded API process could copy locks held by
+    # its model, batcher and executor threads into the children.
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=settings.PARSE_MAX_WORKERS or os.cpu_count() or 1,
+                                            mp_context=multiprocessing.get_context("forkserver"))
+    return _pool
+
+def parse_chunks_in_processes(chunks: List[List[str]], config: ParseConfiguration) -> Iterator[ChunkResult]:
+    # Every task carries the configuration along with its texts. Results are yielded in chunk order.
+    logger.info(f"Parsing {len(chunks)} chunks on the shared worker processes")
+    futures = [get_parse_pool().submit(_parse_chunk, chunk, config) for chunk in chunks]
+    try:
+        for future in futures:
+            yield future.result()
+    finally:
+        # Also reached when the consumer stops early (e.g. a client disconnecting from a stream).
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,20 @@
+# infrastructure/executors/pipeline_executor.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from app.infrastructure import settings
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_pipeline_executor() -> ThreadPoolExecutor:
+    # Parses and verifies pipeline results while generation continues. Kept apart from the
+    # verification pool, which these tasks wait on.
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=settings.PIPELINE_MAX_WORKERS,
+                                               thread_name_prefix="pipeline")
+    return _executor
@@ -0,0 +1,19 @@
+# infrastructure/executors/verification_executor.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from app.infrastructure import settings
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_verification_executor() -> ThreadPoolExecutor:
+    # Shared pool that runs independent verification methods concurrently.
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=settings.VERIFICATION_MAX_WORKERS,
+                                               thread_name_prefix="verification")
+    return _executor
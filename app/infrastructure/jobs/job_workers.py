@@ -0,0 +1,67 @@
+# infrastructure/jobs/job_workers.py
+
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class JobWorkerPool:
+    # Local worker threads that keep calling run_next (claim a job and run it) until it finds
+    # nothing to do, then sleep until notified or until the next poll. A separate thread calls
+    # heartbeat every heartbeat_interval_ms, also while the workers are busy with long units.
+    # run_next receives a should_stop callable that turns true once stop() is called.
+    def __init__(self, run_next: Callable[[Callable[[], bool]], bool], num_workers: int = 1, poll_interval_ms: int = 1000,
+                 heartbeat: Optional[Callable[[], None]] = None, heartbeat_interval_ms: int = 10000):
+        self.run_next = run_next
+        self.num_workers = max(1, num_workers)
+        self.poll_interval_s = poll_interval_ms / 1000.0
+        self.heartbeat = heartbeat
+        self.heartbeat_interval_s = heartbeat_interval_ms / 1000.0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        for i in range(self.num_workers):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        if self.heartbeat is not None:
+            thread = threading.Thread(target=self._run_heartbeat, name="job-heartbeat", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"JobWorkerPool started with {self.num_workers} workers")
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        # Waits up to timeout seconds (None = no wait) for the threads to finish their current unit;
+        # False if some are still running. The heartbeat stops too, so a job left running is
+        # re-queued by another process once it goes stale.
+        self._stopped.set()
+        self._wakeup.set()
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+            for thread in self._threads:
+                thread.join(max(0.0, deadline - time.monotonic()))
+        return not any(thread.is_alive() for thread in self._threads)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                if self.run_next(self._stopped.is_set):
+                    continue
+            except Exception as e:
+                logger.exception(f"Job worker error: {str(e)}")
+            self._wakeup.wait(self.poll_interval_s)
+            self._wakeup.clear()
+
+    def _run_heartbeat(self) -> None:
+        while not self._stopped.wait(self.heartbeat_interval_s):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                logger.exception(f"Job heartbeat error: {str(e)}")
@@ -0,0 +1,174 @@
+# infrastructure/jobs/sqlite_job_store.py
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from app.domain.entities import Job, JobStatus
+from app.domain.ports.job_store_port import JobStorePort
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total_units INTEGER NOT NULL,
+    completed_units INTEGER NOT NULL DEFAULT 0,
+    completed_items INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL,
+    item_index INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, item_index)
+);
+"""
+
+_COLUMNS = ("job_id, kind, payload, status, total_units, completed_units, completed_items, error, "
+            "cancel_requested, created_at, updated_at")
+
+def _to_job(row: sqlite3.Row) -> Job:
+    return Job(row["job_id"], row["kind"], json.loads(row["payload"]), JobStatus(row["status"]), row["total_units"],
+               row["completed_units"], row["completed_items"], row["error"], bool(row["cancel_requested"]),
+               row["created_at"], row["updated_at"])
+
+class SQLiteJobStore(JobStorePort):
+    # Queue and result store in one SQLite file. Each call uses its own connection, so the store
+    # can be shared by the API threads and the job workers, and by several processes: running jobs
+    # record the process that claimed them and its last heartbeat.
+    def __init__(self, path: str, owner: Optional[str] = None):
+        self.path = path
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # Files created before jobs had an owner.
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        logger.info(f"SQLiteJobStore initialized at {path} (owner {self.owner})")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, kind: str, payload: Dict[str, Any], total_units: int) -> Job:
+        now = time.time()
+        job = Job(uuid.uuid4().hex, kind, payload, JobStatus.QUEUED, total_units, created_at=now, updated_at=now)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, payload, status, total_units, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job.job_id, kind, json.dumps(payload), job.status.value, total_units, now, now)
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _to_job(row) if row is not None else None
+
+    def claim_next(self) -> Optional[Job]:
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE takes the write lock up front, so two workers never claim the same job.
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (JobStatus.QUEUED.value,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            conn.execute("UPDATE jobs SET status = ?, owner = ?, heartbeat_at = ?, updated_at = ? WHERE job_id = ?",
+                         (JobStatus.RUNNING.value, self.owner, now, now, row["job_id"]))
+        job = _to_job(row)
+        job.status = JobStatus.RUNNING
+        return job
+
+    def complete_unit(self, job_id: str, unit_index: int, results: List[Any]) -> None:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT completed_units, completed_items FROM jobs WHERE job_id = ? AND owner = ?",
+                               (job_id, self.owner)).fetchone()
+            if row is None or row["completed_units"] != unit_index:
+                # Already stored (or out of order), or the job was re-queued and now belongs to another
+                # process; storing it would duplicate results.
+                logger.warning(f"Ignoring results of unit {unit_index} for job {job_id}")
+                return
+            first = row["completed_items"]
+            conn.executemany("INSERT INTO job_results (job_id, item_index, data) VALUES (?, ?, ?)",
+                             [(job_id, first + i, json.dumps(r)) for i, r in enumerate(results)])
+            conn.execute(
+                "UPDATE jobs SET completed_units = completed_units + 1, completed_items = completed_items + ?, updated_at = ? WHERE job_id = ?",
+                (len(results), time.time(), job_id)
+            )
+
+    def finish(self, job_id: str, status: JobStatus, error: Optional[str] = None) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE job_id = ? AND owner = ?",
+                         (status.value, error, time.time(), job_id, self.owner))
+
+    def release(self, job_id: str) -> None:
+        with self._connect() as conn:
+            # As in requeue_running, a job whose cancellation was pending is not resumed.
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN cancel_requested THEN ? ELSE ? END, owner = NULL, updated_at = ? "
+                "WHERE job_id = ? AND status = ? AND owner = ?",
+                (JobStatus.CANCELLED.value, JobStatus.QUEUED.value, time.time(), job_id, JobStatus.RUNNING.value,
+                 self.owner)
+            )
+
+    def request_cancel(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Queued jobs are cancelled right away; running ones stop after their current unit.
+            conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+                         (JobStatus.CANCELLED.value, time.time(), job_id, JobStatus.QUEUED.value))
+            conn.execute("UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE job_id = ? AND status = ?",
+                         (time.time(), job_id, JobStatus.RUNNING.value))
+        return self.get(job_id)
+
+    def results(self, job_id: str, offset: int, limit: int) -> List[Any]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT data FROM job_results WHERE job_id = ? AND item_index >= ? ORDER BY item_index LIMIT ?",
+                (job_id, offset, limit)
+            ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def heartbeat(self) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE status = ? AND owner = ?",
+                                  (time.time(), JobStatus.RUNNING.value, self.owner))
+        return cursor.rowcount
+
+    def requeue_running(self, stale_after_s: float) -> int:
+        with self._connect() as conn:
+            # Only jobs whose owner stopped sending heartbeats; a job whose cancellation was pending is not resumed.
+            cursor = conn.execute(
+                "UPDATE jobs SET status = CASE WHEN cancel_requested THEN ? ELSE ? END, owner = NULL, updated_at = ? "
+                "WHERE status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (JobStatus.CANCELLED.value, JobStatus.QUEUED.value, time.time(), JobStatus.RUNNING.value,
+                 time.time() - stale_after_s)
+            )
+        return cursor.rowcount
@@ -0,0 +1,105 @@
+# infrastructure/llm/assisted_decoding.py
+
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.domain.ports.llm_port import LLMPort
+
+class ForwardCounter:
+    # Counts the forward passes a model makes in the current thread between start() and stop(),
+    # so concurrent generations on other threads do not disturb the count.
+    def __init__(self, model: Any):
+        self._local = threading.local()
+        model.register_forward_hook(self._hook)
+
+    def _hook(self, module: Any, args: Any, output: Any) -> None:
+        if getattr(self._local, "count", None) is not None:
+            self._local.count += 1
+
+    def start(self) -> None:
+        self._local.count = 0
+
+    def stop(self) -> int:
+        count, self._local.count = self._local.count, None
+        return count or 0
+
+class DecodingStats:
+    # Single-sequence decodes with and without a draft model, to compare their tokens per second.
+    # Each forward pass of the main model during assisted decoding yields the draft tokens it
+    # accepts plus one token of its own, so accepted = new tokens - main forward passes.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._modes = {mode: {"calls": 0, "new_tokens": 0, "seconds": 0.0} for mode in ("plain", "assisted")}
+        self._draft_tokens = 0
+        self._accepted_tokens = 0
+        self._fallbacks = 0
+        # Merged (multi-prompt) calls that could and could not reuse the prefix KV cache.
+        self._prefix_batches = {"cached": 0, "uncached": 0}
+
+    def record_plain(self, new_tokens: int, seconds: float) -> None:
+        with self._lock:
+            self._add("plain", new_tokens, seconds)
+
+    def record_assisted(self, new_tokens: int, seconds: float, draft_tokens: int, main_forwards: int) -> None:
+        with self._lock:
+            self._add("assisted", new_tokens, seconds)
+            self._draft_tokens += draft_tokens
+            self._accepted_tokens += max(0, new_tokens - main_forwards)
+
+    def record_fallback(self) -> None:
+        with self._lock:
+            self._fallbacks += 1
+
+    def record_prefix_batch(self, cached: bool) -> None:
+        with self._lock:
+            self._prefix_batches["cached" if cached else "uncached"] += 1
+
+    def _add(self, mode: str, new_tokens: int, seconds: float) -> None:
+        stats = self._modes[mode]
+        stats["calls"] += 1
+        stats["new_tokens"] += new_tokens
+        stats["seconds"] += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            result: Dict[str, Any] = {}
+            for mode, stats in self._modes.items():
+                tokens_per_second = stats["new_tokens"] / stats["seconds"] if stats["seconds"] > 0 else None
+                result[mode] = {**stats, "seconds": round(stats["seconds"], 3), "tokens_per_second": tokens_per_second}
+            plain, assisted = result["plain"]["tokens_per_second"], result["assisted"]["tokens_per_second"]
+            result["assisted"].update({
+                "draft_tokens": self._draft_tokens,
+                "accepted_tokens": self._accepted_tokens,
+                "acceptance_rate": self._accepted_tokens / self._draft_tokens if self._draft_tokens else None,
+                "speedup": assisted / plain if plain and assisted else None,
+                # Calls with a draft model that decoded without it (several prompts or sequences).
+                "fallbacks": self._fallbacks
+            })
+            result["prefix_cache_batches"] = dict(self._prefix_batches)
+            return result
+
+class DraftModelLLM(LLMPort):
+    # Passes a per-request draft model to generate calls ('' disables the deployment's default one).
+    def __init__(self, llm: LLMPort, draft_model: str):
+        self.llm = llm
+        self.draft_model = draft_model
+
+    def generate(self, system_prompt: str, user_prompt: str, num_responses:int=1, max_new_tokens:int=100,
+                 stop_sequences: Optional[List[str]] = None, draft_model: Optional[str] = None) -> List[str]:
+        return self.llm.generate(system_prompt, user_prompt, num_responses, max_new_tokens, stop_sequences,
+                                 self.draft_model if draft_model is None else draft_model)
+
+    def generate_batch(self, prompts: List[Tuple[str, str]], num_responses:int=1, max_new_tokens:int=100,
+                       stop_sequences: Optional[List[str]] = None, draft_model: Optional[str] = None) -> List[List[str]]:
+        return self.llm.generate_batch(prompts, num_responses, max_new_tokens, stop_sequences,
+                                       self.draft_model if draft_model is None else draft_model)
+
+    def count_tokens(self, text: str) -> int:
+        return self.llm.count_tokens(text)
+
+    def generate_stream(self, system_prompt: str, user_prompt: str, num_responses:int=1, max_new_tokens:int=100,
+                        cancel_event: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        return self.llm.generate_stream(system_prompt, user_prompt, num_responses, max_new_tokens, cancel_event)
+
+    def score_continuations(self, system_prompt: str, user_prompt: str, continuations: List[str],
+                            length_normalized: bool = False) -> List[float]:
+        return self.llm.score_continuations(system_prompt, user_prompt, continuations, length_normalized)
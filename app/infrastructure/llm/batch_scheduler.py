@@ -0,0 +1,227 @@
+# infrastructure/llm/batch_scheduler.py
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.domain.ports.llm_port import LLMPort
+from app.domain.services.execution_planner import ExecutionPlanner
+
+logger = logging.getLogger(__name__)
+
+class _PendingRequest:
+    def __init__(self, system_prompt: str, user_prompt: str, num_responses: int, max_new_tokens: int,
+                 stop_sequences: Optional[List[str]] = None, draft_model: Optional[str] = None):
+        self.system_prompt = system_prompt
+        self.user_prompt = user_prompt
+        self.num_responses = num_responses
+        self.max_new_tokens = max_new_tokens
+        self.stop_sequences = tuple(stop_sequences or ())
+        self.draft_model = draft_model
+        self.future: Future = Future()
+
+    def batch_key(self) -> Tuple:
+        # Only requests with the same sampling parameters can share a generate call.
+        return (self.num_responses, self.max_new_tokens, self.stop_sequences, self.draft_model)
+
+    def fail(self, error: Exception) -> None:
+        self.future.set_exception(error)
+
+class _PendingStream:
+    # A streamed generation run by the worker like any other request; its events reach the caller
+    # through a queue as ("event", event), then ("end", None) or ("error", exception).
+    def __init__(self, system_prompt: str, user_prompt: str, num_responses: int, max_new_tokens: int):
+        self.system_prompt = system_prompt
+        self.user_prompt = user_prompt
+        self.num_responses = num_responses
+        self.max_new_tokens = max_new_tokens
+        self.cancel_event = threading.Event()
+        self.events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+
+    def batch_key(self) -> Tuple:
+        # Never batched with anything else.
+        return ("stream", id(self))
+
+    def fail(self, error: Exception) -> None:
+        self.events.put(("error", error))
+
+class BatchingLLM(LLMPort):
+    # Collects concurrent generate calls during a short window and runs them as one
+    # left-padded batch on the wrapped model. A single worker thread owns the model.
+    # With a planner, merged calls respect the same per-call ceiling (sequences and sequences ×
+    # max_new_tokens) as the calls the planner sizes, so merging never exceeds its memory bound.
+    def __init__(self, llm: LLMPort, max_batch_size: int = 8, max_wait_ms: int = 10,
+                 planner: Optional[ExecutionPlanner] = None):
+        self.llm = llm
+        self.max_batch_size = max_batch_size
+        self.planner = planner
+        self.max_wait_s = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._closed = False
+        # Makes the closed check plus enqueue atomic with close(), so nothing lands after the sentinel.
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name=f"llm-batcher-{id(self)}", daemon=True)
+        self._worker.start()
+        logger.info(f"BatchingLLM initialized with max_batch_size: {max_batch_size}, max_wait_ms: {max_wait_ms}")
+
+    def memory_footprint(self) -> int:
+        return self.llm.memory_footprint()
+
+    def decoding_stats(self) -> Dict[str, Any]:
+        return self.llm.decoding_stats()
+
+    def count_tokens(self, text: str) -> int:
+        return self.llm.count_tokens(text)
+
+    def generate(self, system_prompt: str, user_prompt: str, num_responses:int=1, max_new_tokens:int=100,
+                 stop_sequences: Optional[List[str]] = None, draft_model: Optional[str] = None) -> List[str]:
+        request = _PendingRequest(system_prompt, user_prompt, num_responses, max_new_tokens, stop_sequences, draft_model)
+        if not self._enqueue([request]):
+            return self.llm.generate(system_prompt, user_prompt, num_responses, max_new_tokens, stop_sequences, draft_model)
+        return request.future.result()
+
+    def generate_batch(self, prompts: List[Tuple[str, str]], num_responses:int=1, max_new_tokens:int=100,
+                       stop_sequences: Optional[List[str]] = None, draft_model: Optional[str] = None) -> List[List[str]]:
+        requests = [_PendingRequest(s, u, num_responses, max_new_tokens, stop_sequences, draft_model) for s, u in prompts]
+        if not self._enqueue(requests):
+            return self.llm.generate_batch(prompts, num_responses, max_new_tokens, stop_sequences, draft_model)
+        return [request.future.result() for request in requests]
+
+    def _enqueue(self, requests: List[Any]) -> bool:
+        # False when the caller must run on the wrapped model itself (batching disabled or closed).
+        with self._lock:
+            if self._closed or self.max_batch_size <= 1:
+                return False
+            for request in requests:
+                self._queue.put(request)
+            return True
+
+    def generate_stream(self, system_prompt: str, user_prompt: str, num_responses:int=1, max_new_tokens:int=100,
+                        cancel_event: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        # Streams are not batched, but they still run on the worker, which owns the model: they take
+        # their turn between batched generate calls instead of decoding alongside them.
+        stream = _PendingStream(system_prompt, user_prompt, num_responses, max_new_tokens)
+        if not self._enqueue([stream]):
+            return self.llm.generate_stream(system_prompt, user_prompt, num_responses, max_new_tokens, cancel_event)
+        return self._consume_stream(stream, cancel_event)
+
+    def _consume_stream(self, stream: _PendingStream, cancel_event: Optional[threading.Event]) -> Iterator[Dict[str, Any]]:
+        try:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                try:
+                    kind, value = stream.events.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if kind == "end":
+                    return
+                if kind == "error":
+                    raise value
+                yield value
+        finally:
+            # Also reached when the consumer closes the generator early: the worker stops decoding.
+            stream.cancel_event.set()
+
+    def score_continuations(self, system_prompt: str, user_prompt: str, continuations: List[str],
+                            length_normalized: bool = False) -> List[float]:
+        # A single forward pass; nothing to gain from the generate batcher.
+        return self.llm.score_continuations(system_prompt, user_prompt, continuations, length_normalized)
+
+    def close(self) -> None:
+        # Requests already queued are still served; later ones bypass the batcher. The wrapped model is
+        # only closed once the worker has finished with them.
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        if threading.current_thread() is not self._worker:
+            self._worker.join()
+        close = getattr(self.llm, "close", None)
+        if callable(close):
+            close()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self.max_wait_s
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            groups: Dict[Tuple, List[Any]] = {}
+            for request in batch:
+                groups.setdefault(request.batch_key(), []).append(request)
+            for requests in groups.values():
+                if isinstance(requests[0], _PendingStream):
+                    self._run_stream(requests[0])
+                    continue
+                for chunk in self._split(requests):
+                    self._run_group(chunk)
+            if stop:
+                break
+        # Nothing is enqueued after the sentinel, but a request that still got there must not wait forever.
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                request.fail(RuntimeError("The batched model was closed"))
+
+    def _split(self, requests: List[_PendingRequest]) -> List[List[_PendingRequest]]:
+        # Requests of a group share num_responses and max_new_tokens. A request larger than the ceiling
+        # on its own (already sized by its caller) still runs, alone.
+        if self.planner is None:
+            return [requests]
+        first = requests[0]
+        per_call = max(1, self.planner.max_sequences_per_call(first.max_new_tokens) // first.num_responses)
+        return [requests[i:i + per_call] for i in range(0, len(requests), per_call)]
+
+    def _run_stream(self, stream: _PendingStream) -> None:
+        if stream.cancel_event.is_set():
+            # Abandoned while it waited for its turn.
+            stream.events.put(("end", None))
+            return
+        try:
+            for event in self.llm.generate_stream(stream.system_prompt, stream.user_prompt, stream.num_responses,
+                                                  stream.max_new_tokens, stream.cancel_event):
+                stream.events.put(("event", event))
+        except Exception as e:
+            logger.exception(f"Streamed generation failed: {str(e)}")
+            stream.events.put(("error", e))
+            return
+        stream.events.put(("end", None))
+
+    def _run_group(self, requests: List[_PendingRequest]) -> None:
+        first = requests[0]
+        logger.debug(f"Running batched generate with {len(requests)} prompts, num_responses: {first.num_responses}, "
+                     f"max_new_tokens: {first.max_new_tokens}")
+        try:
+            outputs = self.llm.generate_batch(
+                [(r.system_prompt, r.user_prompt) for r in requests], first.num_responses, first.max_new_tokens,
+                list(first.stop_sequences) or None, first.draft_model
+            )
+        except Exception as e:
+            logger.exception(f"Batched generation failed: {str(e)}")
+            for request in requests:
+                request.future.set_exception(e)
+            return
+        for request, responses in zip(requests, outputs):
+            request.future.set_result(responses)
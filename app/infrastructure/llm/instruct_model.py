@@ -1,18 +1,108 @@
 # infrastructure/llm/instruct_model.py
 
+import copy
+import logging
+import threading
+import time
+import uuid
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
-from typing import List, Optional
+from transformers import (AutoModelForCausalLM, AutoTokenizer, DynamicCache, StoppingCriteria, StoppingCriteriaList,
+                          TextIteratorStreamer)
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from app.domain.ports.llm_port import LLMPort
+from app.infrastructure.llm.assisted_decoding import DecodingStats, ForwardCounter
+from app.infrastructure.llm.prefix_cache import PrefixKVCache
+from app.infrastructure.registry.load_profiles import LoadProfile, get_load_profile
 import re
 
+logger = logging.getLogger(__name__)
+
+class _CancelledCriteria(StoppingCriteria):
+    # Stops every sequence of a generate call as soon as one of the events is set.
+    def __init__(self, *events: Optional[threading.Event]):
+        self.events = [e for e in events if e is not None]
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        cancelled = any(e.is_set() for e in self.events)
+        return torch.full((input_ids.shape[0],), cancelled, dtype=torch.bool, device=input_ids.device)
+
+class _StopSequencesCriteria(StoppingCriteria):
+    # Ends each sequence independently once its generated text contains one of the stop
+    # sequences (case-insensitive). EOS is already handled by generate itself.
+    # Only the tokens added since the previous call are decoded, plus enough earlier ones to hold a stop
+    # sequence that ends in them (a token has at least one character; a few more cover partial characters).
+    def __init__(self, tokenizer, prompt_length: int, stop_sequences: List[str]):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.stop_sequences = [s.lower() for s in stop_sequences if s]
+        self.window = max((len(s) for s in self.stop_sequences), default=0) + 4
+        self._checked_length = prompt_length
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        start = max(self.prompt_length, self._checked_length - self.window)
+        self._checked_length = input_ids.shape[1]
+        texts = self.tokenizer.batch_decode(input_ids[:, start:], skip_special_tokens=True)
+        done = [any(stop in text.lower() for stop in self.stop_sequences) for text in texts]
+        return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
+
 class InstructModel(LLMPort):
-    def __init__(self, model_name: str = "EleutherAI/gpt-neo-125M"):
+    def __init__(self, model_name: str = "EleutherAI/gpt-neo-125M", prefix_cache: Optional[PrefixKVCache] = None,
+                 load_profile: Optional[LoadProfile] = None, draft_model_name: Optional[str] = None,
+                 allowed_draft_models: Iterable[str] = ()):
+        self.model_name = model_name
+        self.prefix_cache = prefix_cache
+        # Prefix cache entries are this instance's: other registry variants of the same model (load profile,
+        # draft) keep theirs when this one is closed.
+        self.prefix_cache_owner = f"{model_name}#{uuid.uuid4().hex[:8]}"
+        # Cleared once the model turns out to return a cache the prefix cache cannot expand.
+        self._prefix_cache_supported = True
         self.instruct_mode = True if "instruct" in model_name.lower() else False
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForCausalLM.from_pretrained(model_name)
+        # Decoder-only models must be left-padded so every prompt ends right before generation starts
+        self.tokenizer.padding_side = "left"
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.load_profile = load_profile or get_load_profile("default")
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        self.model.to(self.device)
+        self.model = self.load_profile.load(AutoModelForCausalLM, model_name, self.device)
+        # Assisted decoding, with the same profile and device. Only the default draft and the allowed ones
+        # can be loaded; the default one is loaded now so the registry accounts for it.
+        self.draft_model_name = draft_model_name or None
+        self.allowed_draft_models = set(allowed_draft_models) | ({self.draft_model_name} if self.draft_model_name else set())
+        self._drafts: Dict[str, Tuple[Any, ForwardCounter]] = {}
+        self._drafts_lock = threading.Lock()
+        self._forward_counter = ForwardCounter(self.model)
+        self._decoding_stats = DecodingStats()
+        if self.draft_model_name:
+            self._draft(self.draft_model_name)
+
+    def memory_footprint(self) -> int:
+        return self.model.get_memory_footprint() + sum(draft.get_memory_footprint() for draft, _ in list(self._drafts.values()))
+
+    def decoding_stats(self) -> Dict[str, Any]:
+        return {"draft_model": self.draft_model_name, **self._decoding_stats.snapshot()}
+
+    def _draft(self, draft_model_name: str) -> Tuple[Any, ForwardCounter]:
+        draft = self._drafts.get(draft_model_name)
+        if draft is None:
+            with self._drafts_lock:
+                draft = self._drafts.get(draft_model_name)
+                if draft is None:
+                    if draft_model_name not in self.allowed_draft_models:
+                        raise ValueError(f"Draft model '{draft_model_name}' is not allowed")
+                    # The main model verifies the draft's token ids as its own, so both must share the vocabulary.
+                    if AutoTokenizer.from_pretrained(draft_model_name).get_vocab() != self.tokenizer.get_vocab():
+                        raise ValueError(f"Draft model '{draft_model_name}' does not share the tokenizer of '{self.model_name}'")
+                    model = self.load_profile.load(AutoModelForCausalLM, draft_model_name, self.device)
+                    draft = (model, ForwardCounter(model))
+                    self._drafts[draft_model_name] = draft
+        return draft
+
+    def close(self) -> None:
+        if self.prefix_cache is not None:
+            self.prefix_cache.drop_owner(self.prefix_cache_owner)
+        with self._drafts_lock:
+            self._drafts.clear()
 
     def _extract_assistant_response(self, text: str) -> str:
         # Intentar extraer lo posterior a "assistant\n"
@@ -21,45 +111,296 @@ class InstructModel(LLMPort):
             return match.group(1).strip()
         return text.strip()  # Si no se encuentra, devolver todo el texto
 
-    def generate(self, system_prompt: str, user_prompt: str, num_responses:int=1, max_new_tokens:int=100) -> List[str]:
+    def _build_prompt(self, system_prompt: str, user_prompt: str) -> str:
         if self.instruct_mode:
             # Build the message in the Instruct format
             messages = [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
-            ]                        
-            
-            prompt = self.tokenizer.apply_chat_template(
+            ]
+
+            return self.tokenizer.apply_chat_template(
                 messages,
                 tokenize=False,
                 add_generation_prompt=True
             )
-        else:
-            # Modo normal: lógica actual
-            prompt = f"{system_prompt}\n{user_prompt}"
+        # Modo normal: lógica actual
+        return f"{system_prompt}\n{user_prompt}"
+
+    def _build_prefix(self, system_prompt: str) -> str:
+        # Part of the prompt that only depends on the system prompt
+        if self.instruct_mode:
+            return self.tokenizer.apply_chat_template(
+                [{"role": "system", "content": system_prompt}],
+                tokenize=False
+            )
+        return f"{system_prompt}\n"
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenizer(text, add_special_tokens=False)["input_ids"])
+
+    def generate(self, system_prompt: str, user_prompt: str, num_responses:int=1, max_new_tokens:int=100,
+                 stop_sequences: Optional[List[str]] = None, draft_model: Optional[str] = None) -> List[str]:
+        return self.generate_batch([(system_prompt, user_prompt)], num_responses, max_new_tokens, stop_sequences,
+                                   draft_model)[0]
+
+    def generate_batch(self, prompts: List[Tuple[str, str]], num_responses:int=1, max_new_tokens:int=100,
+                       stop_sequences: Optional[List[str]] = None, draft_model: Optional[str] = None) -> List[List[str]]:
+        draft_model = self.draft_model_name if draft_model is None else draft_model
+        single = len(prompts) == 1 and num_responses == 1
+        if draft_model and single:
+            return self._decode(self._generate_assisted(prompts[0][0], prompts[0][1], max_new_tokens, stop_sequences,
+                                                        draft_model), 1, 1)
+        if draft_model:
+            # Assisted decoding verifies a single sequence at a time, so batches decode without the draft.
+            self._decoding_stats.record_fallback()
+
+        start = time.perf_counter()
+        if self.prefix_cache is not None and self._prefix_cache_supported:
+            generated = self._generate_with_prefix_cache(prompts, num_responses, max_new_tokens, stop_sequences)
+            if len(prompts) > 1:
+                # Merged batches only reuse the prefix when every prompt shares it and has the same length
+                # (e.g. concurrent calls for the same request); the others are counted in decoding_stats.
+                self._decoding_stats.record_prefix_batch(generated is not None)
+            if generated is not None:
+                outputs, prompt_length = generated
+                if single:
+                    self._decoding_stats.record_plain(outputs.shape[1] - prompt_length, time.perf_counter() - start)
+                return self._decode(outputs, len(prompts), num_responses)
 
-        inputs = self.tokenizer([prompt], return_tensors="pt").to(self.device)
+        # Prompts are left-padded into a single batch; outputs come back grouped per prompt.
+        texts = [self._build_prompt(system_prompt, user_prompt) for system_prompt, user_prompt in prompts]
+        inputs = self.tokenizer(texts, return_tensors="pt", padding=True).to(self.device)
         outputs = self.model.generate(
             **inputs,
             max_new_tokens=max_new_tokens,
             num_return_sequences=num_responses,
             do_sample=True,
-            pad_token_id=self.tokenizer.eos_token_id
+            pad_token_id=self.tokenizer.eos_token_id,
+            stopping_criteria=self._stopping_criteria(inputs["input_ids"].shape[1], stop_sequences)
         )
+        if single:
+            # Plain single-sequence decodes are the baseline assisted decoding is compared against.
+            self._decoding_stats.record_plain(outputs.shape[1] - inputs["input_ids"].shape[1], time.perf_counter() - start)
+        return self._decode(outputs, len(prompts), num_responses)
+
+    def _generate_assisted(self, system_prompt: str, user_prompt: str, max_new_tokens: int,
+                           stop_sequences: Optional[List[str]], draft_model: str) -> torch.Tensor:
+        inputs = self.tokenizer([self._build_prompt(system_prompt, user_prompt)], return_tensors="pt").to(self.device)
+        return self._run_assisted(dict(
+            **inputs,
+            max_new_tokens=max_new_tokens,
+            do_sample=True,
+            pad_token_id=self.tokenizer.eos_token_id,
+            stopping_criteria=self._stopping_criteria(inputs["input_ids"].shape[1], stop_sequences)
+        ), draft_model)
+
+    def _run_assisted(self, generate_kwargs: Dict[str, Any], draft_model: str) -> torch.Tensor:
+        # The draft proposes tokens and the main model checks them all in one forward pass. With sampling,
+        # transformers accepts them by speculative sampling, so outputs follow the main model's distribution.
+        # Must run on the thread that calls generate, since forward passes are counted per thread.
+        draft, draft_counter = self._draft(draft_model)
+        prompt_length = generate_kwargs["input_ids"].shape[1]
+        start = time.perf_counter()
+        self._forward_counter.start()
+        draft_counter.start()
+        try:
+            outputs = self.model.generate(**generate_kwargs, assistant_model=draft)
+        finally:
+            main_forwards = self._forward_counter.stop()
+            draft_tokens = draft_counter.stop()
+        self._decoding_stats.record_assisted(outputs.shape[1] - prompt_length, time.perf_counter() - start,
+                                             draft_tokens, main_forwards)
+        return outputs
+
+    def _stopping_criteria(self, prompt_length: int, stop_sequences: Optional[List[str]],
+                           *extra: StoppingCriteria) -> Optional[StoppingCriteriaList]:
+        criteria = list(extra)
+        if stop_sequences:
+            criteria.append(_StopSequencesCriteria(self.tokenizer, prompt_length, stop_sequences))
+        return StoppingCriteriaList(criteria) if criteria else None
 
+    def generate_stream(self, system_prompt: str, user_prompt: str, num_responses:int=1, max_new_tokens:int=100,
+                        cancel_event: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        # With a single sequence, text is streamed token by token (assisted by the default draft model, if
+        # any); with several, each sequence is emitted once the batched decode finishes. Both reuse the
+        # prefix cache like generate_batch. A cancelled generation emits no final responses.
+        stop_event = threading.Event()
+        cancelled = _CancelledCriteria(cancel_event, stop_event)
+        inputs = self.tokenizer([self._build_prompt(system_prompt, user_prompt)], return_tensors="pt").to(self.device)
+        generate_kwargs = dict(
+            **inputs,
+            max_new_tokens=max_new_tokens,
+            num_return_sequences=num_responses,
+            do_sample=True,
+            pad_token_id=self.tokenizer.eos_token_id,
+            stopping_criteria=StoppingCriteriaList([cancelled])
+        )
+
+        def decode(streamer: Optional[TextIteratorStreamer] = None) -> torch.Tensor:
+            if self.draft_model_name and num_responses == 1:
+                return self._run_assisted(dict(generate_kwargs, streamer=streamer), self.draft_model_name)
+            if self.prefix_cache is not None and self._prefix_cache_supported:
+                generated = self._generate_with_prefix_cache([(system_prompt, user_prompt)], num_responses,
+                                                             max_new_tokens, None, [cancelled], streamer)
+                if generated is not None:
+                    return generated[0]
+            return self.model.generate(**generate_kwargs, streamer=streamer)
+
+        try:
+            if num_responses == 1:
+                streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+                result: Dict[str, Any] = {}
+
+                def run():
+                    try:
+                        result["outputs"] = decode(streamer)
+                    except Exception as e:
+                        result["error"] = e
+                        streamer.end()
+
+                thread = threading.Thread(target=run, daemon=True)
+                thread.start()
+                for token in streamer:
+                    if token:
+                        yield {"sequence": 0, "token": token}
+                thread.join()
+                if "error" in result:
+                    raise result["error"]
+                outputs = result["outputs"]
+            else:
+                outputs = decode()
+
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            for i, response in enumerate(self._decode(outputs, 1, num_responses)[0]):
+                yield {"sequence": i, "response": response}
+        finally:
+            # Also reached when the consumer closes the generator early
+            stop_event.set()
+
+    def score_continuations(self, system_prompt: str, user_prompt: str, continuations: List[str],
+                            length_normalized: bool = False) -> List[float]:
+        # All continuations are appended to the same prompt and scored in one right-padded forward pass.
+        # Each prompt + continuation is tokenized as one text, as generation would see it, so a token that
+        # merges across the boundary is scored; continuation tokens start where it stops matching the prompt.
+        if not continuations:
+            return []
+        if any(not c for c in continuations):
+            raise ValueError("Continuations to score must not be empty")
+        prompt = self._build_prompt(system_prompt, user_prompt)
+        # Special tokens the tokenizer appends after a text (e.g. a separator) are not part of any answer.
+        suffix = self._special_suffix_length()
+        prompt_ids = self.tokenizer(prompt)["input_ids"]
+        prompt_ids = prompt_ids[:len(prompt_ids) - suffix]
+        sequences = [self.tokenizer(prompt + c)["input_ids"] for c in continuations]
+        sequences = [seq[:len(seq) - suffix] for seq in sequences]
+        starts = []
+        for seq in sequences:
+            start = 0
+            while start < min(len(prompt_ids), len(seq)) and seq[start] == prompt_ids[start]:
+                start += 1
+            # The first token is never predicted, so at least one token must stay on the prompt side.
+            starts.append(max(1, start))
+        max_len = max(len(seq) for seq in sequences)
+        pad_id = self.tokenizer.pad_token_id
+        input_ids = torch.tensor([seq + [pad_id] * (max_len - len(seq)) for seq in sequences], device=self.device)
+        attention_mask = torch.tensor([[1] * len(seq) + [0] * (max_len - len(seq)) for seq in sequences], device=self.device)
+
+        with torch.no_grad():
+            logits = self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+        # Position t predicts token t + 1
+        log_probs = torch.log_softmax(logits[:, :-1].float(), dim=-1)
+        token_log_probs = log_probs.gather(-1, input_ids[:, 1:].unsqueeze(-1)).squeeze(-1)
+
+        scores = []
+        for i, (seq, start) in enumerate(zip(sequences, starts)):
+            # Position t - 1 scores token t
+            continuation = token_log_probs[i, start - 1:len(seq) - 1]
+            scores.append((continuation.mean() if length_normalized else continuation.sum()).item())
+        return scores
+
+    def _special_suffix_length(self) -> int:
+        with_special = self.tokenizer("a")["input_ids"]
+        without_special = self.tokenizer("a", add_special_tokens=False)["input_ids"]
+        for start in range(len(with_special) - len(without_special) + 1):
+            if with_special[start:start + len(without_special)] == without_special:
+                return len(with_special) - start - len(without_special)
+        return 0
+
+    def _decode(self, outputs: torch.Tensor, num_prompts: int, num_responses: int) -> List[List[str]]:
         decoded = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
 
         if self.instruct_mode:
             # En modo instruct intentamos extraer sólo la parte del asistente
             # para cada respuesta generada
-            final_responses = []
-            for resp in decoded:
-                final_responses.append(self._extract_assistant_response(resp))
-            return final_responses
-        else:
-            # Modo normal: devolver tal cual
-            return decoded
+            decoded = [self._extract_assistant_response(resp) for resp in decoded]
+
+        return [decoded[i * num_responses:(i + 1) * num_responses] for i in range(num_prompts)]
 
+    def _generate_with_prefix_cache(self, prompts: List[Tuple[str, str]], num_responses: int,
+                                    max_new_tokens: int, stop_sequences: Optional[List[str]] = None,
+                                    extra_criteria: Optional[List[StoppingCriteria]] = None,
+                                    streamer: Optional[TextIteratorStreamer] = None) -> Optional[Tuple[torch.Tensor, int]]:
+        # Returns (outputs, prompt length), or None when the prompts cannot reuse a cached prefix, so the
+        # caller takes the normal path (nothing has been generated or streamed then). Several prompts share
+        # the cached prefix only if they share the system prompt and tokenize to the same length: the cache
+        # is then repeated per sequence and no padding is needed between the prefix and the prompts.
+        system_prompt = prompts[0][0]
+        if any(s != system_prompt for s, _ in prompts):
+            return None
+        prefix = self._build_prefix(system_prompt)
+        texts = [self._build_prompt(s, u) for s, u in prompts]
+        if not all(text.startswith(prefix) for text in texts):
+            return None
+        all_ids = [self.tokenizer(text)["input_ids"] for text in texts]
+        prefix_ids = self.tokenizer(prefix)["input_ids"]
+        prompt_ids = all_ids[0]
+        # Tokenizing the prefix alone must give the same tokens it has inside the full prompt,
+        # and at least one prompt token must be left for generate to prefill.
+        if (len(prefix_ids) < self.prefix_cache.min_prefix_tokens or len(prefix_ids) >= len(prompt_ids)
+                or any(len(ids) != len(prompt_ids) or ids[:len(prefix_ids)] != prefix_ids for ids in all_ids)):
+            return None
 
+        key = tuple(prefix_ids)
+        past_key_values = self.prefix_cache.get(self.prefix_cache_owner, key)
+        if past_key_values is None:
+            past_key_values = self._compute_prefix_cache(prefix_ids)
+            if past_key_values is None:
+                return None
+            self.prefix_cache.put(self.prefix_cache_owner, key, past_key_values)
+        else:
+            self.prefix_cache.record_saved_tokens(len(prefix_ids) * num_responses * len(prompts))
 
+        # generate extends the cache in place, so every call works on its own copy.
+        past_key_values = copy.deepcopy(past_key_values)
+        if num_responses * len(prompts) > 1:
+            past_key_values.batch_repeat_interleave(num_responses * len(prompts))
+        input_ids = torch.tensor(all_ids, device=self.device)
+        outputs = self.model.generate(
+            input_ids=input_ids,
+            attention_mask=torch.ones_like(input_ids),
+            past_key_values=past_key_values,
+            max_new_tokens=max_new_tokens,
+            num_return_sequences=num_responses,
+            do_sample=True,
+            pad_token_id=self.tokenizer.eos_token_id,
+            stopping_criteria=self._stopping_criteria(len(prompt_ids), stop_sequences, *(extra_criteria or [])),
+            streamer=streamer
+        )
+        return outputs, len(prompt_ids)
 
+    def _compute_prefix_cache(self, prefix_ids: List[int]) -> Optional[Any]:
+        with torch.no_grad():
+            output = self.model(input_ids=torch.tensor([prefix_ids], device=self.device), use_cache=True)
+        past_key_values = output.past_key_values
+        # Only Cache objects (e.g. DynamicCache) can be expanded for num_return_sequences > 1. Legacy tuple
+        # caches are converted where transformers still can; otherwise the model stops trying, so later
+        # calls do not pay this prefix forward pass again for nothing.
+        if isinstance(past_key_values, tuple) and hasattr(DynamicCache, "from_legacy_cache"):
+            past_key_values = DynamicCache.from_legacy_cache(past_key_values)
+        if not hasattr(past_key_values, "batch_repeat_interleave"):
+            logger.warning(f"Model '{self.model_name}' returns a cache the prefix cache cannot reuse; prefix caching disabled for it")
+            self._prefix_cache_supported = False
+            return None
+        return past_key_values
@@ -0,0 +1,91 @@
+# infrastructure/llm/prefix_cache.py
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.infrastructure import settings
+
+logger = logging.getLogger(__name__)
+
+PrefixKey = Tuple[str, Tuple[int, ...]]
+
+class PrefixKVCache:
+    # Stores past_key_values computed for tokenized prompt prefixes (typically the system
+    # prompt block of the chat template). Bounded both in entries and in cached tokens.
+    # Entries belong to an owner: one loaded model instance, since the same model loaded with
+    # another profile (dtype, quantization) produces different key/values.
+    def __init__(self, max_entries: int = 32, max_tokens: int = 32768, min_prefix_tokens: int = 8):
+        self.max_entries = max_entries
+        self.max_tokens = max_tokens
+        self.min_prefix_tokens = min_prefix_tokens
+        self._entries: "OrderedDict[PrefixKey, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_prefill_tokens = 0
+        logger.info(f"PrefixKVCache initialized with max_entries: {max_entries}, max_tokens: {max_tokens}")
+
+    def get(self, owner: str, prefix_ids: Tuple[int, ...]) -> Optional[Any]:
+        key = (owner, prefix_ids)
+        with self._lock:
+            past_key_values = self._entries.get(key)
+            if past_key_values is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return past_key_values
+
+    def put(self, owner: str, prefix_ids: Tuple[int, ...], past_key_values: Any) -> None:
+        if len(prefix_ids) > self.max_tokens:
+            return
+        key = (owner, prefix_ids)
+        with self._lock:
+            self._entries[key] = past_key_values
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries or self._cached_tokens() > self.max_tokens:
+                evicted_key, _ = self._entries.popitem(last=False)
+                logger.debug(f"Evicting prefix of {len(evicted_key[1])} tokens of '{evicted_key[0]}'")
+
+    def record_saved_tokens(self, tokens: int) -> None:
+        with self._lock:
+            self.saved_prefill_tokens += tokens
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "cached_tokens": self._cached_tokens(),
+                "max_entries": self.max_entries,
+                "max_tokens": self.max_tokens,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_prefill_tokens": self.saved_prefill_tokens
+            }
+
+    def drop_owner(self, owner: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == owner]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _cached_tokens(self) -> int:
+        return sum(len(key[1]) for key in self._entries)
+
+_cache: Optional[PrefixKVCache] = None
+_cache_lock = threading.Lock()
+
+def get_prefix_cache() -> PrefixKVCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PrefixKVCache(settings.PREFIX_CACHE_MAX_ENTRIES, settings.PREFIX_CACHE_MAX_TOKENS,
+                                       settings.PREFIX_CACHE_MIN_TOKENS)
+    return _cache
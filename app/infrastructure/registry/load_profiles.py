@@ -0,0 +1,62 @@
+# infrastructure/registry/load_profiles.py
+
+import logging
+from typing import Any, Dict
+import torch
+
+logger = logging.getLogger(__name__)
+
+_DTYPES = {"fp32": torch.float32, "bf16": torch.bfloat16, "fp16": torch.float16}
+
+class LoadProfile:
+    # How from_pretrained loads a model:
+    # - dtype: 'fp32', 'bf16' or 'fp16' ('auto' keeps the dtype stored in the checkpoint).
+    # - low_cpu_mem_usage: build the model empty and fill it tensor by tensor, instead of
+    #   materializing randomly initialized weights and then a second copy from the checkpoint
+    #   (needs accelerate).
+    # - use_safetensors: require *.safetensors, which are memory-mapped rather than read into RAM
+    #   (otherwise they are only preferred when the repository has them).
+    # - quantize_int8: dynamic int8 quantization of the Linear layers (CPU only).
+    def __init__(self, name: str, dtype: str = "fp32", low_cpu_mem_usage: bool = False, use_safetensors: bool = False,
+                 quantize_int8: bool = False):
+        if dtype != "auto" and dtype not in _DTYPES:
+            raise ValueError(f"Unknown dtype '{dtype}'; expected 'auto' or one of {sorted(_DTYPES)}")
+        self.name = name
+        self.dtype = dtype
+        self.low_cpu_mem_usage = low_cpu_mem_usage
+        self.use_safetensors = use_safetensors
+        self.quantize_int8 = quantize_int8
+
+    def from_pretrained_kwargs(self) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"torch_dtype": "auto" if self.dtype == "auto" else _DTYPES[self.dtype]}
+        if self.low_cpu_mem_usage:
+            kwargs["low_cpu_mem_usage"] = True
+        if self.use_safetensors:
+            kwargs["use_safetensors"] = True
+        return kwargs
+
+    def load(self, auto_class: Any, model_name: str, device: torch.device) -> Any:
+        model = auto_class.from_pretrained(model_name, **self.from_pretrained_kwargs())
+        model.to(device)
+        model.eval()
+        if self.quantize_int8:
+            if device.type != "cpu":
+                logger.warning(f"Profile '{self.name}': int8 dynamic quantization only runs on CPU; "
+                               f"'{model_name}' stays in {self.dtype} on {device}")
+            else:
+                # Quantized kernels take fp32 activations.
+                model = torch.ao.quantization.quantize_dynamic(model.float(), {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+
+# 'default' is the historical behaviour: full fp32 weights, read entirely into RAM.
+PROFILES: Dict[str, LoadProfile] = {
+    "default": LoadProfile("default"),
+    "low_memory": LoadProfile("low_memory", dtype="bf16", low_cpu_mem_usage=True, use_safetensors=True),
+    "int8": LoadProfile("int8", dtype="fp32", low_cpu_mem_usage=True, quantize_int8=True),
+}
+
+def get_load_profile(name: str) -> LoadProfile:
+    profile = PROFILES.get(name)
+    if profile is None:
+        raise ValueError(f"Unknown load profile '{name}'; expected one of {sorted(PROFILES)}")
+    return profile
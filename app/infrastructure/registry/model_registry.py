@@ -0,0 +1,181 @@
+# infrastructure/registry/model_registry.py
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.infrastructure import settings
+
+logger = logging.getLogger(__name__)
+
+RegistryKey = Tuple[str, str, Tuple[Tuple[str, Any], ...]]
+
+def _make_key(kind: str, model_name: str, options: Optional[Dict[str, Any]]) -> RegistryKey:
+    frozen_options = tuple(sorted((options or {}).items()))
+    return (kind, model_name, frozen_options)
+
+def _estimate_size(instance: Any) -> int:
+    # Instances may report their own footprint; otherwise we fall back to the HF model, if any.
+    if hasattr(instance, "memory_footprint"):
+        return int(instance.memory_footprint())
+    model = getattr(instance, "model", None)
+    if model is not None and hasattr(model, "get_memory_footprint"):
+        return int(model.get_memory_footprint())
+    return 0
+
+def process_rss_bytes() -> Optional[int]:
+    # Resident set size of this process (Linux /proc); None where it is not available.
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+class _RegistryEntry:
+    def __init__(self, key: RegistryKey, instance: Any, size_bytes: int, load_time: float,
+                 rss_delta_bytes: Optional[int] = None):
+        self.key = key
+        self.instance = instance
+        self.size_bytes = size_bytes
+        self.load_time = load_time
+        # Growth of the process RSS while loading (only approximate if other loads overlapped).
+        self.rss_delta_bytes = rss_delta_bytes
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.hits = 0
+
+class ModelRegistry:
+    def __init__(self, max_memory_bytes: int = 0):
+        self.max_memory_bytes = max_memory_bytes
+        self._entries: "OrderedDict[RegistryKey, _RegistryEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[RegistryKey, threading.Lock] = {}
+        logger.info(f"ModelRegistry initialized with max_memory_bytes: {max_memory_bytes}")
+
+    def get_or_load(self, kind: str, model_name: str, loader: Callable[[], Any],
+                    options: Optional[Dict[str, Any]] = None) -> Any:
+        key = _make_key(kind, model_name, options)
+        instance = self._lookup(key)
+        if instance is not None:
+            return instance
+
+        # Only one thread loads a given key; the others wait on its lock and then hit the cache.
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            instance = self._lookup(key)
+            if instance is not None:
+                return instance
+
+            logger.info(f"Loading {kind} model '{model_name}' with options: {options}")
+            rss_before = process_rss_bytes()
+            start = time.perf_counter()
+            instance = loader()
+            load_time = time.perf_counter() - start
+            rss_after = process_rss_bytes()
+            rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            size_bytes = _estimate_size(instance)
+            logger.info(f"Loaded {kind} model '{model_name}' in {load_time:.2f}s ({size_bytes} bytes, "
+                        f"RSS delta: {rss_delta} bytes)")
+
+            with self._lock:
+                self._entries[key] = _RegistryEntry(key, instance, size_bytes, load_time, rss_delta)
+                self._load_locks.pop(key, None)
+                evicted = self._evict_if_needed(keep=key)
+            for entry in evicted:
+                self._close(entry)
+            return instance
+
+    def list_models(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = list(self._entries.values())
+            models = [
+                {
+                    "kind": entry.key[0],
+                    "model": entry.key[1],
+                    "options": dict(entry.key[2]),
+                    "size_bytes": entry.size_bytes,
+                    "load_time_s": round(entry.load_time, 3),
+                    "rss_delta_bytes": entry.rss_delta_bytes,
+                    "loaded_at": entry.loaded_at,
+                    "last_used": entry.last_used,
+                    "hits": entry.hits,
+                }
+                for entry in entries
+            ]
+        # LLMs report plain vs assisted decoding throughput; read outside the registry lock.
+        for entry, model in zip(entries, models):
+            decoding_stats = getattr(entry.instance, "decoding_stats", None)
+            if callable(decoding_stats):
+                model["decoding"] = decoding_stats()
+        return models
+
+    def unload(self, model_name: str, kind: Optional[str] = None) -> int:
+        with self._lock:
+            keys = [k for k in self._entries if k[1] == model_name and (kind is None or k[0] == kind)]
+            removed = [self._entries.pop(k) for k in keys]
+        for entry in removed:
+            self._close(entry)
+        logger.info(f"Unloaded {len(removed)} entries for model '{model_name}' (kind: {kind})")
+        return len(removed)
+
+    def clear(self) -> int:
+        with self._lock:
+            removed = list(self._entries.values())
+            self._entries.clear()
+        for entry in removed:
+            self._close(entry)
+        return len(removed)
+
+    def total_memory_bytes(self) -> int:
+        with self._lock:
+            return sum(e.size_bytes for e in self._entries.values())
+
+    def _lookup(self, key: RegistryKey) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            entry.last_used = time.time()
+            entry.hits += 1
+            return entry.instance
+
+    def _evict_if_needed(self, keep: RegistryKey) -> List[_RegistryEntry]:
+        # Must be called with self._lock held. The entry just loaded is never evicted,
+        # even if it alone exceeds the budget.
+        evicted = []
+        if self.max_memory_bytes <= 0:
+            return evicted
+        total = sum(e.size_bytes for e in self._entries.values())
+        for key in list(self._entries.keys()):
+            if total <= self.max_memory_bytes:
+                break
+            if key == keep:
+                continue
+            entry = self._entries.pop(key)
+            total -= entry.size_bytes
+            evicted.append(entry)
+            logger.info(f"Evicting {key[0]} model '{key[1]}' ({entry.size_bytes} bytes) from registry")
+        return evicted
+
+    def _close(self, entry: _RegistryEntry) -> None:
+        # Requests still holding the instance keep it alive; we only release our reference.
+        close = getattr(entry.instance, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logger.warning(f"Error closing model '{entry.key[1]}': {str(e)}")
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_model_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry(settings.MODEL_REGISTRY_MAX_MEMORY_MB * 1024 * 1024)
+    return _registry
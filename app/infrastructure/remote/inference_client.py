@@ -0,0 +1,198 @@
+# infrastructure/remote/inference_client.py
+
+import logging
+import os
+import secrets
+import stat
+import threading
+from contextlib import contextmanager
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection
+from typing import Any, Iterator, List, Optional, Tuple
+import numpy as np
+from app.domain.ports.embeddings_port import EmbeddingsPort
+from app.domain.ports.llm_port import LLMPort
+from app.infrastructure import settings
+
+logger = logging.getLogger(__name__)
+
+# Messages are pickled tuples over a Unix socket (multiprocessing.connection). Unpickling runs code,
+# so the server always requires an authkey and only its owner can open the socket:
+#   request:  ("call" | "stream", kind, model_name, method, args, kwargs)
+#   response: ("ok", value) | ("event", event)... ("end",) | ("error", exception type name, message)
+
+def _unwrap(message: Tuple) -> Any:
+    if message[0] == "error":
+        # ValueErrors keep their type so routes still answer 400; anything else is a server failure.
+        if message[1] == "ValueError":
+            raise ValueError(message[2])
+        raise RuntimeError(f"Inference server error ({message[1]}): {message[2]}")
+    return message[1]
+
+class InferenceClient:
+    # Keeps a few idle connections for reuse. Concurrent calls use separate connections, so they
+    # reach the server at the same time and can share its batched generate calls.
+    def __init__(self, address: str, authkey: Optional[bytes] = None, max_idle_connections: int = 8):
+        self.address = address
+        self.authkey = authkey
+        self.max_idle_connections = max_idle_connections
+        self._idle: List[Connection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> Connection:
+        try:
+            # Without a configured key, the server's key file is read on every connect, so a restarted
+            # server with a new key is picked up.
+            authkey = self.authkey if self.authkey is not None else read_authkey_file(self.address)
+            return Client(self.address, family="AF_UNIX", authkey=authkey)
+        except (OSError, EOFError, AuthenticationError) as e:
+            raise RuntimeError(f"Cannot reach the inference server at {self.address}: {str(e)}")
+
+    @contextmanager
+    def _connection(self) -> Iterator[Connection]:
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._connect()
+        try:
+            yield conn
+        except BaseException:
+            # The reply may still be in flight: the connection cannot be reused.
+            conn.close()
+            raise
+        with self._lock:
+            if len(self._idle) < self.max_idle_connections:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def call(self, kind: str, model_name: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        with self._connection() as conn:
+            try:
+                conn.send(("call", kind, model_name, method, args, kwargs))
+                message = conn.recv()
+            except (OSError, EOFError) as e:
+                raise RuntimeError(f"Lost connection to the inference server: {str(e)}")
+        return _unwrap(message)
+
+    def stream(self, kind: str, model_name: str, method: str, args: Tuple,
+               cancel_event: Optional[threading.Event] = None) -> Iterator[Any]:
+        # A dedicated connection: closing it is how the server learns that the stream was abandoned.
+        conn = self._connect()
+        try:
+            conn.send(("stream", kind, model_name, method, args, {}))
+            while cancel_event is None or not cancel_event.is_set():
+                message = conn.recv()
+                if message[0] == "end":
+                    return
+                if message[0] == "event":
+                    yield message[1]
+                else:
+                    _unwrap(message)
+        except (OSError, EOFError) as e:
+            raise RuntimeError(f"Lost connection to the inference server: {str(e)}")
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+class RemoteLLM(LLMPort):
+    # LLMPort served by the inference server; the model and its batcher live in that process.
+    def __init__(self, model_name: str, client: InferenceClient):
+        self.model_name = model_name
+        self.client = client
+
+    def memory_footprint(self) -> int:
+        # Accounted for by the server's registry, not by this process.
+        return 0
+
+    def generate(self, system_prompt: str, user_prompt: str, num_responses:int=1, max_new_tokens:int=100,
+                 stop_sequences: Optional[List[str]] = None, draft_model: Optional[str] = None) -> List[str]:
+        return self.client.call("llm", self.model_name, "generate", system_prompt, user_prompt, num_responses,
+                                max_new_tokens, stop_sequences, draft_model)
+
+    def generate_batch(self, prompts: List[Tuple[str, str]], num_responses:int=1, max_new_tokens:int=100,
+                       stop_sequences: Optional[List[str]] = None, draft_model: Optional[str] = None) -> List[List[str]]:
+        return self.client.call("llm", self.model_name, "generate_batch", prompts, num_responses, max_new_tokens,
+                                stop_sequences, draft_model)
+
+    def count_tokens(self, text: str) -> int:
+        return self.client.call("llm", self.model_name, "count_tokens", text)
+
+    def generate_stream(self, system_prompt: str, user_prompt: str, num_responses:int=1, max_new_tokens:int=100,
+                        cancel_event: Optional[threading.Event] = None) -> Iterator[Any]:
+        return self.client.stream("llm", self.model_name, "generate_stream",
+                                  (system_prompt, user_prompt, num_responses, max_new_tokens), cancel_event)
+
+    def score_continuations(self, system_prompt: str, user_prompt: str, continuations: List[str],
+                            length_normalized: bool = False) -> List[float]:
+        return self.client.call("llm", self.model_name, "score_continuations", system_prompt, user_prompt, continuations,
+                                length_normalized)
+
+class RemoteEmbedder(EmbeddingsPort):
+    def __init__(self, model_name: str, client: InferenceClient):
+        self.model_name = model_name
+        self.client = client
+
+    def memory_footprint(self) -> int:
+        return 0
+
+    def get_similarity(self, text1: str, text2: str) -> float:
+        return self.client.call("embedder", self.model_name, "get_similarity", text1, text2)
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        return self.client.call("embedder", self.model_name, "embed_many", texts)
+
+    def similarity_matrix(self, queries: List[str], references: List[str]) -> np.ndarray:
+        return self.client.call("embedder", self.model_name, "similarity_matrix", queries, references)
+
+    def reference_matrix(self, references: List[str]) -> np.ndarray:
+        return self.client.call("embedder", self.model_name, "reference_matrix", references)
+
+def configured_authkey() -> Optional[bytes]:
+    return settings.INFERENCE_SERVER_AUTHKEY.encode("utf-8") if settings.INFERENCE_SERVER_AUTHKEY else None
+
+def authkey_path(address: str) -> str:
+    return f"{address}.key"
+
+def _check_private(path: str) -> None:
+    # Key files must be regular files of this user that nobody else can read or write.
+    info = os.lstat(path)
+    if not stat.S_ISREG(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise OSError(f"{path} must be a regular file owned by this user with mode 0600")
+
+def read_authkey_file(address: str) -> bytes:
+    path = authkey_path(address)
+    _check_private(path)
+    with open(path, "rb") as f:
+        return f.read().strip()
+
+def server_authkey(address: str) -> bytes:
+    # INFERENCE_SERVER_AUTHKEY, or else a random key kept next to the socket (created 0600 on first start,
+    # reused afterwards) that the API workers of the same user read.
+    authkey = configured_authkey()
+    if authkey:
+        return authkey
+    path = authkey_path(address)
+    if os.path.lexists(path):
+        return read_authkey_file(address)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(secrets.token_hex(32).encode("ascii"))
+    logger.info(f"Generated inference server authkey in {path}")
+    return read_authkey_file(address)
+
+_client: Optional[InferenceClient] = None
+_client_lock = threading.Lock()
+
+def get_inference_client() -> InferenceClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = InferenceClient(settings.INFERENCE_SERVER_SOCKET, configured_authkey())
+    return _client
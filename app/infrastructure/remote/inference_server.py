@@ -0,0 +1,143 @@
+# infrastructure/remote/inference_server.py
+# Owns the models for every API worker of the host: the workers reach it through RemoteLLM and
+# RemoteEmbedder when INFERENCE_SERVER_SOCKET is set. Start it before the API:
+#
+#   INFERENCE_SERVER_SOCKET=/tmp/autoaumento.sock python -m app.infrastructure.remote.inference_server
+
+import argparse
+import logging
+import os
+import stat
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Connection, Listener
+from typing import Any, Callable, Dict, Optional
+from app.infrastructure import settings
+from app.infrastructure.remote.inference_client import server_authkey
+
+logger = logging.getLogger(__name__)
+
+# Methods a client may call, per kind of model.
+_ALLOWED = {
+    "llm": {"generate", "generate_batch", "count_tokens", "score_continuations", "generate_stream"},
+    "embedder": {"get_similarity", "embed_many", "similarity_matrix", "reference_matrix"}
+}
+
+class InferenceServer:
+    # One thread per client connection. Models come from this process's registry, so concurrent
+    # generate calls from every worker meet in the same BatchingLLM.
+    def __init__(self, address: str, loaders: Dict[str, Callable[[str], Any]], authkey: bytes):
+        if not authkey:
+            # Clients send pickles: without a key, any local process could run code in this one.
+            raise ValueError("The inference server requires an authkey")
+        self.address = address
+        self.loaders = loaders
+        self.authkey = authkey
+        self._listener: Optional[Listener] = None
+
+    def serve_forever(self) -> None:
+        if os.path.lexists(self.address):
+            # Only a socket left behind by a previous server is removed, never another kind of file.
+            if not stat.S_ISSOCK(os.lstat(self.address).st_mode):
+                raise RuntimeError(f"{self.address} exists and is not a socket")
+            os.unlink(self.address)
+        # The socket is created accessible to this user only.
+        umask = os.umask(0o177)
+        try:
+            self._listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        finally:
+            os.umask(umask)
+        os.chmod(self.address, 0o600)
+        logger.info(f"Inference server listening on {self.address}")
+        try:
+            while True:
+                try:
+                    conn = self._listener.accept()
+                except (OSError, EOFError, AuthenticationError) as e:
+                    # A failed handshake only affects that client; the listener is still usable.
+                    if self._listener is None:
+                        return
+                    logger.warning(f"Rejected inference client: {str(e)}")
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+
+    def _serve_connection(self, conn: Connection) -> None:
+        try:
+            while True:
+                try:
+                    op, kind, model_name, method, args, kwargs = conn.recv()
+                except (OSError, EOFError):
+                    return
+                if op == "stream":
+                    self._serve_stream(conn, kind, model_name, method, args)
+                    return
+                try:
+                    reply = ("ok", getattr(self._instance(kind, model_name, method), method)(*args, **kwargs))
+                except ValueError as e:
+                    logger.warning(f"Inference call {kind}.{method} rejected: {str(e)}")
+                    reply = ("error", type(e).__name__, str(e))
+                except Exception as e:
+                    logger.exception(f"Inference call {kind}.{method} failed: {str(e)}")
+                    reply = ("error", type(e).__name__, str(e))
+                try:
+                    conn.send(reply)
+                except (OSError, EOFError):
+                    return
+        finally:
+            conn.close()
+
+    def _serve_stream(self, conn: Connection, kind: str, model_name: str, method: str, args: Any) -> None:
+        cancel_event = threading.Event()
+        events = None
+        try:
+            events = getattr(self._instance(kind, model_name, method), method)(*args, cancel_event=cancel_event)
+            for event in events:
+                conn.send(("event", event))
+            conn.send(("end",))
+        except (OSError, EOFError):
+            # The client closed the connection: stop the decode.
+            logger.info(f"Inference stream {kind}.{method} abandoned by the client")
+            cancel_event.set()
+        except Exception as e:
+            logger.exception(f"Inference stream {kind}.{method} failed: {str(e)}")
+            cancel_event.set()
+            try:
+                conn.send(("error", type(e).__name__, str(e)))
+            except (OSError, EOFError):
+                pass
+        finally:
+            close = getattr(events, "close", None)
+            if callable(close):
+                close()
+
+    def _instance(self, kind: str, model_name: str, method: str) -> Any:
+        if method not in _ALLOWED.get(kind, ()):
+            raise ValueError(f"Unknown inference method '{kind}.{method}'")
+        return self.loaders[kind](model_name)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the models of this host to the API workers over a Unix socket.")
+    parser.add_argument("--socket", default=settings.INFERENCE_SERVER_SOCKET or "/tmp/autoaumento-inference.sock")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S')
+
+    # Imported here: the API workers only need the client side of this package.
+    from app.infrastructure.adapters.llm_service import get_local_llm
+    from app.infrastructure.adapters.embeddings_service import get_local_embedder
+
+    server = InferenceServer(args.socket, {"llm": get_local_llm, "embedder": get_local_embedder}, server_authkey(args.socket))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Inference server stopped")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# infrastructure/settings.py
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+# Model registry: memory budget (in MB) shared by every loaded model. 0 disables eviction.
+MODEL_REGISTRY_MAX_MEMORY_MB = _env_int("MODEL_REGISTRY_MAX_MEMORY_MB", 0)
+
+# Embedding cache: in-memory LRU size (vectors) and optional directory for the memory-mapped disk tier.
+EMBEDDING_CACHE_MAX_ENTRIES = _env_int("EMBEDDING_CACHE_MAX_ENTRIES", 10000)
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "")
+
+# Maximum number of texts encoded in one padded forward pass by the embedder.
+EMBEDDING_BATCH_SIZE = _env_int("EMBEDDING_BATCH_SIZE", 32)
+
+# Reference sets of embedding verification methods kept as ready-made matrices by each embedder.
+EMBEDDING_REFERENCE_SETS_CACHED = _env_int("EMBEDDING_REFERENCE_SETS_CACHED", 64)
+
+# LLM micro-batching: prompts collected per batched generate call and how long (ms) to wait for them.
+# Merged calls are split again to stay within the generation planner's ceiling below.
+LLM_BATCH_MAX_SIZE = _env_int("LLM_BATCH_MAX_SIZE", 8)
+LLM_BATCH_MAX_WAIT_MS = _env_int("LLM_BATCH_MAX_WAIT_MS", 10)
+
+# Generation planner: sequences per generate call and ceiling on sequences × max_new_tokens (0 = no ceiling).
+GENERATION_MAX_SEQUENCES_PER_BATCH = _env_int("GENERATION_MAX_SEQUENCES_PER_BATCH", 16)
+GENERATION_MAX_BATCH_TOKENS = _env_int("GENERATION_MAX_BATCH_TOKENS", 32768)
+
+# Prefix KV cache: cached prompt prefixes, total cached tokens, and minimum prefix length worth caching.
+PREFIX_CACHE_MAX_ENTRIES = _env_int("PREFIX_CACHE_MAX_ENTRIES", 32)
+PREFIX_CACHE_MAX_TOKENS = _env_int("PREFIX_CACHE_MAX_TOKENS", 32768)
+PREFIX_CACHE_MIN_TOKENS = _env_int("PREFIX_CACHE_MIN_TOKENS", 8)
+
+# Worker threads used to run independent verification methods concurrently.
+VERIFICATION_MAX_WORKERS = _env_int("VERIFICATION_MAX_WORKERS", 4)
+
+# Bulk parsing: worker processes (0 = one per CPU) and responses sent to a worker per task.
+PARSE_MAX_WORKERS = _env_int("PARSE_MAX_WORKERS", 0)
+PARSE_BULK_CHUNK_SIZE = _env_int("PARSE_BULK_CHUNK_SIZE", 256)
+
+# Regex parse rules: time budget (ms) per rule and for all the rules of one text (0 = unlimited), and
+# whether patterns that fit the RE2 subset run on the linear-time engine (1 = on; needs google-re2,
+# whose \d, \w and \s only match ASCII).
+PARSE_REGEX_RULE_TIMEOUT_MS = _env_int("PARSE_REGEX_RULE_TIMEOUT_MS", 1000)
+PARSE_REGEX_TOTAL_TIMEOUT_MS = _env_int("PARSE_REGEX_TOTAL_TIMEOUT_MS", 5000)
+PARSE_REGEX_LINEAR_ENGINE = _env_int("PARSE_REGEX_LINEAR_ENGINE", 0)
+
+# Worker threads that parse and verify pipeline results while generation continues.
+PIPELINE_MAX_WORKERS = _env_int("PIPELINE_MAX_WORKERS", 4)
+
+# Background jobs: SQLite file for queue and results, worker threads, idle poll interval (ms) and
+# results per unit of a verification job (progress is saved after every unit).
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "jobs.sqlite3")
+JOBS_MAX_WORKERS = _env_int("JOBS_MAX_WORKERS", 1)
+JOBS_POLL_INTERVAL_MS = _env_int("JOBS_POLL_INTERVAL_MS", 1000)
+JOBS_VERIFICATION_UNIT_SIZE = _env_int("JOBS_VERIFICATION_UNIT_SIZE", 16)
+# Running jobs are refreshed every JOBS_HEARTBEAT_INTERVAL_MS by the process running them; any process
+# re-queues those without a heartbeat for JOBS_STALE_AFTER_MS (must be well above the interval).
+JOBS_HEARTBEAT_INTERVAL_MS = _env_int("JOBS_HEARTBEAT_INTERVAL_MS", 10000)
+JOBS_STALE_AFTER_MS = _env_int("JOBS_STALE_AFTER_MS", 60000)
+# Whether the API process runs job workers (0 = it only queues jobs and serves their status). With several
+# uvicorn workers, set it to 0 and run them once with `python -m app.interfaces.api.jobs`. On shutdown,
+# workers get JOBS_SHUTDOWN_TIMEOUT_MS to finish their current unit; their jobs go back to the queue.
+JOBS_RUN_WORKERS = _env_int("JOBS_RUN_WORKERS", 1)
+JOBS_SHUTDOWN_TIMEOUT_MS = _env_int("JOBS_SHUTDOWN_TIMEOUT_MS", 30000)
+
+# Semantic deduplication: default cosine threshold, texts embedded per step, vector index of the
+# cluster representatives ('auto', 'exact' or 'hnsw'; 'hnsw' needs faiss-cpu) and HNSW graph degree.
+DEDUP_SIMILARITY_THRESHOLD = _env_float("DEDUP_SIMILARITY_THRESHOLD", 0.95)
+DEDUP_BATCH_SIZE = _env_int("DEDUP_BATCH_SIZE", 64)
+DEDUP_VECTOR_INDEX = os.getenv("DEDUP_VECTOR_INDEX", "auto")
+DEDUP_HNSW_M = _env_int("DEDUP_HNSW_M", 32)
+
+# Inference executor used by the API routes: threads running model calls, tasks allowed to wait for
+# one plus open NDJSON streams (0 = unbounded; beyond it requests get 429) and how long (ms, 0 = no limit) a request may wait
+# for a thread before getting 503. Work that has started always runs to the end.
+INFERENCE_MAX_WORKERS = _env_int("INFERENCE_MAX_WORKERS", 4)
+INFERENCE_MAX_QUEUE = _env_int("INFERENCE_MAX_QUEUE", 16)
+INFERENCE_REQUEST_TIMEOUT_MS = _env_int("INFERENCE_REQUEST_TIMEOUT_MS", 120000)
+
+# Shared inference server: Unix socket of the process that owns the models (empty = every API worker
+# loads its own) and key that clients must present (empty = a random key in '<socket>.key', mode 0600).
+# The socket is 0600 too, so the server and the API workers must run as the same user.
+INFERENCE_SERVER_SOCKET = os.getenv("INFERENCE_SERVER_SOCKET", "")
+INFERENCE_SERVER_AUTHKEY = os.getenv("INFERENCE_SERVER_AUTHKEY", "")
+
+# Model load profiles ('default', 'low_memory': bf16 + low_cpu_mem_usage + mmap'd safetensors, or
+# 'int8': dynamic int8 quantization of Linear layers on CPU) for the LLM and the embedder.
+LLM_LOAD_PROFILE = os.getenv("LLM_LOAD_PROFILE", "default")
+EMBEDDER_LOAD_PROFILE = os.getenv("EMBEDDER_LOAD_PROFILE", "default")
+
+# Assisted decoding: default draft model (same tokenizer as the LLM) for single-sequence generation ('' = off)
+# and comma-separated list of the other draft models that requests may choose.
+LLM_DRAFT_MODEL = os.getenv("LLM_DRAFT_MODEL", "")
+LLM_DRAFT_MODELS = [m.strip() for m in os.getenv("LLM_DRAFT_MODELS", "").split(",") if m.strip()]
+
+# Embedder backend: 'torch' (EmbedderModel) or 'onnx' (ONNX Runtime on CPU). The ONNX graph is exported
+# once into ONNX_EMBEDDER_DIR, int8-quantized unless ONNX_EMBEDDER_QUANTIZE=0, and run with
+# ONNX_EMBEDDER_THREADS intra-op threads (0 = onnxruntime default).
+EMBEDDER_BACKEND = os.getenv("EMBEDDER_BACKEND", "torch")
+ONNX_EMBEDDER_DIR = os.getenv("ONNX_EMBEDDER_DIR", "onnx_models")
+ONNX_EMBEDDER_QUANTIZE = _env_int("ONNX_EMBEDDER_QUANTIZE", 1)
+ONNX_EMBEDDER_THREADS = _env_int("ONNX_EMBEDDER_THREADS", 0)
@@ -0,0 +1,48 @@
+# interfaces/api/inference.py
+import logging
+from typing import Any, Callable, Optional
+from fastapi import HTTPException, Request
+from app.infrastructure.executors.inference_executor import (InferenceDeadlineExceeded, InferenceQueueFull,
+                                                             get_inference_executor)
+from app.infrastructure import settings
+
+logger = logging.getLogger(__name__)
+
+# Clients may shorten (not extend) the default queue-wait deadline with this header, in milliseconds.
+TIMEOUT_HEADER = "X-Request-Timeout-Ms"
+
+def _request_timeout(request: Request) -> Optional[float]:
+    timeout_ms = settings.INFERENCE_REQUEST_TIMEOUT_MS
+    header = request.headers.get(TIMEOUT_HEADER)
+    if header is not None:
+        try:
+            requested = int(header)
+        except ValueError:
+            raise HTTPException(400, f"{TIMEOUT_HEADER} must be an integer")
+        if requested <= 0:
+            raise HTTPException(400, f"{TIMEOUT_HEADER} must be greater than 0")
+        timeout_ms = min(timeout_ms, requested) if timeout_ms > 0 else requested
+    return timeout_ms / 1000 if timeout_ms > 0 else None
+
+async def run_inference(request: Request, fn: Callable[..., Any], *args: Any) -> Any:
+    # Runs fn(*args) on the inference executor, mapping admission failures to HTTP errors:
+    # 429 when the queue is full, 503 when the deadline passes before the work starts.
+    timeout = _request_timeout(request)
+    try:
+        return await get_inference_executor().run(fn, *args, timeout=timeout)
+    except InferenceQueueFull as e:
+        logger.warning(f"Rejected {request.url.path}: {str(e)}")
+        raise HTTPException(429, str(e), headers={"Retry-After": "1"})
+    except InferenceDeadlineExceeded as e:
+        logger.warning(f"Rejected {request.url.path}: {str(e)}")
+        raise HTTPException(503, str(e))
+
+def admit_stream(request: Request) -> Callable[[], None]:
+    # Streams take their turn on the model's batcher worker, not on the executor, but each open stream
+    # counts against the executor's queue limit. Returns the function that releases its place, which
+    # the stream response calls when it ends.
+    try:
+        return get_inference_executor().open_stream()
+    except InferenceQueueFull as e:
+        logger.warning(f"Rejected {request.url.path}: {str(e)}")
+        raise HTTPException(429, str(e), headers={"Retry-After": "1"})
@@ -0,0 +1,162 @@
+# interfaces/api/jobs.py
+import logging
+import signal
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from app.interfaces.api.schemas.requests import GenerationRequest, BulkParseRequest, BulkVerificationRequest
+from app.interfaces.api.mappers import build_parse_configuration, build_verification_process
+from app.infrastructure.adapters.llm_service import get_llm, with_draft_model
+from app.infrastructure.adapters.embeddings_service import get_embedder
+from app.infrastructure.executors.verification_executor import get_verification_executor
+from app.infrastructure.jobs.sqlite_job_store import SQLiteJobStore
+from app.infrastructure.jobs.job_workers import JobWorkerPool
+from app.infrastructure import settings
+from app.domain.entities import ParsedResult, ParseEntry
+from app.domain.services.execution_planner import ExecutionPlanner
+from app.domain.services.parse_service import ParseService
+from app.domain.services.verifier_service import VerifierService
+from app.domain.services.verification_planner import VerificationPlanner
+from app.application.use_cases.generate_text_use_case import GenerateTextUseCase
+from app.application.use_cases.bulk_parse_use_case import BulkParseUseCase
+from app.application.use_cases.bulk_verify_text_use_case import BulkVerifyTextUseCase
+from app.application.use_cases.job_queue_use_case import JobHandler, JobQueueUseCase
+
+logger = logging.getLogger(__name__)
+
+# Job payloads are the API requests, stored as JSON, plus a "units" entry pinned at submission.
+
+class GenerationJobHandler(JobHandler):
+    # One unit per generate call of the execution plan.
+    def prepare(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        req = GenerationRequest(**payload)
+        # Results are stored unit by unit, so a job cannot group responses across the whole generation.
+        if req.deduplicate or req.dedup_threshold is not None:
+            raise ValueError("Deduplication is not supported for generation jobs; use POST /generation/deduplicate on the results")
+        planner = ExecutionPlanner(settings.GENERATION_MAX_SEQUENCES_PER_BATCH, settings.GENERATION_MAX_BATCH_TOKENS)
+        # Validation only: the model is loaded when the job runs.
+        with_draft_model(None, req.draft_model)
+        plan = GenerateTextUseCase(None, planner).plan(req.system_prompt, req.user_prompt, req.num_return_sequences,
+                                                       req.max_new_tokens, req.num_executions, req.reference_data)
+        return {**payload, "units": plan}, len(plan)
+
+    def run_unit(self, payload: Dict[str, Any], unit_index: int) -> List[Any]:
+        req = GenerationRequest(**{k: v for k, v in payload.items() if k != "units"})
+        sizes = payload["units"]
+        offset = sum(sizes[:unit_index])
+        use_case = GenerateTextUseCase(with_draft_model(get_llm(req.model), req.draft_model), ExecutionPlanner(max(sizes), 0))
+        results = use_case.execute(req.system_prompt, req.user_prompt, sizes[unit_index], req.max_new_tokens, 1,
+                                   req.reference_data)
+        return [
+            {"execution": (offset + i) // req.num_return_sequences, "sequence": (offset + i) % req.num_return_sequences,
+             "response": r.response}
+            for i, r in enumerate(results)
+        ]
+
+class ParseJobHandler(JobHandler):
+    # One unit per chunk of responses.
+    def prepare(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        req = BulkParseRequest(**payload)
+        # Invalid regexes raise re.error here, before the job is queued.
+        ParseService().plan_cache.get_or_compile(build_parse_configuration(req.config))
+        chunk_size = max(1, settings.PARSE_BULK_CHUNK_SIZE)
+        return {**payload, "units": chunk_size}, -(-len(req.responses) // chunk_size)
+
+    def run_unit(self, payload: Dict[str, Any], unit_index: int) -> List[Any]:
+        req = BulkParseRequest(**{k: v for k, v in payload.items() if k != "units"})
+        chunk_size = payload["units"]
+        start = unit_index * chunk_size
+        parse_service = ParseService(rule_timeout_ms=settings.PARSE_REGEX_RULE_TIMEOUT_MS,
+                                     total_timeout_ms=settings.PARSE_REGEX_TOTAL_TIMEOUT_MS,
+                                     linear_engine=bool(settings.PARSE_REGEX_LINEAR_ENGINE))
+        results = BulkParseUseCase(parse_service, chunk_size=chunk_size).execute(
+            req.responses[start:start + chunk_size], build_parse_configuration(req.config)
+        )
+        for result in results:
+            result["index"] += start
+        return results
+
+class VerificationJobHandler(JobHandler):
+    # One unit per chunk of parsed results, verified together as in /verification/bulk.
+    def prepare(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        req = BulkVerificationRequest(**payload)
+        build_verification_process(req.process)
+        unit_size = max(1, settings.JOBS_VERIFICATION_UNIT_SIZE)
+        return {**payload, "units": unit_size}, -(-len(req.results) // unit_size)
+
+    def run_unit(self, payload: Dict[str, Any], unit_index: int) -> List[Any]:
+        req = BulkVerificationRequest(**{k: v for k, v in payload.items() if k != "units"})
+        unit_size = payload["units"]
+        chunk = req.results[unit_index * unit_size:(unit_index + 1) * unit_size]
+        llm = get_llm()
+        embedder = get_embedder()
+        use_case = BulkVerifyTextUseCase(VerifierService(), embedder.similarity_matrix, llm.generate,
+                                         llm.score_continuations, llm.count_tokens, VerificationPlanner(),
+                                         get_verification_executor())
+        verified = use_case.execute([ParsedResult([ParseEntry(ed) for ed in entries]) for entries in chunk],
+                                    build_verification_process(req.process))
+        return [
+            {
+                "verification_methods_passed": r.verification_methods_passed,
+                "verification_methods_failed": r.verification_methods_failed,
+                "verification_methods_skipped": r.verification_methods_skipped,
+                "verification_stats": r.verification_stats,
+                "final_status": r.final_status,
+                "entries": [e.data for e in r.entries]
+            }
+            for r in verified
+        ]
+
+_queue: Optional[JobQueueUseCase] = None
+_workers: Optional[JobWorkerPool] = None
+_lock = threading.Lock()
+
+def get_job_queue() -> JobQueueUseCase:
+    # Created on first use (or at startup). With JOBS_RUN_WORKERS, jobs interrupted in any process (no heartbeat
+    # for JOBS_STALE_AFTER_MS) are re-queued and the workers started; jobs that other live processes are running
+    # are left alone.
+    return _get_job_queue(bool(settings.JOBS_RUN_WORKERS))
+
+def _get_job_queue(run_workers: bool) -> JobQueueUseCase:
+    global _queue, _workers
+    if _queue is None:
+        with _lock:
+            if _queue is None:
+                queue = JobQueueUseCase(SQLiteJobStore(settings.JOBS_DB_PATH), {
+                    "generation": GenerationJobHandler(),
+                    "parse": ParseJobHandler(),
+                    "verification": VerificationJobHandler()
+                })
+                if run_workers:
+                    stale_after_s = settings.JOBS_STALE_AFTER_MS / 1000.0
+                    queue.recover(stale_after_s)
+                    _workers = JobWorkerPool(queue.run_next, settings.JOBS_MAX_WORKERS, settings.JOBS_POLL_INTERVAL_MS,
+                                             lambda: queue.heartbeat(stale_after_s), settings.JOBS_HEARTBEAT_INTERVAL_MS)
+                    _workers.start()
+                _queue = queue
+    return _queue
+
+def notify_job_workers() -> None:
+    if _workers is not None:
+        _workers.notify()
+
+def stop_job_workers() -> None:
+    # Running jobs are released after their current unit; one that outlasts JOBS_SHUTDOWN_TIMEOUT_MS is
+    # re-queued by another process once its heartbeat goes stale.
+    if _workers is not None and not _workers.stop(settings.JOBS_SHUTDOWN_TIMEOUT_MS / 1000.0):
+        logger.warning("Job workers still busy at shutdown")
+
+def main() -> None:
+    # Runs the job workers in a process of their own, for API processes started with JOBS_RUN_WORKERS=0.
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S')
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopped.set())
+    _get_job_queue(True)
+    try:
+        stopped.wait()
+    except KeyboardInterrupt:
+        pass
+    stop_job_workers()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# interfaces/api/mappers.py
+from app.interfaces.api.schemas.requests import ParseConfigurationRequest, VerificationProcessRequest
+from app.domain.entities import (VerificationMethod, VerificationMethodType, VerificationMethodMode,
+                                VerificationProcess, EmbeddingVerificationSettings, ConsensusVerificationSettings,
+                                ConsensusMode, EmbeddingAggregation, ParseConfiguration, ParseRule, ParseMode, ParseScope,
+                                ParseFallbackStrategy, ParseMultipleStrategy)
+
+def build_parse_configuration(req: ParseConfigurationRequest) -> ParseConfiguration:
+    # The request schema already validates the enum fields; this only maps them to domain objects.
+    rules = []
+    for r in req.rules:
+        rule = ParseRule(
+            label=r.label,
+            mode=ParseMode(r.mode),
+            pattern=r.pattern,
+            secondary_pattern=r.secondary_pattern,
+            scope=ParseScope(r.scope),
+            fallback_strategy=ParseFallbackStrategy(r.fallback_strategy),
+            fallback_value=r.fallback_value,
+            multiple_strategy=ParseMultipleStrategy(r.multiple_strategy)
+        )
+        rules.append(rule)
+    return ParseConfiguration(rules, req.rule_timeout_ms, req.total_timeout_ms)
+
+def build_verification_process(req: VerificationProcessRequest) -> VerificationProcess:
+    methods = []
+    for m in req.methods:
+        method_type = VerificationMethodType(m.type.lower())
+        mode = VerificationMethodMode(m.mode.lower())
+        embedding_settings = None
+        consensus_settings = None
+
+        if method_type == VerificationMethodType.EMBEDDING and m.embedding_settings:
+            embedding_settings = EmbeddingVerificationSettings(
+                lower_threshold=m.embedding_settings["lower_threshold"],
+                upper_threshold=m.embedding_settings["upper_threshold"],
+                reference_text=m.embedding_settings.get("reference_text"),
+                reference_texts=m.embedding_settings.get("reference_texts"),
+                aggregation=EmbeddingAggregation(m.embedding_settings.get("aggregation", "max").lower()),
+                top_k=m.embedding_settings.get("top_k", 1)
+            )
+            if not embedding_settings.references:
+                raise ValueError(f"Embedding method '{m.name}' needs 'reference_text' or 'reference_texts'")
+        if method_type == VerificationMethodType.CONSENSUS and m.consensus_settings:
+            consensus_mode = ConsensusMode(m.consensus_settings.get("mode", "sampling").lower())
+            # Sampling settings are only mandatory when the method actually samples responses
+            sampling = m.consensus_settings if consensus_mode == ConsensusMode.SAMPLING else {
+                "num_responses": 1, "num_positive_required": 1, "max_new_tokens": 1, **m.consensus_settings
+            }
+            consensus_settings = ConsensusVerificationSettings(
+                system_prompt=m.consensus_settings["system_prompt"],
+                user_prompt=m.consensus_settings["user_prompt"],
+                placeholders=m.consensus_settings["placeholders"],
+                positive_responses=m.consensus_settings["positive_responses"],
+                num_responses=sampling["num_responses"],
+                num_positive_required=sampling["num_positive_required"],
+                max_new_tokens=sampling["max_new_tokens"],
+                mode=consensus_mode,
+                negative_responses=m.consensus_settings.get("negative_responses", []),
+                probability_threshold=m.consensus_settings.get("probability_threshold", 0.5),
+                batch_size=m.consensus_settings.get("batch_size"),
+                length_normalized=bool(m.consensus_settings.get("length_normalized", True))
+            )
+            if consensus_mode == ConsensusMode.LOGPROB:
+                if not consensus_settings.negative_responses:
+                    raise ValueError(f"Logprob consensus method '{m.name}' needs 'negative_responses'")
+                if not all(consensus_settings.positive_responses) or not all(consensus_settings.negative_responses):
+                    raise ValueError(f"Logprob consensus method '{m.name}' has an empty positive or negative response")
+
+        method = VerificationMethod(
+            name=m.name,
+            method_type=method_type,
+            mode=mode,
+            embedding_settings=embedding_settings,
+            consensus_settings=consensus_settings
+        )
+        methods.append(method)
+
+    return VerificationProcess(
+        methods=methods,
+        required_for_confirmed=req.required_for_confirmed,
+        required_for_review=req.required_for_review
+    )
@@ -1,17 +1,33 @@
 # interfaces/api/routes/generation.py
-from fastapi import APIRouter, HTTPException
-from typing import Any
-from app.interfaces.api.schemas.requests import GenerationRequest
-from app.infrastructure.adapters.llm_service import get_llm
+from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, List, Optional
+from app.interfaces.api.schemas.requests import DatasetGenerationRequest, DeduplicationRequest, GenerationRequest
+from app.infrastructure.adapters.llm_service import get_llm, with_draft_model
+from app.infrastructure.adapters.embeddings_service import get_embedder
+from app.infrastructure.embeddings.vector_index import create_vector_index
 from app.application.use_cases.generate_text_use_case import GenerateTextUseCase
+from app.domain.services.deduplicator import SemanticDeduplicator
+from app.domain.services.execution_planner import ExecutionPlanner
+from app.interfaces.api.inference import admit_stream, run_inference
+from app.interfaces.api.streaming import ndjson_response
+from app.infrastructure import settings
+import csv
+import io
+import json
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def _deduplicator(threshold: Optional[float]) -> SemanticDeduplicator:
+    threshold = threshold if threshold is not None else settings.DEDUP_SIMILARITY_THRESHOLD
+    return SemanticDeduplicator(get_embedder().embed_many, create_vector_index, threshold, settings.DEDUP_BATCH_SIZE)
+
 @router.post("/", summary="Generar texto", description="Genera texto utilizando el modelo LLM especificado. Permite placeholders y datos de referencia para sustituir en los prompts.")
-def generate_text(req: GenerationRequest) -> Any:
+async def generate_text(req: GenerationRequest, request: Request) -> Any:
     logger.info(f"Received generation request: {req}")
     """
     Este endpoint recibe una configuración para generación de texto:
@@ -22,11 +38,24 @@ def generate_text(req: GenerationRequest) -> Any:
     - max_new_tokens: Límite de tokens a generar.
     - num_executions: Repetir la generación varias veces.
     - reference_data: Diccionario para reemplazar placeholders en los prompts.
+    - deduplicate, dedup_threshold (opcionales): agrupa las respuestas casi idénticas y devuelve solo la primera de cada grupo.
+    - draft_model (opcional): modelo borrador para decodificación asistida; su tasa de aceptación y tokens/s se ven en GET /system/models.
 
     Retorna una lista de resultados con el `response` generado y el `verification_status` (por defecto None hasta que se verifique).
+    Con `deduplicate`, cada resultado incluye además `cluster_size`: cuántas respuestas generadas representa.
     """
+    return await run_inference(request, _generate_text, req)
+
+def _generate_text(req: GenerationRequest) -> Any:
     llm = get_llm(req.model)
-    use_case = GenerateTextUseCase(llm)
+    planner = ExecutionPlanner(settings.GENERATION_MAX_SEQUENCES_PER_BATCH, settings.GENERATION_MAX_BATCH_TOKENS)
+    try:
+        llm = with_draft_model(llm, req.draft_model)
+        deduplicator = _deduplicator(req.dedup_threshold) if req.deduplicate else None
+    except ValueError as ve:
+        logger.error(f"ValueError occurred: {str(ve)}")
+        raise HTTPException(400, str(ve))
+    use_case = GenerateTextUseCase(llm, planner, deduplicator)
     try:
         results = use_case.execute(
             system_prompt=req.system_prompt,
@@ -34,9 +63,12 @@ def generate_text(req: GenerationRequest) -> Any:
             num_return_sequences=req.num_return_sequences,
             max_new_tokens=req.max_new_tokens,
             num_executions=req.num_executions,
-            reference_data=req.reference_data
+            reference_data=req.reference_data,
+            deduplicate=req.deduplicate
         )
         logger.info(f"Generated results: {results}")
+        if req.deduplicate:
+            return {"results": [{"response": r.response, "cluster_size": r.cluster_size} for r in results]}
         return {"results": [{"response": r.response} for r in results]}
     except ValueError as ve:
         logger.error(f"ValueError occurred: {str(ve)}")
@@ -46,4 +78,139 @@ def generate_text(req: GenerationRequest) -> Any:
         raise HTTPException(500, str(re))
     except Exception as e:
         logger.exception("Unexpected error occurred while generating text")
-        raise HTTPException(500, "Unexpected error occurred while generating text")
\ No newline at end of file
+        raise HTTPException(500, "Unexpected error occurred while generating text")
+
+@router.post("/stream", summary="Generar texto en streaming", description="Igual que la generación normal, pero devuelve los resultados como NDJSON a medida que se producen. Si el cliente se desconecta, la generación se cancela.")
+async def generate_text_stream(req: GenerationRequest, request: Request) -> Any:
+    logger.info(f"Received streaming generation request: {req}")
+    """
+    Recibe la misma configuración que `POST /generation/`.
+
+    Retorna un flujo NDJSON (una línea JSON por evento):
+    - `{"execution": e, "sequence": s, "token": "..."}`: fragmento de texto, solo cuando cada llamada al modelo genera una única secuencia.
+    - `{"execution": e, "sequence": s, "response": "..."}`: secuencia completa.
+    - `{"error": "..."}`: error durante la generación; el flujo termina.
+    """
+    llm = await run_in_threadpool(get_llm, req.model)
+    planner = ExecutionPlanner(settings.GENERATION_MAX_SEQUENCES_PER_BATCH, settings.GENERATION_MAX_BATCH_TOKENS)
+    use_case = GenerateTextUseCase(llm, planner)
+    cancel_event = threading.Event()
+    try:
+        events = use_case.execute_stream(
+            system_prompt=req.system_prompt,
+            user_prompt=req.user_prompt,
+            num_return_sequences=req.num_return_sequences,
+            max_new_tokens=req.max_new_tokens,
+            num_executions=req.num_executions,
+            reference_data=req.reference_data,
+            cancel_event=cancel_event
+        )
+    except ValueError as ve:
+        logger.error(f"ValueError occurred: {str(ve)}")
+        raise HTTPException(400, str(ve))
+
+    # Stops the decode and releases the model's stream when the client disconnects.
+    # Admitted once the request is valid; the stream holds its place in the inference queue until it ends.
+    return ndjson_response(request, events, cancel_event, release=admit_stream(request))
+
+def _read_rows(filename: str, content_type: str, data: bytes) -> List[Dict[str, str]]:
+    # CSV (with a header row) or JSONL (one object per line), by extension or content type.
+    text = data.decode("utf-8-sig")
+    if filename.lower().endswith(".csv") or content_type in ("text/csv", "application/csv"):
+        return [dict(row) for row in csv.DictReader(io.StringIO(text))]
+    rows = []
+    for n, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {n} is not valid JSON: {e.msg}")
+        if not isinstance(row, dict):
+            raise ValueError(f"Line {n} is not a JSON object")
+        rows.append({k: v if isinstance(v, str) else json.dumps(v) for k, v in row.items()})
+    return rows
+
+async def _stream_dataset(model: str, system_prompt: str, user_prompt: str, num_return_sequences: int,
+                          max_new_tokens: int, rows: List[Dict[str, str]], request: Request) -> Any:
+    llm = await run_in_threadpool(get_llm, model)
+    planner = ExecutionPlanner(settings.GENERATION_MAX_SEQUENCES_PER_BATCH, settings.GENERATION_MAX_BATCH_TOKENS)
+    use_case = GenerateTextUseCase(llm, planner)
+    cancel_event = threading.Event()
+    try:
+        events = use_case.execute_dataset_stream(system_prompt, user_prompt, num_return_sequences, max_new_tokens,
+                                                 rows, cancel_event)
+    except ValueError as ve:
+        logger.error(f"ValueError occurred: {str(ve)}")
+        raise HTTPException(400, str(ve))
+
+    # Stops before the next generate call when the client disconnects.
+    # Admitted once the request is valid; the stream holds its place in the inference queue until it ends.
+    return ndjson_response(request, events, cancel_event, release=admit_stream(request))
+
+@router.post("/dataset", summary="Generar texto sobre un conjunto de datos", description="Genera respuestas para cada fila de datos de referencia, agrupando filas de distintas longitudes en llamadas compartidas al modelo. Devuelve NDJSON.")
+async def generate_dataset(req: DatasetGenerationRequest, request: Request) -> Any:
+    logger.info(f"Received dataset generation request with {len(req.rows)} rows")
+    """
+    Recibe los prompts (con placeholders) y una lista de filas `rows`, cada una con los valores de los placeholders.
+    Las plantillas se compilan una sola vez y todas las filas se validan antes de empezar.
+
+    Retorna un flujo NDJSON (una línea JSON por evento), en el orden en que se generan:
+    - `{"row": i, "sequence": s, "response": "..."}`: respuesta `s` de la fila `i`.
+    - `{"error": "..."}`: error durante la generación; el flujo termina.
+    """
+    return await _stream_dataset(req.model, req.system_prompt, req.user_prompt, req.num_return_sequences,
+                                 req.max_new_tokens, req.rows, request)
+
+@router.post("/dataset/upload", summary="Generar texto sobre un fichero de datos", description="Igual que /generation/dataset, pero las filas se leen de un fichero JSONL o CSV subido.")
+async def generate_dataset_upload(request: Request, file: UploadFile = File(...), system_prompt: str = Form(...),
+                                  user_prompt: str = Form(...), model: str = Form("Qwen/Qwen2.5-Coder-3B-Instruct"),
+                                  num_return_sequences: int = Form(1, gt=0), max_new_tokens: int = Form(100, gt=0)) -> Any:
+    logger.info(f"Received dataset generation upload: {file.filename}")
+    """
+    Recibe un formulario multipart con el fichero `file` y los mismos campos que `POST /generation/dataset` (salvo `rows`):
+    - Fichero `.csv`: la primera línea es la cabecera con los nombres de los placeholders.
+    - En otro caso JSONL: un objeto JSON por línea.
+
+    Retorna el mismo flujo NDJSON que `POST /generation/dataset`.
+    """
+    try:
+        rows = _read_rows(file.filename or "", file.content_type or "", await file.read())
+    except (ValueError, csv.Error) as e:
+        logger.error(f"Invalid dataset file: {str(e)}")
+        raise HTTPException(400, f"Invalid dataset file: {str(e)}")
+    return await _stream_dataset(model, system_prompt, user_prompt, num_return_sequences, max_new_tokens, rows, request)
+
+@router.post("/deduplicate", summary="Eliminar textos casi duplicados", description="Agrupa textos por similitud coseno de sus embeddings y devuelve un representante por grupo con el tamaño de cada grupo.")
+async def deduplicate_texts(req: DeduplicationRequest, request: Request) -> Any:
+    logger.info(f"Received deduplication request with {len(req.texts)} texts")
+    """
+    Recibe:
+    - texts: Lista de textos (por ejemplo, respuestas generadas).
+    - threshold (opcional): Similitud coseno a partir de la cual dos textos se consideran duplicados.
+
+    Los textos se recorren en orden: cada uno se une al grupo del representante más parecido si la similitud alcanza
+    el umbral, o pasa a ser el representante de un grupo nuevo.
+
+    Retorna:
+    - `results`: Un elemento por grupo, `{"index": i, "response": "...", "cluster_size": n}`, donde `i` es la posición del representante.
+    - `clusters`: El grupo (posición en `results`) de cada texto de entrada.
+    """
+    return await run_inference(request, _deduplicate_texts, req)
+
+def _deduplicate_texts(req: DeduplicationRequest) -> Any:
+    try:
+        dedup = _deduplicator(req.threshold).deduplicate(req.texts)
+    except ValueError as ve:
+        logger.error(f"ValueError occurred: {str(ve)}")
+        raise HTTPException(400, str(ve))
+    except Exception as e:
+        logger.exception("Unexpected error occurred while deduplicating texts")
+        raise HTTPException(500, "Unexpected error occurred while deduplicating texts")
+    return {
+        "results": [
+            {"index": i, "response": req.texts[i], "cluster_size": size}
+            for i, size in zip(dedup.representatives, dedup.cluster_sizes)
+        ],
+        "clusters": dedup.clusters
+    }
@@ -0,0 +1,100 @@
+# interfaces/api/routes/jobs.py
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from typing import Any, Dict
+from app.interfaces.api.schemas.requests import GenerationRequest, BulkParseRequest, BulkVerificationRequest
+from app.interfaces.api.jobs import get_job_queue, notify_job_workers
+from app.domain.entities import Job, JobStatus
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+def _job_view(job: Job) -> Dict[str, Any]:
+    return {
+        "job_id": job.job_id,
+        "kind": job.kind,
+        "status": job.status.value,
+        "total_units": job.total_units,
+        "completed_units": job.completed_units,
+        "completed_items": job.completed_items,
+        "progress": job.completed_units / job.total_units if job.total_units else 1.0,
+        "cancel_requested": job.cancel_requested,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    }
+
+def _submit(kind: str, req: Any) -> Dict[str, Any]:
+    try:
+        job = get_job_queue().submit(kind, jsonable_encoder(req))
+    except re.error as e:
+        logger.error(f"Invalid regex in parse configuration: {str(e)}")
+        raise HTTPException(400, f"Invalid regex in parse configuration: {str(e)}")
+    except (ValueError, KeyError) as e:
+        logger.error(f"Invalid {kind} job: {str(e)}")
+        raise HTTPException(400, str(e))
+    notify_job_workers()
+    return _job_view(job)
+
+@router.post("/generation", summary="Encolar generación", description="Encola una generación (mismos campos que `POST /generation/`, salvo `deduplicate` y `dedup_threshold`, que se rechazan) como trabajo en segundo plano y devuelve su identificador.")
+def submit_generation_job(req: GenerationRequest) -> Any:
+    logger.info(f"Received generation job: {req}")
+    return _submit("generation", req)
+
+@router.post("/parse", summary="Encolar parseo en lote", description="Encola un parseo en lote (mismos campos que `POST /parse/bulk`) como trabajo en segundo plano y devuelve su identificador.")
+def submit_parse_job(req: BulkParseRequest) -> Any:
+    logger.info(f"Received parse job with {len(req.responses)} responses")
+    return _submit("parse", req)
+
+@router.post("/verification", summary="Encolar verificación en lote", description="Encola una verificación en lote (mismos campos que `POST /verification/bulk`) como trabajo en segundo plano y devuelve su identificador.")
+def submit_verification_job(req: BulkVerificationRequest) -> Any:
+    logger.info(f"Received verification job with {len(req.results)} results")
+    return _submit("verification", req)
+
+@router.get("/{job_id}", summary="Estado de un trabajo", description="Devuelve el estado y el progreso de un trabajo.")
+def get_job(job_id: str) -> Any:
+    """
+    Retorna:
+    - `status`: 'queued', 'running', 'completed', 'failed' o 'cancelled'.
+    - `total_units`, `completed_units`, `progress`: el trabajo se divide en unidades (llamadas de generación o bloques de
+      resultados); el progreso se guarda tras cada unidad y, si el servicio se reinicia, el trabajo continúa desde la
+      primera unidad no completada.
+    - `completed_items`: resultados disponibles en `GET /jobs/{job_id}/results`.
+    - `error`: mensaje de error si el trabajo ha fallado.
+    """
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(404, f"Job '{job_id}' not found")
+    return _job_view(job)
+
+@router.get("/{job_id}/results", summary="Resultados de un trabajo", description="Devuelve una página de los resultados ya disponibles de un trabajo, en orden.")
+def get_job_results(job_id: str, offset: int = Query(0, ge=0), limit: int = Query(100, gt=0, le=1000)) -> Any:
+    """
+    Los resultados de parseo y verificación tienen el mismo formato que en la API síncrona equivalente (`/parse/bulk`,
+    `/verification/bulk`). Los de generación son `{"execution", "sequence", "response"}`: además de la respuesta, la
+    ejecución y la secuencia a las que corresponde. Pueden pedirse mientras el trabajo sigue en curso.
+
+    `next_offset` indica desde dónde pedir la siguiente página; es null cuando el trabajo ha terminado y no quedan más resultados.
+    """
+    job, results = get_job_queue().results(job_id, offset, limit)
+    if job is None:
+        raise HTTPException(404, f"Job '{job_id}' not found")
+    next_offset = offset + len(results)
+    finished = job.status not in (JobStatus.QUEUED, JobStatus.RUNNING)
+    return {
+        "job_id": job.job_id,
+        "status": job.status.value,
+        "offset": offset,
+        "results": results,
+        "next_offset": None if finished and next_offset >= job.completed_items else next_offset
+    }
+
+@router.post("/{job_id}/cancel", summary="Cancelar un trabajo", description="Cancela un trabajo. Si está en cola se cancela inmediatamente; si está en curso, se detiene al terminar la unidad actual. Los resultados ya guardados se conservan.")
+def cancel_job(job_id: str) -> Any:
+    job = get_job_queue().cancel(job_id)
+    if job is None:
+        raise HTTPException(404, f"Job '{job_id}' not found")
+    return _job_view(job)
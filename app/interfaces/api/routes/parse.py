@@ -1,16 +1,28 @@
 # interfaces/api/routes/parse.py
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
 from typing import Any
-from app.interfaces.api.schemas.requests import ParseRequest
-from app.domain.entities import GeneratedResult, ParseMultipleStrategy, ParseRule, ParseMode, ParseScope, ParseFallbackStrategy, ParseConfiguration
+from app.interfaces.api.schemas.requests import ParseRequest, BulkParseRequest
+from app.interfaces.api.mappers import build_parse_configuration
+from app.interfaces.api.streaming import ndjson_response
+from app.domain.entities import GeneratedResult
 from app.domain.services.parse_service import ParseService
 from app.application.use_cases.parse_generated_output_use_case import ParseGeneratedOutputUseCase
+from app.application.use_cases.bulk_parse_use_case import BulkParseUseCase
+from app.infrastructure.executors.parse_pool import parse_chunks_in_processes
+from app.infrastructure import settings
 import logging
+import re
+import threading
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def _parse_service() -> ParseService:
+    return ParseService(rule_timeout_ms=settings.PARSE_REGEX_RULE_TIMEOUT_MS,
+                        total_timeout_ms=settings.PARSE_REGEX_TOTAL_TIMEOUT_MS,
+                        linear_engine=bool(settings.PARSE_REGEX_LINEAR_ENGINE))
+
 @router.post("/", summary="Parsear texto generado", description="Aplica reglas de parseo (regex o palabras clave) al texto generado para extraer placeholders y obtener un GeneratedResultToVerify.")
 def parse_result(req: ParseRequest) -> Any:
     logger.info(f"Received parse request: {req}")
@@ -28,33 +40,72 @@ def parse_result(req: ParseRequest) -> Any:
     - `fallback_strategy`: Qué hacer si no se encuentra coincidencia ('error', 'empty', 'custom').
     - `fallback_value`: Valor por defecto si fallback='custom'.
 
-    Retorna las entradas parseadas (un array de diccionarios con placeholders y sus valores) listas para la verificación.
+    Las reglas 'regex' tienen un tiempo máximo por regla y por texto (`rule_timeout_ms`, `total_timeout_ms`, que solo
+    pueden reducir los límites del servidor); una regla que lo agota se trata como sin coincidencia.
+
+    Retorna las entradas parseadas (un array de diccionarios con placeholders y sus valores) listas para la verificación,
+    y `parse_stats` con el tiempo (ms) de cada regla, el total y las reglas que agotaron su tiempo.
     """
-    rules = []
-    for r in req.config.rules:
-        mode = ParseMode(r.mode.lower())
-        scope = ParseScope(r.scope.lower())
-        fallback = ParseFallbackStrategy(r.fallback_strategy.lower())
-        multiple = ParseMultipleStrategy(r.multiple_strategy.lower())
-        rule = ParseRule(
-            label=r.label,
-            mode=mode,
-            pattern=r.pattern,
-            secondary_pattern=r.secondary_pattern,
-            scope=scope,
-            fallback_strategy=fallback,
-            fallback_value=r.fallback_value,
-            multiple_strategy=multiple
-        )
-        rules.append(rule)
-    config = ParseConfiguration(rules)
+    config = build_parse_configuration(req.config)
 
     result = GeneratedResult(req.response)
-    use_case = ParseGeneratedOutputUseCase(ParseService())
-    verify_result = use_case.execute(result, config)
+    use_case = ParseGeneratedOutputUseCase(_parse_service())
+    try:
+        verify_result = use_case.execute(result, config)
+    except re.error as e:
+        logger.error(f"Invalid regex in parse configuration: {str(e)}")
+        raise HTTPException(400, f"Invalid regex in parse configuration: {str(e)}")
+    except ValueError as ve:
+        logger.error(f"ValueError occurred: {str(ve)}")
+        raise HTTPException(400, str(ve))
 
     logger.info(f"Parsed result: {verify_result.entries}, Final status: {verify_result.final_status}")
     return {
         "entries": [e.data for e in verify_result.entries],
-        "verification_status": verify_result.final_status
-    }
\ No newline at end of file
+        "verification_status": verify_result.final_status,
+        "parse_stats": verify_result.parse_stats
+    }
+
+def _bulk_parse_use_case() -> BulkParseUseCase:
+    return BulkParseUseCase(_parse_service(), parse_chunks_in_processes, settings.PARSE_BULK_CHUNK_SIZE)
+
+@router.post("/bulk", summary="Parsear textos en lote", description="Aplica la misma configuración de parseo a muchos textos generados, repartiendo el trabajo entre varios procesos.")
+def parse_bulk(req: BulkParseRequest) -> Any:
+    logger.info(f"Received bulk parse request with {len(req.responses)} responses")
+    """
+    Recibe:
+    - responses: Lista de textos generados por el LLM.
+    - config: Configuración de parseo (igual que en `POST /parse/`), que se compila una sola vez.
+
+    Retorna `results`, en el mismo orden que `responses`. Cada elemento es `{"index": i, "entries": [...]}`
+    o, si el parseo de ese texto falla (p. ej. fallback 'error'), `{"index": i, "error": "..."}`; ambos incluyen
+    `parse_stats` (tiempos por regla, igual que en `POST /parse/`).
+    """
+    config = build_parse_configuration(req.config)
+    try:
+        results = _bulk_parse_use_case().execute(req.responses, config)
+    except re.error as e:
+        logger.error(f"Invalid regex in parse configuration: {str(e)}")
+        raise HTTPException(400, f"Invalid regex in parse configuration: {str(e)}")
+    logger.info(f"Bulk parse finished: {sum(1 for r in results if 'error' in r)} errors out of {len(results)}")
+    return {"results": results}
+
+@router.post("/bulk/stream", summary="Parsear textos en lote en streaming", description="Igual que el parseo en lote, pero devuelve cada resultado como una línea NDJSON en cuanto está disponible.")
+async def parse_bulk_stream(req: BulkParseRequest, request: Request) -> Any:
+    logger.info(f"Received streaming bulk parse request with {len(req.responses)} responses")
+    """
+    Recibe la misma configuración que `POST /parse/bulk`.
+
+    Retorna un flujo NDJSON con una línea por texto, en orden: `{"index": i, "entries": [...]}` o `{"index": i, "error": "..."}`.
+    Si el cliente se desconecta, se cancela el trabajo pendiente.
+    """
+    config = build_parse_configuration(req.config)
+    cancel_event = threading.Event()
+    try:
+        events = _bulk_parse_use_case().execute_stream(req.responses, config, cancel_event)
+    except re.error as e:
+        logger.error(f"Invalid regex in parse configuration: {str(e)}")
+        raise HTTPException(400, f"Invalid regex in parse configuration: {str(e)}")
+
+    # When the client disconnects, chunks not yet started on the shared worker processes are cancelled.
+    return ndjson_response(request, events, cancel_event, ())
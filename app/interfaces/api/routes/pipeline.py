@@ -0,0 +1,91 @@
+# interfaces/api/routes/pipeline.py
+from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from typing import Any
+from app.interfaces.api.schemas.requests import PipelineRequest
+from app.interfaces.api.mappers import build_parse_configuration, build_verification_process
+from app.interfaces.api.inference import admit_stream
+from app.interfaces.api.streaming import ndjson_response
+from app.infrastructure.adapters.llm_service import get_llm
+from app.infrastructure.adapters.embeddings_service import get_embedder
+from app.infrastructure.executors.pipeline_executor import get_pipeline_executor
+from app.infrastructure.executors.verification_executor import get_verification_executor
+from app.infrastructure import settings
+from app.domain.services.execution_planner import ExecutionPlanner
+from app.domain.services.parse_service import ParseService
+from app.domain.services.verifier_service import VerifierService
+from app.domain.services.verification_planner import VerificationPlanner
+from app.application.use_cases.generate_text_use_case import GenerateTextUseCase
+from app.application.use_cases.parse_generated_output_use_case import ParseGeneratedOutputUseCase
+from app.application.use_cases.verify_text_use_case import VerifyTextUseCase
+from app.application.use_cases.pipeline_use_case import GenerateParseVerifyUseCase
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.post("/", summary="Generar, parsear y verificar", description="Encadena generación, parseo y verificación en memoria. Las respuestas de cada llamada de generación se parsean y verifican mientras se genera la siguiente, y los resultados se devuelven como NDJSON.")
+async def run_pipeline(req: PipelineRequest, request: Request) -> Any:
+    logger.info(f"Received pipeline request: {req}")
+    """
+    Recibe los mismos campos que `POST /generation/`, más:
+    - config: Configuración de parseo (igual que en `POST /parse/`).
+    - process: Proceso de verificación (igual que en `POST /verification/`).
+    - sequences_per_call: Respuestas generadas por llamada al modelo (1 por defecto). Las respuestas de una llamada se
+      parsean y verifican cuando termina, mientras se generan las de la siguiente; con una sola llamada las etapas no
+      se solapan. Valores mayores aprovechan mejor el batching a cambio de menos solapamiento.
+
+    Retorna un flujo NDJSON, una línea por respuesta generada en cuanto termina su verificación:
+    - `execution`, `sequence`, `response`: posición y texto de la respuesta generada.
+    - `entries`, `parse_stats`, `verification_methods_passed`, `verification_methods_failed`, `verification_methods_skipped`, `verification_stats`, `final_status`: igual que en `POST /parse/` y `POST /verification/`.
+    - `error`: si el parseo o la verificación fallan (si falla el parseo, `final_status` es 'descartada').
+    - `timings`: `generated_ms` (momento en que se terminó de generar, desde el inicio), `parse_ms` y `verify_ms`.
+
+    La última línea es `{"summary": {...}}` con el número de resultados y errores, `generation_ms`, la suma de `parse_ms`
+    y `verify_ms`, y `total_ms`. Si la generación falla se envía `{"error": "..."}` y el flujo termina.
+    """
+    config = build_parse_configuration(req.config)
+    try:
+        process = build_verification_process(req.process)
+    except ValueError as ve:
+        logger.error(f"ValueError occurred: {str(ve)}")
+        raise HTTPException(400, str(ve))
+
+    llm = await run_in_threadpool(get_llm, req.model)
+    embedder = await run_in_threadpool(get_embedder)
+    planner = ExecutionPlanner(settings.GENERATION_MAX_SEQUENCES_PER_BATCH, settings.GENERATION_MAX_BATCH_TOKENS)
+    parse_service = ParseService(rule_timeout_ms=settings.PARSE_REGEX_RULE_TIMEOUT_MS,
+                                 total_timeout_ms=settings.PARSE_REGEX_TOTAL_TIMEOUT_MS,
+                                 linear_engine=bool(settings.PARSE_REGEX_LINEAR_ENGINE))
+    verify_use_case = VerifyTextUseCase(VerifierService(), embedder.get_similarity, llm.generate, llm.score_continuations,
+                                        llm.count_tokens, VerificationPlanner(), get_verification_executor(),
+                                        embedder.similarity_matrix)
+    use_case = GenerateParseVerifyUseCase(GenerateTextUseCase(llm, planner), ParseGeneratedOutputUseCase(parse_service),
+                                          verify_use_case, get_pipeline_executor())
+    cancel_event = threading.Event()
+    try:
+        events = use_case.execute_stream(
+            system_prompt=req.system_prompt,
+            user_prompt=req.user_prompt,
+            num_return_sequences=req.num_return_sequences,
+            max_new_tokens=req.max_new_tokens,
+            num_executions=req.num_executions,
+            reference_data=req.reference_data,
+            config=config,
+            process=process,
+            cancel_event=cancel_event,
+            sequences_per_call=req.sequences_per_call
+        )
+    except re.error as e:
+        logger.error(f"Invalid regex in parse configuration: {str(e)}")
+        raise HTTPException(400, f"Invalid regex in parse configuration: {str(e)}")
+    except ValueError as ve:
+        logger.error(f"ValueError occurred: {str(ve)}")
+        raise HTTPException(400, str(ve))
+
+    # Stops the decode and cancels results still waiting to be parsed and verified when the client disconnects.
+    # Admitted once the request is valid; the stream holds its place in the inference queue until it ends.
+    return ndjson_response(request, events, cancel_event, release=admit_stream(request))
@@ -0,0 +1,46 @@
+# interfaces/api/routes/system.py
+from fastapi import APIRouter
+from typing import Any
+from app.interfaces.api.schemas.requests import ModelUnloadRequest
+from app.infrastructure.registry.model_registry import get_model_registry, process_rss_bytes
+from app.infrastructure.embeddings.embedding_cache import get_embedding_cache
+from app.infrastructure.executors.inference_executor import get_inference_executor
+from app.infrastructure.llm.prefix_cache import get_prefix_cache
+from app.domain.services.parse_plan import get_parse_plan_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/models", summary="Listar modelos cargados", description="Devuelve los modelos cargados en el registro compartido del proceso, con su perfil de carga, tamaño estimado en memoria, tiempo de carga, crecimiento de la memoria residente (RSS) durante la carga y estadísticas de uso.")
+def list_models() -> Any:
+    registry = get_model_registry()
+    return {
+        "models": registry.list_models(),
+        "total_memory_bytes": registry.total_memory_bytes(),
+        "max_memory_bytes": registry.max_memory_bytes,
+        "process_rss_bytes": process_rss_bytes()
+    }
+
+@router.post("/models/unload", summary="Descargar modelo", description="Elimina un modelo del registro compartido para liberar memoria. Se volverá a cargar en la siguiente petición que lo use.")
+def unload_model(req: ModelUnloadRequest) -> Any:
+    logger.info(f"Received unload request: {req}")
+    unloaded = get_model_registry().unload(req.model, req.kind)
+    return {"unloaded": unloaded}
+
+@router.get("/embedding-cache", summary="Estadísticas de la caché de embeddings", description="Devuelve el número de vectores cacheados en memoria y en disco, junto con los aciertos y fallos de la caché.")
+def embedding_cache_stats() -> Any:
+    return get_embedding_cache().stats()
+
+@router.get("/prefix-cache", summary="Estadísticas de la caché de prefijos", description="Devuelve los prefijos de prompt (KV cache) almacenados, la tasa de aciertos y los tokens de prefill ahorrados.")
+def prefix_cache_stats() -> Any:
+    return get_prefix_cache().stats()
+
+@router.get("/parse-plan-cache", summary="Estadísticas de la caché de planes de parseo", description="Devuelve el número de configuraciones de parseo precompiladas en caché y sus aciertos y fallos.")
+def parse_plan_cache_stats() -> Any:
+    return get_parse_plan_cache().stats()
+
+@router.get("/inference", summary="Estadísticas del ejecutor de inferencia", description="Devuelve la cola de peticiones que esperan al modelo: profundidad, tareas en curso, rechazos (429), plazos vencidos (503) y tiempos de espera recientes.")
+def inference_stats() -> Any:
+    return get_inference_executor().stats()
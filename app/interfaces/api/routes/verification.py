@@ -1,14 +1,17 @@
 # interfaces/api/routes/verification.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from typing import Any
-from app.interfaces.api.schemas.requests import VerificationRequest
+from app.interfaces.api.schemas.requests import VerificationRequest, BulkVerificationRequest
+from app.interfaces.api.mappers import build_verification_process
+from app.interfaces.api.inference import run_inference
 from app.infrastructure.adapters.llm_service import get_llm
 from app.infrastructure.adapters.embeddings_service import get_embedder
 from app.domain.services.verifier_service import VerifierService
+from app.domain.services.verification_planner import VerificationPlanner
+from app.infrastructure.executors.verification_executor import get_verification_executor
 from app.application.use_cases.verify_text_use_case import VerifyTextUseCase
-from app.domain.entities import (ParsedResult, ParseEntry,
-                                VerificationMethod, VerificationMethodType, VerificationMethodMode,
-                                VerificationProcess, EmbeddingVerificationSettings, ConsensusVerificationSettings)
+from app.application.use_cases.bulk_verify_text_use_case import BulkVerifyTextUseCase
+from app.domain.entities import ParsedResult, ParseEntry
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,7 +19,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/", summary="Verificar resultado parseado", description="Dado un resultado parseado (GeneratedResultToVerify) y un VerificationProcess, aplica métodos de verificación (embedding, consensus) y determina el estado final.")
-def verify_result(req: VerificationRequest) -> Any:
+async def verify_result(req: VerificationRequest, request: Request) -> Any:
     logger.info(f"Received verification request: {req}")
     """
     Este endpoint recibe:
@@ -27,61 +30,42 @@ def verify_result(req: VerificationRequest) -> Any:
     - `name`: Nombre del método
     - `type`: 'embedding' o 'consensus'
     - `mode`: 'eliminatorio' o 'acumulativo'
-    - `embedding_settings` (si tipo embedding): lower_threshold, upper_threshold, reference_text
+    - `embedding_settings` (si tipo embedding): lower_threshold, upper_threshold, reference_text o reference_texts
+      - `aggregation` (opcional, con varias referencias): 'max' (por defecto), 'mean' o 'top_k' (media de las `top_k` referencias más parecidas)
     - `consensus_settings` (si tipo consensus): system_prompt, user_prompt, placeholders, positive_responses, num_responses, num_positive_required, max_new_tokens
+      - `mode` (opcional): 'sampling' (por defecto, genera num_responses respuestas y cuenta las positivas) o 'logprob' (puntúa la probabilidad de cada respuesta positiva/negativa en una sola pasada del modelo)
+      - `negative_responses`, `probability_threshold` (opcionales, modo 'logprob')
+      - `batch_size` (opcional, modo 'sampling'): respuestas generadas por paso; la generación se detiene en cuanto el resultado está decidido
+
+    Los métodos 'eliminatorio' se ejecutan primero, de menor a mayor coste estimado. Los 'acumulativo' se ejecutan en paralelo
+    y se dejan de evaluar en cuanto el estado final ya no puede cambiar.
 
     El resultado final:
-    - `verification_methods_passed`: Métodos superados
-    - `verification_methods_failed`: Métodos fallados
+    - `verification_methods_passed`: Métodos superados (solo los ejecutados)
+    - `verification_methods_failed`: Métodos fallados (solo los ejecutados)
+    - `verification_methods_skipped`: Métodos no ejecutados porque el estado final ya estaba decidido
+    - `verification_stats`: Por cada método consensus en modo 'sampling', secuencias generadas, secuencias omitidas y tokens ahorrados (estimación) gracias a la parada temprana
     - `final_status`: 'confirmada', 'a revisar' o 'descartada'
     - `entries`: Las mismas entradas con su data.
     """
+    return await run_inference(request, _verify_result, req)
+
+def _verify_result(req: VerificationRequest) -> Any:
     entries = [ParseEntry(ed) for ed in req.entries]
     to_verify = ParsedResult(entries)
 
-    methods = []
-    for m in req.process.methods:
-        method_type = VerificationMethodType(m.type.lower())
-        mode = VerificationMethodMode(m.mode.lower())
-        embedding_settings = None
-        consensus_settings = None
-
-        if method_type == VerificationMethodType.EMBEDDING and m.embedding_settings:
-            embedding_settings = EmbeddingVerificationSettings(
-                lower_threshold=m.embedding_settings["lower_threshold"],
-                upper_threshold=m.embedding_settings["upper_threshold"],
-                reference_text=m.embedding_settings["reference_text"]
-            )
-        if method_type == VerificationMethodType.CONSENSUS and m.consensus_settings:
-            consensus_settings = ConsensusVerificationSettings(
-                system_prompt=m.consensus_settings["system_prompt"],
-                user_prompt=m.consensus_settings["user_prompt"],
-                placeholders=m.consensus_settings["placeholders"],
-                positive_responses=m.consensus_settings["positive_responses"],
-                num_responses=m.consensus_settings["num_responses"],
-                num_positive_required=m.consensus_settings["num_positive_required"],
-                max_new_tokens=m.consensus_settings["max_new_tokens"]
-            )
-
-        method = VerificationMethod(
-            name=m.name,
-            method_type=method_type,
-            mode=mode,
-            embedding_settings=embedding_settings,
-            consensus_settings=consensus_settings
-        )
-        methods.append(method)
-
-    process = VerificationProcess(
-        methods=methods,
-        required_for_confirmed=req.process.required_for_confirmed,
-        required_for_review=req.process.required_for_review
-    )
+    try:
+        process = build_verification_process(req.process)
+    except ValueError as ve:
+        logger.error(f"ValueError occurred: {str(ve)}")
+        raise HTTPException(400, str(ve))
 
     llm = get_llm()
     embedder = get_embedder()
     verifier_service = VerifierService()
-    use_case = VerifyTextUseCase(verifier_service, embedder.get_similarity, llm.generate)
+    use_case = VerifyTextUseCase(verifier_service, embedder.get_similarity, llm.generate, llm.score_continuations,
+                                 llm.count_tokens, VerificationPlanner(), get_verification_executor(),
+                                 embedder.similarity_matrix)
 
     verified_result = use_case.execute(to_verify, process)
 
@@ -89,6 +73,58 @@ def verify_result(req: VerificationRequest) -> Any:
     return {
         "verification_methods_passed": verified_result.verification_methods_passed,
         "verification_methods_failed": verified_result.verification_methods_failed,
+        "verification_methods_skipped": verified_result.verification_methods_skipped,
+        "verification_stats": verified_result.verification_stats,
         "final_status": verified_result.final_status,
         "entries": [e.data for e in verified_result.entries]
-    }
\ No newline at end of file
+    }
+
+@router.post("/bulk", summary="Verificar resultados parseados en bloque", description="Aplica un mismo VerificationProcess a muchos resultados parseados en una sola llamada. Cada método embedding se evalúa como una única pasada vectorizada sobre todos los candidatos.")
+async def verify_results_bulk(req: BulkVerificationRequest, request: Request) -> Any:
+    logger.info(f"Received bulk verification request with {len(req.results)} results")
+    """
+    Este endpoint recibe:
+    - results: Lista de resultados parseados. Cada resultado es una lista de entradas (placeholder:valor).
+    - process: Configuración del proceso de verificación (VerificationProcessRequest), común a todos los resultados.
+
+    Los candidatos descartados por un método 'eliminatorio' no se evalúan en los métodos posteriores.
+
+    Retorna, en el mismo orden que `results`, un objeto por resultado con:
+    - `verification_methods_passed`: Métodos superados
+    - `verification_methods_failed`: Métodos fallados
+    - `verification_methods_skipped`: Métodos no ejecutados porque el estado final ya estaba decidido
+    - `final_status`: 'confirmada', 'a revisar' o 'descartada'
+    - `entries`: Las mismas entradas con su data.
+    """
+    return await run_inference(request, _verify_results_bulk, req)
+
+def _verify_results_bulk(req: BulkVerificationRequest) -> Any:
+    to_verify = [ParsedResult([ParseEntry(ed) for ed in entries]) for entries in req.results]
+    try:
+        process = build_verification_process(req.process)
+    except ValueError as ve:
+        logger.error(f"ValueError occurred: {str(ve)}")
+        raise HTTPException(400, str(ve))
+
+    llm = get_llm()
+    embedder = get_embedder()
+    verifier_service = VerifierService()
+    use_case = BulkVerifyTextUseCase(verifier_service, embedder.similarity_matrix, llm.generate, llm.score_continuations,
+                                     llm.count_tokens, VerificationPlanner(), get_verification_executor())
+
+    verified_results = use_case.execute(to_verify, process)
+
+    logger.info(f"Bulk verification finished for {len(verified_results)} results")
+    return {
+        "results": [
+            {
+                "verification_methods_passed": r.verification_methods_passed,
+                "verification_methods_failed": r.verification_methods_failed,
+                "verification_methods_skipped": r.verification_methods_skipped,
+                "verification_stats": r.verification_stats,
+                "final_status": r.final_status,
+                "entries": [e.data for e in r.entries]
+            }
+            for r in verified_results
+        ]
+    }
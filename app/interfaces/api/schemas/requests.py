@@ -2,7 +2,7 @@
 
 from app.domain.entities import ParseFallbackStrategy, ParseMode, ParseMultipleStrategy, ParseScope
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class GenerationRequest(BaseModel):
     """
@@ -42,6 +42,23 @@ class GenerationRequest(BaseModel):
         default={"placeholder1": "value of the placeholder1","placeholder2": "value of the placeholder2",},
         description="Diccionarios con datos para reemplazar placeholders en prompts. Debe contener las claves necesarias para todos los placeholders del prompt."
     )
+    deduplicate: bool = Field(
+        default=False,
+        description="Solo en POST /generation/: elimina respuestas casi idénticas (similitud coseno de sus embeddings) y devuelve una por grupo."
+    )
+    dedup_threshold: Optional[float] = Field(
+        default=None,
+        ge=-1.0,
+        le=1.0,
+        description="Similitud coseno a partir de la cual dos respuestas se consideran duplicadas. Por defecto DEDUP_SIMILARITY_THRESHOLD."
+    )
+    draft_model: Optional[str] = Field(
+        default=None,
+        example="Qwen/Qwen2.5-Coder-0.5B-Instruct",
+        description="Solo en POST /generation/ y trabajos de generación: modelo borrador pequeño, con el mismo tokenizador, "
+                    "para decodificación asistida. Debe ser LLM_DRAFT_MODEL o estar en LLM_DRAFT_MODELS. Por defecto "
+                    "LLM_DRAFT_MODEL; '' la desactiva. Las llamadas con varias secuencias se generan sin borrador."
+    )
 
 class ParseRuleRequest(BaseModel):
     label: str = Field(
@@ -71,20 +88,34 @@ class ParseConfigurationRequest(BaseModel):
         ...,
         description="Lista de reglas de parseo. Cada regla define cómo extraer un fragmento del texto."
     )
+    rule_timeout_ms: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Tiempo máximo (ms) de cada regla 'regex'. Si se agota, la regla se trata como sin coincidencia y se aplica su fallback_strategy. Solo puede reducir el límite del servidor (PARSE_REGEX_RULE_TIMEOUT_MS), nunca ampliarlo."
+    )
+    total_timeout_ms: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Tiempo máximo (ms) del conjunto de reglas 'regex' sobre un mismo texto. Solo puede reducir el límite del servidor (PARSE_REGEX_TOTAL_TIMEOUT_MS), nunca ampliarlo."
+    )
 
 class ParseRequest(BaseModel):
     response: str = Field(..., description="Texto generado por el LLM que se desea parsear.")
     config: ParseConfigurationRequest = Field(..., description="Configuración completa de parseo a aplicar sobre 'response'.")
 
+class BulkParseRequest(BaseModel):
+    responses: List[str] = Field(..., description="Textos generados por el LLM que se desean parsear, todos con la misma configuración.")
+    config: ParseConfigurationRequest = Field(..., description="Configuración completa de parseo a aplicar sobre cada elemento de 'responses'.")
+
 class VerificationMethodRequest(BaseModel):
     name: str = Field(..., description="Nombre del método de verificación.")
     type: str = Field(..., description="Tipo de método: 'embedding' o 'consensus'.")
     mode: str = Field(..., description="Modo: 'eliminatorio' o 'acumulativo'. 'eliminatorio' descarta el resultado si falla. 'acumulativo' suma al conteo de métodos superados.")
     embedding_settings: Dict[str,Any] = Field(
-        description="Configuración para el método embedding. Debe incluir 'lower_threshold', 'upper_threshold' y 'reference_text'."
+        description="Configuración para el método embedding. Debe incluir 'lower_threshold', 'upper_threshold' y 'reference_text' o 'reference_texts' (lista de textos de referencia). Con varias referencias, 'aggregation' indica cómo se combinan sus similitudes: 'max' (por defecto), 'mean' o 'top_k' (media de las 'top_k' más parecidas)."
     )
     consensus_settings: Dict[str,Any] = Field(
-        description="Configuración para el método consensus. Debe incluir 'system_prompt', 'user_prompt', 'placeholders', 'positive_responses', 'num_responses', 'num_positive_required' y 'max_new_tokens'."
+        description="Configuración para el método consensus. Debe incluir 'system_prompt', 'user_prompt', 'placeholders', 'positive_responses', 'num_responses', 'num_positive_required' y 'max_new_tokens'. Opcionalmente 'mode': 'sampling' (por defecto) o 'logprob'. En modo 'logprob' no se generan respuestas: se puntúan 'positive_responses' y 'negative_responses' (obligatorias, no vacías) como continuación del prompt, se normaliza la probabilidad de las positivas entre todas y se aprueba si supera 'probability_threshold' (por defecto 0.5); con 'length_normalized' (por defecto true) se compara la log-probabilidad media por token, para no penalizar respuestas largas. 'num_responses', 'num_positive_required' y 'max_new_tokens' pasan a ser opcionales. En modo 'sampling', 'batch_size' (opcional) fija cuántas respuestas se generan por paso antes de comprobar si el resultado ya está decidido."
     )
 
 class VerificationProcessRequest(BaseModel):
@@ -109,4 +140,62 @@ class VerificationRequest(BaseModel):
     process: VerificationProcessRequest = Field(
         ...,
         description="Proceso de verificación (VerificationProcess), que incluye los métodos y los umbrales requeridos."
-    )
\ No newline at end of file
+    )
+
+class ModelUnloadRequest(BaseModel):
+    model: str = Field(..., description="Nombre del modelo (HuggingFace) a descargar de memoria.")
+    kind: Optional[str] = Field(
+        default=None,
+        description="Tipo de modelo: 'llm' o 'embedder'. Si no se especifica, se descargan todas las variantes del modelo."
+    )
+
+class BulkVerificationRequest(BaseModel):
+    results: List[List[Dict[str,Any]]] = Field(
+        ...,
+        description="Lista de resultados parseados. Cada resultado es una lista de entradas {placeholder: valor}, igual que 'entries' en VerificationRequest."
+    )
+    process: VerificationProcessRequest = Field(
+        ...,
+        description="Proceso de verificación (VerificationProcess) que se aplica a todos los resultados."
+    )
+
+class PipelineRequest(GenerationRequest):
+    """
+    Petición para generar, parsear y verificar en una sola llamada.
+    """
+    config: ParseConfigurationRequest = Field(..., description="Configuración de parseo aplicada a cada respuesta generada.")
+    process: VerificationProcessRequest = Field(..., description="Proceso de verificación aplicado a cada resultado parseado.")
+    sequences_per_call: int = Field(
+        default=1,
+        gt=0,
+        description="Respuestas generadas por llamada al modelo, limitado por GENERATION_MAX_SEQUENCES_PER_BATCH. Con 1, cada "
+                    "respuesta se parsea y verifica mientras se genera la siguiente; con más, se gana batching pero el "
+                    "parseo y la verificación sólo se solapan entre llamadas."
+    )
+
+class DatasetGenerationRequest(BaseModel):
+    """
+    Petición para generar texto sobre un conjunto de filas de datos de referencia.
+    """
+    model: str = Field(
+        default="Qwen/Qwen2.5-Coder-3B-Instruct",
+        example="Qwen/Qwen2.5-Coder-3B-Instruct",
+        description="Nombre del modelo a utilizar, publicado en HuggingFace. Debe ser un modelo Instruct."
+    )
+    system_prompt: str = Field(..., description="Prompt de sistema. Puede contener placeholders.")
+    user_prompt: str = Field(..., description="Prompt de usuario. Puede contener placeholders.")
+    num_return_sequences: int = Field(default=1, gt=0, description="Número de respuestas a generar por fila.")
+    max_new_tokens: int = Field(default=100, gt=0, description="Máximo número de tokens a generar en cada respuesta.")
+    rows: List[Dict[str,str]] = Field(
+        ...,
+        description="Filas de datos de referencia. Cada fila debe contener las claves de todos los placeholders de los prompts."
+    )
+
+class DeduplicationRequest(BaseModel):
+    texts: List[str] = Field(..., description="Textos a agrupar por similitud semántica, en orden.")
+    threshold: Optional[float] = Field(
+        default=None,
+        ge=-1.0,
+        le=1.0,
+        description="Similitud coseno a partir de la cual dos textos se consideran duplicados. Por defecto DEDUP_SIMILARITY_THRESHOLD."
+    )
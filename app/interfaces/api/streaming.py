@@ -0,0 +1,72 @@
+# interfaces/api/streaming.py
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Type
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+class _EventPump:
+    # Steps a blocking event generator from the threadpool. The lock serializes next() and close(), so
+    # the generator is never closed while a next() call is still running on another thread.
+    def __init__(self, events: Iterator[Dict[str, Any]]):
+        self.events = events
+        self._lock = threading.Lock()
+
+    def next(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return next(self.events, None)
+
+    def close(self) -> None:
+        with self._lock:
+            self.events.close()
+
+class _NDJSONResponse(StreamingResponse):
+    # on_close runs however the response ends, also when it is cancelled before the body starts.
+    def __init__(self, content: Any, on_close: Callable[[], None]):
+        super().__init__(content, media_type="application/x-ndjson")
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
+def ndjson_response(request: Request, events: Iterator[Dict[str, Any]], cancel_event: Optional[threading.Event] = None,
+                    error_types: Tuple[Type[Exception], ...] = (RuntimeError,),
+                    release: Optional[Callable[[], None]] = None) -> StreamingResponse:
+    # One JSON line per event. error_types raised by the generator end the stream with {"error": "..."}.
+    # On completion, error or client disconnect, cancel_event is set (the generator stops at its next
+    # check) and the generator is closed on its own thread once any next() in flight has returned, so
+    # its finally blocks always run; then release (e.g. the stream's admission) is called. Nothing is
+    # awaited there: the response may already be cancelled.
+    pump = _EventPump(events)
+
+    async def body():
+        try:
+            while not await request.is_disconnected():
+                event = await run_in_threadpool(pump.next)
+                if event is None:
+                    break
+                yield json.dumps(event) + "\n"
+        except error_types as e:
+            logger.error(f"{type(e).__name__} occurred: {str(e)}")
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    def close() -> None:
+        try:
+            pump.close()
+        finally:
+            if release is not None:
+                release()
+
+    def on_close() -> None:
+        if cancel_event is not None:
+            cancel_event.set()
+        threading.Thread(target=close, name="stream-close", daemon=True).start()
+
+    return _NDJSONResponse(body(), on_close)
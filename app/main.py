@@ -1,6 +1,9 @@
 # main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.interfaces.api.routes import generation, verification, parse
+from starlette.concurrency import run_in_threadpool
+from app.interfaces.api.routes import generation, verification, parse, system, pipeline, jobs
+from app.interfaces.api.jobs import get_job_queue, stop_job_workers
 import logging
 from logging.handlers import RotatingFileHandler
 
@@ -17,12 +20,24 @@ file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(mes
 # Add the file handler to the root logger
 logging.getLogger('').addHandler(file_handler)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resumes jobs interrupted by a previous shutdown (when this process runs job workers).
+    get_job_queue()
+    yield
+    # Waiting for the workers must not block the event loop.
+    await run_in_threadpool(stop_job_workers)
+
 app = FastAPI(
     title="AutoAumento API",
     description="API for text generation, parsing and verification using LLMs and custom rules.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.include_router(generation.router, prefix="/generation", tags=["Generation"])
 app.include_router(parse.router, prefix="/parse", tags=["Parsing"])
-app.include_router(verification.router, prefix="/verification", tags=["Verification"])
\ No newline at end of file
+app.include_router(verification.router, prefix="/verification", tags=["Verification"])
+app.include_router(pipeline.router, prefix="/pipeline", tags=["Pipeline"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+app.include_router(system.router, prefix="/system", tags=["System"])
@@ -0,0 +1,112 @@
+# benchmarks/keyword_parse_benchmark.py
+# Compares the per-rule keyword search (every KEYWORD rule scans the text, or every line, on its
+# own) with the single search shared through the parse plan, for a growing number of rules.
+#
+#   python benchmarks/keyword_parse_benchmark.py --lines 2000 --repeat 5
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.domain.entities import (ParseConfiguration, ParseRule, ParseMode, ParseScope, ParseFallbackStrategy,
+                                 ParseMultipleStrategy)
+from app.domain.services import keyword_matcher
+from app.domain.services.parse_plan import ParsePlan
+from app.domain.services.parse_service import ParseService
+
+def build_case(num_rules: int, num_lines: int, seed: int = 0):
+    rng = random.Random(seed)
+    labels = [f"Field_{i}" for i in range(num_rules)]
+    lines = [f"{rng.choice(labels)}: value {rng.randint(0, 10 ** 6)} {'lorem ipsum ' * rng.randint(0, 4)}"
+             for _ in range(num_lines)]
+    rules = [
+        ParseRule(label, ParseMode.KEYWORD, f"{label}:", "\n" if i % 2 else "",
+                  ParseScope.ALL_TEXT if i % 2 else ParseScope.LINE_BY_LINE,
+                  ParseFallbackStrategy.EMPTY, "", ParseMultipleStrategy.ALL)
+        for i, label in enumerate(labels)
+    ]
+    return "\n".join(lines), ParseConfiguration(rules)
+
+def keyword_matches(text: str, rule: ParseRule):
+    # The per-rule KEYWORD search ParseService ran before parse plans: str.find on the text for each rule.
+    results = []
+    start_idx = 0
+    while True:
+        start_pos = text.find(rule.pattern, start_idx) if rule.pattern else 0
+        if rule.pattern and start_pos == -1:
+            break
+        start_search = start_pos + len(rule.pattern) if rule.pattern else start_idx
+        end_pos = len(text)
+        if rule.secondary_pattern:
+            sec_pos = text.find(rule.secondary_pattern, start_search)
+            if sec_pos == -1:
+                break
+            end_pos = sec_pos
+        extracted = text[start_search:end_pos].strip()
+        if extracted:
+            results.append(extracted)
+        if not rule.pattern:
+            break
+        start_idx = end_pos + (len(rule.secondary_pattern) if rule.secondary_pattern else 0)
+    return results
+
+def per_rule(service: ParseService, text: str, config: ParseConfiguration):
+    lines = text.splitlines()
+    return [
+        [m for line in lines for m in keyword_matches(line, rule)]
+        if rule.scope == ParseScope.LINE_BY_LINE else keyword_matches(text, rule)
+        for rule in config.rules
+    ]
+
+def single_search(service: ParseService, text: str, plan: ParsePlan):
+    hits = plan.keyword_matcher.find_all(text)
+    starts, ends = service._line_spans(text, text.splitlines())
+    return [
+        service._parse_keyword_lines(text, starts, ends, c.rule, hits)
+        if c.rule.scope == ParseScope.LINE_BY_LINE else service._extract_keyword(text, c.rule, hits, 0, len(text))
+        for c in plan.rules
+    ]
+
+def best_of(repeat: int, fn, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-rule vs shared keyword search benchmark")
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rules", type=int, nargs="+", default=[1, 5, 10, 25, 50, 100, 250, 500])
+    args = parser.parse_args()
+
+    service = ParseService()
+    print(f"{'rules':>6} {'per-rule ms':>12} {'find ms':>10} {'automaton ms':>13} {'speedup':>8}")
+    for num_rules in args.rules:
+        text, config = build_case(num_rules, args.lines)
+        threshold = keyword_matcher.AUTOMATON_MIN_PATTERNS
+        try:
+            keyword_matcher.AUTOMATON_MIN_PATTERNS = sys.maxsize
+            find_plan = ParsePlan(config)
+            keyword_matcher.AUTOMATON_MIN_PATTERNS = 1
+            automaton_plan = ParsePlan(config)
+        finally:
+            keyword_matcher.AUTOMATON_MIN_PATTERNS = threshold
+
+        expected = per_rule(service, text, config)
+        assert single_search(service, text, find_plan) == expected
+        assert single_search(service, text, automaton_plan) == expected
+
+        baseline = best_of(args.repeat, per_rule, service, text, config)
+        find_ms = best_of(args.repeat, single_search, service, text, find_plan)
+        automaton_ms = best_of(args.repeat, single_search, service, text, automaton_plan)
+        print(f"{num_rules:>6} {baseline:>12.2f} {find_ms:>10.2f} {automaton_ms:>13.2f} "
+              f"{baseline / min(find_ms, automaton_ms):>7.1f}x")
+
+if __name__ == "__main__":
+    main()
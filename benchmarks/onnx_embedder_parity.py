@@ -0,0 +1,74 @@
+# benchmarks/onnx_embedder_parity.py
+# Checks that the ONNX Runtime embedder (int8 by default) stays within tolerance of the torch
+# embedder: embeds the same texts with both, compares their similarity matrices and reports the
+# encoding time of each. Exits with status 1 if any similarity differs by more than --tolerance.
+#
+#   python benchmarks/onnx_embedder_parity.py --texts 200 --tolerance 0.03
+#   python benchmarks/onnx_embedder_parity.py --file my_texts.txt --no-quantize
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.infrastructure.embeddings.embedder_model import EmbedderModel
+from app.infrastructure.embeddings.onnx_embedder_model import OnnxEmbedderModel
+
+SUBJECTS = ["The function", "This program", "The algorithm", "A recursive solution", "The loop", "The parser"]
+VERBS = ["terminates", "returns the sum of", "sorts", "never halts on", "validates", "counts the words in"]
+OBJECTS = ["every input", "the list", "an empty string", "the matrix", "a graph with cycles", "the JSON payload"]
+
+def build_texts(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}" + " quickly" * rng.randint(0, 3)
+            for _ in range(count)]
+
+def timed_embed(embedder, texts):
+    start = time.perf_counter()
+    vectors = embedder.embed_many(texts)
+    return vectors, time.perf_counter() - start
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare ONNX Runtime and torch embeddings.")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--texts", type=int, default=200, help="number of generated sample texts")
+    parser.add_argument("--file", help="one text per line, instead of generated texts")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--directory", default="onnx_models")
+    parser.add_argument("--no-quantize", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.03, help="maximum absolute difference of a cosine similarity")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = build_texts(args.texts)
+
+    # No embedding cache: both backends encode every text.
+    torch_embedder = EmbedderModel(args.model, None, args.batch_size)
+    onnx_embedder = OnnxEmbedderModel(args.model, None, args.batch_size, directory=args.directory,
+                                      quantize=not args.no_quantize)
+    torch_embedder.embed_many(texts[:4])
+    onnx_embedder.embed_many(texts[:4])
+
+    torch_vectors, torch_time = timed_embed(torch_embedder, texts)
+    onnx_vectors, onnx_time = timed_embed(onnx_embedder, texts)
+    diff = np.abs(torch_vectors @ torch_vectors.T - onnx_vectors @ onnx_vectors.T)
+    self_sim = np.sum(torch_vectors * onnx_vectors, axis=1)
+
+    print(f"texts: {len(texts)}  graph: {onnx_embedder.path}")
+    print(f"torch: {torch_time * 1000:8.1f} ms   onnx: {onnx_time * 1000:8.1f} ms   speedup: {torch_time / onnx_time:.2f}x")
+    print(f"similarity difference: max {diff.max():.4f}  mean {diff.mean():.4f}  (tolerance {args.tolerance})")
+    print(f"cosine(torch, onnx) per text: min {self_sim.min():.4f}  mean {self_sim.mean():.4f}")
+    if diff.max() > args.tolerance:
+        print("FAIL: similarities differ by more than the tolerance")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# The app is imported as the 'app' package from the repository root, as in the benchmarks.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
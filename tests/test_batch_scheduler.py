@@ -0,0 +1,54 @@
+# tests/test_batch_scheduler.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.domain.ports.llm_port import LLMPort
+from app.domain.services.execution_planner import ExecutionPlanner
+from app.infrastructure.llm.batch_scheduler import BatchingLLM
+
+class _RecordingLLM(LLMPort):
+    # Answers each prompt with its user prompt and records the size of every call.
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def generate_batch(self, prompts, num_responses=1, max_new_tokens=100, stop_sequences=None, draft_model=None):
+        with self._lock:
+            self.calls.append(len(prompts) * num_responses)
+        return [[f"{user}-{i}" for i in range(num_responses)] for _, user in prompts]
+
+    def generate(self, system_prompt, user_prompt, num_responses=1, max_new_tokens=100, stop_sequences=None,
+                 draft_model=None):
+        return self.generate_batch([(system_prompt, user_prompt)], num_responses, max_new_tokens)[0]
+
+def _generate_concurrently(batcher, count, num_responses):
+    with ThreadPoolExecutor(count) as pool:
+        futures = [pool.submit(batcher.generate, "system", f"user{i}", num_responses, 100) for i in range(count)]
+        return [f.result() for f in futures]
+
+def test_every_caller_gets_its_own_responses():
+    llm = _RecordingLLM()
+    batcher = BatchingLLM(llm, max_batch_size=8, max_wait_ms=50)
+    try:
+        results = _generate_concurrently(batcher, 8, 2)
+    finally:
+        batcher.close()
+    assert results == [[f"user{i}-0", f"user{i}-1"] for i in range(8)]
+    assert sum(llm.calls) == 16
+
+def test_merged_calls_respect_the_planner_ceiling():
+    llm = _RecordingLLM()
+    # At most 6 sequences per call: merged calls of 4 responses hold one prompt each.
+    batcher = BatchingLLM(llm, max_batch_size=8, max_wait_ms=50, planner=ExecutionPlanner(16, 600))
+    try:
+        results = _generate_concurrently(batcher, 8, 4)
+    finally:
+        batcher.close()
+    assert results == [[f"user{i}-{j}" for j in range(4)] for i in range(8)]
+    assert max(llm.calls) <= 6
+    assert sum(llm.calls) == 32
+
+def test_closed_batcher_calls_the_model_directly():
+    llm = _RecordingLLM()
+    batcher = BatchingLLM(llm, max_batch_size=8, max_wait_ms=10)
+    batcher.close()
+    assert batcher.generate("system", "late", 1, 100) == ["late-0"]
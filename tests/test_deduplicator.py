@@ -0,0 +1,72 @@
+# tests/test_deduplicator.py
+import random
+import zlib
+import numpy as np
+import pytest
+from app.domain.services.deduplicator import SemanticDeduplicator
+from app.infrastructure.embeddings.vector_index import ExactVectorIndex
+
+DIM = 16
+
+class _StubEmbedder:
+    # "topic<k> <n>": a unit vector near the direction of topic k, the same for the same text.
+    def __init__(self, noise: float = 0.4):
+        self.noise = noise
+        self.calls = []
+
+    def embed_many(self, texts):
+        self.calls.append(len(texts))
+        vectors = []
+        for text in texts:
+            topic, variant = text.split()
+            base = np.random.default_rng(int(topic[5:])).standard_normal(DIM)
+            vector = base / np.linalg.norm(base) + self.noise * np.random.default_rng(zlib.crc32(variant.encode())).standard_normal(DIM) / np.sqrt(DIM)
+            vectors.append(vector / np.linalg.norm(vector))
+        return np.array(vectors, dtype=np.float32)
+
+def _reference(vectors, threshold):
+    # Every text compared with every representative so far.
+    representatives, clusters = [], []
+    for i, vector in enumerate(vectors):
+        scores = [float(vectors[r] @ vector) for r in representatives]
+        best = int(np.argmax(scores)) if scores else -1
+        if best >= 0 and scores[best] >= threshold:
+            clusters.append(best)
+        else:
+            clusters.append(len(representatives))
+            representatives.append(i)
+    return representatives, clusters
+
+def _texts(count, topics, seed=0):
+    rng = random.Random(seed)
+    return [f"topic{rng.randrange(topics)} v{rng.randrange(1000)}" for _ in range(count)]
+
+@pytest.mark.parametrize("threshold", [0.8, 0.9, 0.95])
+def test_clusters_do_not_depend_on_batch_size(threshold):
+    texts = _texts(200, 12)
+    embedder = _StubEmbedder()
+    expected = _reference(embedder.embed_many(texts), threshold)
+    for batch_size in (1, 7, 64, 500):
+        result = SemanticDeduplicator(embedder.embed_many, ExactVectorIndex, threshold, batch_size).deduplicate(texts)
+        assert (result.representatives, result.clusters) == expected
+        assert sum(result.cluster_sizes) == len(texts)
+
+def test_texts_are_embedded_a_batch_at_a_time():
+    embedder = _StubEmbedder()
+    SemanticDeduplicator(embedder.embed_many, ExactVectorIndex, 0.9, 16).deduplicate(_texts(40, 3))
+    assert embedder.calls == [16, 16, 8]
+
+def test_identical_texts_share_a_cluster():
+    result = SemanticDeduplicator(_StubEmbedder().embed_many, ExactVectorIndex, 0.99, 2).deduplicate(
+        ["topic1 a", "topic2 b", "topic1 a", "topic2 b", "topic1 a"])
+    assert result.representatives == [0, 1]
+    assert result.clusters == [0, 1, 0, 1, 0]
+    assert result.cluster_sizes == [3, 2]
+
+def test_empty_input():
+    result = SemanticDeduplicator(_StubEmbedder().embed_many, ExactVectorIndex).deduplicate([])
+    assert (result.representatives, result.clusters) == ([], [])
+
+def test_threshold_must_be_a_cosine():
+    with pytest.raises(ValueError):
+        SemanticDeduplicator(_StubEmbedder().embed_many, ExactVectorIndex, 1.5)
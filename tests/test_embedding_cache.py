@@ -0,0 +1,70 @@
+# tests/test_embedding_cache.py
+import multiprocessing
+import numpy as np
+import pytest
+from app.infrastructure.embeddings.embedding_cache import EmbeddingCache, _DiskVectorStore, text_hash
+
+DIM = 8
+
+def _vector(text):
+    rng = np.random.default_rng(int(text_hash(text)[:8], 16))
+    return rng.standard_normal(DIM).astype(np.float32)
+
+def _write(directory, prefix, count, batch):
+    store = _DiskVectorStore(directory)
+    for start in range(0, count, batch):
+        texts = [f"{prefix}{i}" for i in range(start, min(start + batch, count))]
+        store.put_many([(text_hash(t), _vector(t)) for t in texts])
+
+@pytest.fixture
+def small_capacity(monkeypatch):
+    # Forces the matrix to grow (and be replaced) several times.
+    monkeypatch.setattr(_DiskVectorStore, "INITIAL_CAPACITY", 4)
+
+def test_vectors_survive_reopening(tmp_path, small_capacity):
+    _write(str(tmp_path), "text", 50, 7)
+    reopened = _DiskVectorStore(str(tmp_path))
+    assert len(reopened.index) == reopened.rows == 50
+    for i in range(50):
+        np.testing.assert_array_equal(reopened.get(text_hash(f"text{i}")), _vector(f"text{i}"))
+    assert reopened.get(text_hash("missing")) is None
+
+def test_stores_sharing_a_directory_see_each_other(tmp_path, small_capacity):
+    first = _DiskVectorStore(str(tmp_path))
+    second = _DiskVectorStore(str(tmp_path))
+    first.put_many([(text_hash("a"), _vector("a"))])
+    second.put_many([(text_hash("b"), _vector("b")), (text_hash("a"), _vector("a"))])
+    # Rows are allocated from the shared index, not from each store's own count.
+    assert sorted(second.index.values()) == [0, 1]
+    np.testing.assert_array_equal(first.get(text_hash("b")), _vector("b"))
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    store = _DiskVectorStore(str(tmp_path))
+    store.put_many([(text_hash("a"), _vector("a"))])
+    with pytest.raises(ValueError):
+        store.put_many([(text_hash("b"), np.zeros(DIM + 1, dtype=np.float32))])
+
+def test_concurrent_processes_do_not_corrupt_the_store(tmp_path, small_capacity):
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_write, args=(str(tmp_path), f"p{p}-", 300, 16)) for p in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+    store = _DiskVectorStore(str(tmp_path))
+    assert len(store.index) == len(set(store.index.values())) == 900
+    for p in range(3):
+        for i in range(300):
+            np.testing.assert_array_equal(store.get(text_hash(f"p{p}-{i}")), _vector(f"p{p}-{i}"))
+
+def test_memory_tier_is_an_lru_in_front_of_disk(tmp_path):
+    cache = EmbeddingCache(max_entries=2, disk_dir=str(tmp_path))
+    cache.put_many("model", [(t, _vector(t)) for t in ("a", "b", "c")])
+    assert cache.stats()["memory_entries"] == 2
+    # "a" was evicted from memory but is still on disk; other models do not see it.
+    np.testing.assert_array_equal(cache.get("model", "a"), _vector("a"))
+    assert cache.get("other", "a") is None
+    np.testing.assert_array_equal(cache.get("model", "a"), _vector("a"))
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
@@ -0,0 +1,29 @@
+# tests/test_execution_planner.py
+from app.domain.services.execution_planner import ExecutionPlanner
+
+def test_plan_covers_every_sequence_within_the_ceiling():
+    planner = ExecutionPlanner(max_sequences_per_batch=16, max_batch_tokens=0)
+    assert planner.plan(5, 4, 100) == [16, 4]
+    assert planner.plan(1, 3, 100) == [3]
+    assert planner.plan(4, 4, 100) == [16]
+
+def test_batch_tokens_bound_sequences_per_call():
+    planner = ExecutionPlanner(max_sequences_per_batch=16, max_batch_tokens=1000)
+    assert planner.max_sequences_per_call(100) == 10
+    assert planner.max_sequences_per_call(10) == 16
+    # A single sequence always fits, however long.
+    assert planner.max_sequences_per_call(5000) == 1
+    assert planner.plan(3, 9, 100) == [10, 10, 7]
+
+def test_max_sequences_lowers_the_limit():
+    planner = ExecutionPlanner(max_sequences_per_batch=16)
+    assert planner.plan(2, 5, 100, max_sequences=4) == [4, 4, 2]
+    assert planner.plan(2, 5, 100, max_sequences=0) == [1] * 10
+    assert planner.plan(2, 5, 100, max_sequences=64) == [10]
+
+def test_plan_rows_groups_rows_by_length():
+    planner = ExecutionPlanner(max_sequences_per_batch=8, max_batch_tokens=0)
+    batches = planner.plan_rows([5, 50, 10, 40, 30], num_return_sequences=4, max_new_tokens=100)
+    assert batches == [[1, 3], [4, 2], [0]]
+    # A row asking for more sequences than a call holds still gets a call of its own.
+    assert planner.plan_rows([1, 2], num_return_sequences=20, max_new_tokens=100) == [[1], [0]]
@@ -0,0 +1,68 @@
+# tests/test_inference_executor.py
+import asyncio
+import threading
+import pytest
+from app.infrastructure.executors.inference_executor import (InferenceExecutor, InferenceQueueFull,
+                                                             InferenceDeadlineExceeded)
+
+@pytest.fixture
+def blocked():
+    # One worker kept busy until the test releases it.
+    executor = InferenceExecutor(max_workers=1, max_queue=2)
+    gate = threading.Event()
+    started = threading.Event()
+
+    def hold():
+        started.set()
+        gate.wait(10)
+
+    executor.submit(hold)
+    started.wait(5)
+    yield executor, gate
+    gate.set()
+
+def test_rejects_beyond_max_queue(blocked):
+    executor, gate = blocked
+    first = executor.submit(lambda: 1)
+    second = executor.submit(lambda: 2)
+    with pytest.raises(InferenceQueueFull):
+        executor.submit(lambda: 3)
+    gate.set()
+    assert (first.result(5), second.result(5)) == (1, 2)
+    assert executor.stats()["rejected"] == 1
+
+def test_open_streams_count_against_the_queue(blocked):
+    executor, _ = blocked
+    release = executor.open_stream()
+    executor.submit(lambda: None)
+    with pytest.raises(InferenceQueueFull):
+        executor.open_stream()
+    assert executor.stats()["streams"] == 1
+    release()
+    release()
+    assert executor.stats()["streams"] == 0
+    executor.open_stream()
+
+def test_queue_wait_is_bounded(blocked):
+    executor, _ = blocked
+    with pytest.raises(InferenceDeadlineExceeded):
+        asyncio.run(executor.run(lambda: None, timeout=0.05))
+    stats = executor.stats()
+    assert (stats["queue_depth"], stats["cancelled"]) == (0, 1)
+
+def test_cancelled_request_cancels_its_queued_task(blocked):
+    executor, gate = blocked
+    ran = threading.Event()
+
+    async def cancel_while_queued():
+        task = asyncio.ensure_future(executor.run(ran.set))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_while_queued())
+    gate.set()
+    executor.submit(lambda: None).result(5)
+    assert not ran.is_set()
+    assert executor.stats()["cancelled"] == 1
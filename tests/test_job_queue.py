@@ -0,0 +1,100 @@
+# tests/test_job_queue.py
+import time
+import pytest
+from app.domain.entities import JobStatus
+from app.infrastructure.jobs.sqlite_job_store import SQLiteJobStore
+from app.application.use_cases.job_queue_use_case import JobHandler, JobQueueUseCase
+
+class _CountingHandler(JobHandler):
+    # payload {"units": n}: unit i returns [i].
+    def __init__(self, on_unit=None):
+        self.on_unit = on_unit
+
+    def prepare(self, payload):
+        if payload["units"] < 0:
+            raise ValueError("units must not be negative")
+        return payload, payload["units"]
+
+    def run_unit(self, payload, unit_index):
+        if self.on_unit is not None:
+            self.on_unit(unit_index)
+        return [unit_index]
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+def test_claims_oldest_job_once(db_path):
+    store = SQLiteJobStore(db_path, owner="a")
+    first = store.create("count", {}, 1)
+    second = store.create("count", {}, 1)
+    assert store.claim_next().job_id == first.job_id
+    # Another process sharing the file gets the next one.
+    assert SQLiteJobStore(db_path, owner="b").claim_next().job_id == second.job_id
+    assert store.claim_next() is None
+
+def test_only_the_owner_stores_results(db_path):
+    owner = SQLiteJobStore(db_path, owner="a")
+    other = SQLiteJobStore(db_path, owner="b")
+    job = owner.create("count", {}, 2)
+    owner.claim_next()
+    other.complete_unit(job.job_id, 0, ["stolen"])
+    owner.complete_unit(job.job_id, 0, ["a0"])
+    # Replayed or out of order units are ignored.
+    owner.complete_unit(job.job_id, 0, ["again"])
+    owner.complete_unit(job.job_id, 2, ["later"])
+    other.finish(job.job_id, JobStatus.FAILED, "not mine")
+    stored = owner.get(job.job_id)
+    assert (stored.status, stored.completed_units, stored.completed_items) == (JobStatus.RUNNING, 1, 1)
+    assert owner.results(job.job_id, 0, 10) == ["a0"]
+
+def test_requeues_only_jobs_without_heartbeat(db_path):
+    alive = SQLiteJobStore(db_path, owner="alive")
+    stopped = SQLiteJobStore(db_path, owner="stopped")
+    kept = alive.create("count", {}, 1)
+    alive.claim_next()
+    lost = stopped.create("count", {}, 1)
+    stopped.claim_next()
+    time.sleep(0.2)
+    assert alive.heartbeat() == 1
+    assert alive.requeue_running(0.1) == 1
+    assert alive.get(kept.job_id).status == JobStatus.RUNNING
+    assert alive.get(lost.job_id).status == JobStatus.QUEUED
+    # The previous owner can no longer store results for it.
+    stopped.complete_unit(lost.job_id, 0, ["late"])
+    assert alive.results(lost.job_id, 0, 10) == []
+
+def test_cancel_is_immediate_when_queued_and_after_the_unit_when_running(db_path):
+    store = SQLiteJobStore(db_path)
+    queued = store.create("count", {}, 1)
+    assert store.request_cancel(queued.job_id).status == JobStatus.CANCELLED
+    running = store.create("count", {}, 3)
+    store.claim_next()
+    cancelled = store.request_cancel(running.job_id)
+    assert (cancelled.status, cancelled.cancel_requested) == (JobStatus.RUNNING, True)
+    # A running job whose cancellation was pending is not resumed when re-queued.
+    assert store.requeue_running(-1) == 1
+    assert store.get(running.job_id).status == JobStatus.CANCELLED
+
+def test_interrupted_job_resumes_from_its_first_incomplete_unit(db_path):
+    stops = []
+    queue = JobQueueUseCase(SQLiteJobStore(db_path), {"count": _CountingHandler(on_unit=stops.append)})
+    job = queue.submit("count", {"units": 5})
+    # Stop once two units are done: the job goes back to the queue with its progress.
+    assert queue.run_next(should_stop=lambda: len(stops) >= 2)
+    released = queue.get(job.job_id)
+    assert (released.status, released.completed_units) == (JobStatus.QUEUED, 2)
+    resumed = JobQueueUseCase(SQLiteJobStore(db_path), {"count": _CountingHandler()})
+    assert resumed.run_next()
+    finished, results = resumed.results(job.job_id, 0, 10)
+    assert finished.status == JobStatus.COMPLETED
+    assert results == [0, 1, 2, 3, 4]
+    assert not resumed.run_next()
+
+def test_submit_validates_before_queueing(db_path):
+    queue = JobQueueUseCase(SQLiteJobStore(db_path), {"count": _CountingHandler()})
+    with pytest.raises(ValueError):
+        queue.submit("count", {"units": -1})
+    with pytest.raises(ValueError):
+        queue.submit("unknown", {})
+    assert not queue.run_next()
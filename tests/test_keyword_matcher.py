@@ -0,0 +1,53 @@
+# tests/test_keyword_matcher.py
+import random
+from app.domain.entities import ParseConfiguration, ParseRule, ParseMode, ParseScope, ParseFallbackStrategy, ParseMultipleStrategy
+from app.domain.services import keyword_matcher
+from app.domain.services.keyword_matcher import KeywordMatcher, next_occurrence
+from app.domain.services.parse_plan import ParsePlanCache
+from app.domain.services.parse_service import ParseService
+
+def _find_all(text, pattern):
+    starts = []
+    pos = text.find(pattern)
+    while pos != -1:
+        starts.append(pos)
+        pos = text.find(pattern, pos + 1)
+    return starts
+
+def test_automaton_finds_every_occurrence(monkeypatch):
+    # Overlapping keywords and keywords that are prefixes or suffixes of others.
+    monkeypatch.setattr(keyword_matcher, "AUTOMATON_MIN_PATTERNS", 1)
+    rng = random.Random(0)
+    for _ in range(300):
+        patterns = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 8))]
+        text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 80)))
+        matcher = KeywordMatcher(patterns + [""])
+        assert matcher._automaton is not None
+        assert matcher.find_all(text) == {p: _find_all(text, p) for p in set(patterns)}
+
+def test_automaton_only_above_threshold():
+    few = [f"key{i}:" for i in range(keyword_matcher.AUTOMATON_MIN_PATTERNS - 1)]
+    assert KeywordMatcher(few)._automaton is None
+    assert KeywordMatcher(few + ["other:"])._automaton is not None
+
+def test_next_occurrence_matches_str_find():
+    rng = random.Random(1)
+    for _ in range(500):
+        text = "".join(rng.choice("ab") for _ in range(rng.randint(0, 30)))
+        pattern = "".join(rng.choice("ab") for _ in range(rng.randint(1, 3)))
+        start = rng.randint(0, len(text))
+        end = rng.randint(start, len(text))
+        assert next_occurrence(_find_all(text, pattern), len(pattern), start, end) == text.find(pattern, start, end)
+
+def test_many_keyword_rules_parse_like_single_rules():
+    # Enough rules for the automaton; each rule must give what it gives when parsed alone.
+    count = keyword_matcher.AUTOMATON_MIN_PATTERNS + 10
+    rules = [ParseRule(f"field{i}", ParseMode.KEYWORD, f"field{i}=", ";", scope, ParseFallbackStrategy.EMPTY,
+                       "", ParseMultipleStrategy.ALL)
+             for i, scope in zip(range(count), [ParseScope.ALL_TEXT, ParseScope.LINE_BY_LINE] * count)]
+    text = "\n".join(f"field{i}= v{i} ; field{i % 7}= w{i};" for i in range(count))
+    service = ParseService(plan_cache=ParsePlanCache())
+    entries = service.parse_text(text, ParseConfiguration(rules))
+    for rule in rules:
+        alone = service.parse_text(text, ParseConfiguration([rule]))
+        assert [e[rule.label] for e in entries] == [e[rule.label] for e in alone][:len(entries)]
@@ -0,0 +1,47 @@
+# tests/test_onnx_embedder_parity.py
+# ONNX Runtime embedder vs torch embedder on the same texts (see benchmarks/onnx_embedder_parity.py for
+# timings and larger samples). Skipped without onnxruntime or torch, or when the model is not available
+# locally; ONNX_PARITY_MODEL selects another model (name or directory).
+#
+# Tolerance: maximum absolute difference between the cosine similarities of both backends, 0.03 for the
+# int8-quantized graph (the default backend setting) and 1e-3 for the fp32 graph, which only differs by
+# float rounding.
+import os
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("torch")
+
+import numpy as np
+from transformers import AutoTokenizer
+from app.infrastructure.embeddings.embedder_model import EmbedderModel
+from app.infrastructure.embeddings.onnx_embedder_model import OnnxEmbedderModel
+
+MODEL = os.getenv("ONNX_PARITY_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+TEXTS = [
+    "The function terminates on every input",
+    "This program returns the sum of the list",
+    "The algorithm sorts the matrix quickly",
+    "A recursive solution never halts on a graph with cycles",
+    "The loop validates the JSON payload",
+    "The parser counts the words in an empty string quickly quickly",
+    "La función devuelve la suma de la lista",
+    "The function terminates",
+]
+
+@pytest.fixture(scope="module")
+def torch_vectors():
+    try:
+        AutoTokenizer.from_pretrained(MODEL, local_files_only=True)
+    except OSError:
+        pytest.skip(f"Model '{MODEL}' is not available locally")
+    return EmbedderModel(MODEL, None, 4).embed_many(TEXTS)
+
+@pytest.mark.parametrize("quantize, tolerance", [(True, 0.03), (False, 1e-3)])
+def test_similarities_match_torch(torch_vectors, tmp_path_factory, quantize, tolerance):
+    onnx_embedder = OnnxEmbedderModel(MODEL, None, 4, directory=str(tmp_path_factory.getbasetemp() / "onnx"),
+                                      quantize=quantize)
+    onnx_vectors = onnx_embedder.embed_many(TEXTS)
+    diff = np.abs(torch_vectors @ torch_vectors.T - onnx_vectors @ onnx_vectors.T)
+    assert diff.max() <= tolerance
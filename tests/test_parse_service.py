@@ -0,0 +1,105 @@
+# tests/test_parse_service.py
+# ParseService with compiled plans must parse exactly like the original rule-by-rule implementation,
+# reproduced below as the reference.
+import random
+import re
+import pytest
+from app.domain.entities import (ParseConfiguration, ParseRule, ParseMode, ParseScope, ParseFallbackStrategy,
+                                 ParseMultipleStrategy)
+from app.domain.services.parse_plan import ParsePlanCache, configuration_key
+from app.domain.services.parse_service import ParseService
+
+def _reference_rule(text, rule):
+    if rule.mode == ParseMode.REGEX:
+        return re.findall(rule.pattern, text)
+    results = []
+    start_idx = 0
+    while True:
+        start_pos = text.find(rule.pattern, start_idx) if rule.pattern else 0
+        if rule.pattern and start_pos == -1:
+            break
+        start_search = start_pos + len(rule.pattern) if rule.pattern else start_idx
+        end_pos = len(text)
+        if rule.secondary_pattern:
+            sec_pos = text.find(rule.secondary_pattern, start_search)
+            if sec_pos == -1:
+                break
+            end_pos = sec_pos
+        extracted = text[start_search:end_pos].strip()
+        if extracted:
+            results.append(extracted)
+        if not rule.pattern:
+            break
+        start_idx = end_pos + (len(rule.secondary_pattern) if rule.secondary_pattern else 0)
+    return results
+
+def reference_parse(text, config):
+    all_rule_matches = []
+    for rule in config.rules:
+        if rule.scope == ParseScope.LINE_BY_LINE:
+            matches = [m for line in text.splitlines() for m in _reference_rule(line, rule)]
+        else:
+            matches = _reference_rule(text, rule)
+        if not matches:
+            if rule.fallback_strategy == ParseFallbackStrategy.ERROR:
+                raise ValueError(f"No match found for '{rule.label}'")
+            matches = [""] if rule.fallback_strategy == ParseFallbackStrategy.EMPTY else [rule.fallback_value]
+        if rule.multiple_strategy == ParseMultipleStrategy.FIRST:
+            matches = matches[:1]
+        all_rule_matches.append((rule.label, matches))
+    count = min(len(matches) for _, matches in all_rule_matches)
+    return [{label: matches[i] for label, matches in all_rule_matches} for i in range(count)]
+
+def _outcome(parse, text, config):
+    try:
+        return parse(text, config)
+    except ValueError as e:
+        return str(e)
+
+ALPHABET = ["a", "b", ":", ";", "\n", " ", "x", "y", "\r", "\r\n", "\x0c", "ab"]
+KEYWORDS = ["a", "ab", ":", ";", "x\n", "", "b:", "xy"]
+REGEXES = ["a+", "(a)(b)", "x.", "[;:]"]
+
+def _random_config(rng):
+    rules = []
+    for k in range(rng.randint(1, 4)):
+        mode = rng.choice(list(ParseMode))
+        pattern = rng.choice(REGEXES if mode == ParseMode.REGEX else KEYWORDS)
+        rules.append(ParseRule(f"label{k}", mode, pattern, rng.choice(KEYWORDS), rng.choice(list(ParseScope)),
+                               rng.choice(list(ParseFallbackStrategy)), "fallback", rng.choice(list(ParseMultipleStrategy))))
+    return ParseConfiguration(rules)
+
+def test_matches_reference_on_random_configurations():
+    rng = random.Random(0)
+    service = ParseService(plan_cache=ParsePlanCache())
+    for _ in range(2000):
+        config = _random_config(rng)
+        text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 60)))
+        assert _outcome(service.parse_text, text, config) == _outcome(reference_parse, text, config), (text, config)
+
+def test_parse_many_reports_failures_per_text():
+    config = ParseConfiguration([ParseRule("name", ParseMode.KEYWORD, "Name:", "\n", multiple_strategy=ParseMultipleStrategy.ALL)])
+    results = ParseService(plan_cache=ParsePlanCache()).parse_many(["Name: Ana\nName: Luis\n", "nothing here"], config)
+    assert results[0][0] == [{"name": "Ana"}, {"name": "Luis"}]
+    assert results[0][1] is None
+    assert results[1][0] is None
+    assert results[1][1] == "No match found for 'name'"
+
+def test_plan_cache_reuses_plans_of_equal_configurations():
+    cache = ParsePlanCache(max_entries=2)
+    rule = lambda pattern: ParseRule("value", ParseMode.REGEX, pattern, "")
+    first = cache.get_or_compile(ParseConfiguration([rule(r"\d+")]))
+    # A different but equal configuration object hits the same plan.
+    assert cache.get_or_compile(ParseConfiguration([rule(r"\d+")])) is first
+    assert configuration_key(ParseConfiguration([rule(r"\d+")])) != configuration_key(ParseConfiguration([rule(r"\w+")]))
+    cache.get_or_compile(ParseConfiguration([rule(r"\w+")]))
+    cache.get_or_compile(ParseConfiguration([rule(r"\s+")]))
+    assert cache.stats()["entries"] == 2
+    assert cache.get_or_compile(ParseConfiguration([rule(r"\d+")])) is not first
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 4)
+
+def test_invalid_regex_is_not_cached():
+    cache = ParsePlanCache()
+    with pytest.raises(re.error):
+        cache.get_or_compile(ParseConfiguration([ParseRule("value", ParseMode.REGEX, "(", "")]))
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,46 @@
+# tests/test_regex_guard.py
+import time
+import pytest
+from app.domain.entities import ParseConfiguration, ParseRule, ParseMode, ParseFallbackStrategy
+from app.domain.services.parse_plan import ParsePlanCache
+from app.domain.services.parse_service import ParseService
+from app.domain.services.regex_guard import GuardedRegex, RegexTimeout
+
+# Catastrophic backtracking: exponential in the number of 'a's on both 're' and 'regex'.
+CATASTROPHIC = r"(a|aa)+$"
+SLOW_TEXT = "a" * 40 + "b"
+
+def test_same_matches_on_every_engine():
+    regex = GuardedRegex(r"(\w+)=(\d+)")
+    text = "a=1 b=x c=22"
+    assert regex.findall(text) == regex.findall(text, timeout=5.0) == [("a", "1"), ("c", "22")]
+
+def test_spent_budget_raises_without_matching():
+    with pytest.raises(RegexTimeout):
+        GuardedRegex("a").findall("a", timeout=0)
+
+def test_catastrophic_pattern_is_aborted():
+    pytest.importorskip("regex")
+    started = time.monotonic()
+    with pytest.raises(RegexTimeout):
+        GuardedRegex(CATASTROPHIC).findall(SLOW_TEXT, timeout=0.05)
+    assert time.monotonic() - started < 5
+
+def test_timed_out_rule_takes_its_fallback():
+    pytest.importorskip("regex")
+    service = ParseService(plan_cache=ParsePlanCache(), rule_timeout_ms=50)
+    rules = [ParseRule("slow", ParseMode.REGEX, CATASTROPHIC, "", fallback_strategy=ParseFallbackStrategy.CUSTOM,
+                       fallback_value="none"),
+             ParseRule("fast", ParseMode.REGEX, "b", "")]
+    stats = {}
+    assert service.parse_text(SLOW_TEXT, ParseConfiguration(rules), stats) == [{"slow": "none", "fast": "b"}]
+    assert stats["timed_out"] == ["slow"]
+    with pytest.raises(ValueError, match="time budget"):
+        service.parse_text(SLOW_TEXT, ParseConfiguration([ParseRule("slow", ParseMode.REGEX, CATASTROPHIC, "")]))
+
+def test_configuration_can_only_lower_the_budget():
+    service = ParseService(plan_cache=ParsePlanCache(), rule_timeout_ms=1000)
+    assert service._effective_timeout(1000, 50) == 50
+    assert service._effective_timeout(1000, 5000) == 1000
+    assert service._effective_timeout(1000, 0) == 1000
+    assert service._effective_timeout(0, 50) == 50
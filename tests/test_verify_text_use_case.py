@@ -0,0 +1,71 @@
+# tests/test_verify_text_use_case.py
+import random
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.domain.entities import (ParsedResult, ParseEntry, VerificationProcess, VerificationMethod, VerificationMethodType,
+                                 VerificationMethodMode, EmbeddingVerificationSettings, ConsensusVerificationSettings)
+from app.domain.services.verifier_service import VerifierService
+from app.domain.services.verification_planner import VerificationPlanner
+from app.application.use_cases.verify_text_use_case import VerifyTextUseCase
+
+def _similarity(reference, response):
+    # Methods whose reference is "pass" pass; the others fail.
+    return 0.9 if reference == "pass" else 0.1
+
+def _method(name, mode, passes):
+    return VerificationMethod(name, VerificationMethodType.EMBEDDING, mode,
+                              EmbeddingVerificationSettings(0.5, 1.0, "pass" if passes else "fail"), None)
+
+def _expected_status(process, truth):
+    # Every method evaluated, in process order.
+    if any(not truth[m.name] for m in process.methods if m.mode == VerificationMethodMode.ELIMINATORIO):
+        return "descartada"
+    passed = sum(truth[m.name] for m in process.methods if m.mode == VerificationMethodMode.ACUMULATIVO)
+    return VerifierService().resolve_final_status(passed, process)
+
+def _random_process(rng):
+    truth = {}
+    methods = []
+    for i in range(rng.randint(1, 6)):
+        mode = rng.choice(list(VerificationMethodMode))
+        truth[f"m{i}"] = rng.random() < 0.6
+        methods.append(_method(f"m{i}", mode, truth[f"m{i}"]))
+    acumulativos = sum(m.mode == VerificationMethodMode.ACUMULATIVO for m in methods)
+    confirmed = rng.randint(1, acumulativos) if acumulativos else 0
+    return VerificationProcess(methods, confirmed, rng.randint(0, confirmed - 1) if confirmed else -1), truth
+
+@pytest.mark.parametrize("workers", [0, 3])
+def test_early_stop_gives_the_status_of_running_every_method(workers):
+    rng = random.Random(0)
+    executor = ThreadPoolExecutor(workers) if workers else None
+    use_case = VerifyTextUseCase(VerifierService(), _similarity, None, executor=executor)
+    try:
+        for _ in range(300):
+            process, truth = _random_process(rng)
+            result = use_case.execute(ParsedResult([ParseEntry({"text": "response"})]), process)
+            assert result.final_status == _expected_status(process, truth)
+            reported = result.verification_methods_passed + result.verification_methods_failed + result.verification_methods_skipped
+            assert sorted(reported) == sorted(truth)
+            assert all(truth[name] for name in result.verification_methods_passed)
+            assert not any(truth[name] for name in result.verification_methods_failed)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+def test_skipped_methods_are_reported():
+    # The first (cheapest) eliminatorio fails: nothing else runs.
+    process = VerificationProcess([_method("a", VerificationMethodMode.ACUMULATIVO, True),
+                                   _method("b", VerificationMethodMode.ELIMINATORIO, False),
+                                   _method("c", VerificationMethodMode.ACUMULATIVO, True)], 2, 1)
+    result = VerifyTextUseCase(VerifierService(), _similarity, None).execute(
+        ParsedResult([ParseEntry({"text": "response"})]), process)
+    assert result.final_status == "descartada"
+    assert (result.verification_methods_failed, result.verification_methods_skipped) == (["b"], ["a", "c"])
+
+def test_planner_runs_cheap_methods_first():
+    consensus = VerificationMethod("consensus", VerificationMethodType.CONSENSUS, VerificationMethodMode.ELIMINATORIO, None,
+                                   ConsensusVerificationSettings("s", "u", [], ["yes"], 5, 3, 10))
+    embedding = _method("embedding", VerificationMethodMode.ELIMINATORIO, True)
+    eliminatorios, acumulativos = VerificationPlanner().plan(VerificationProcess([consensus, embedding], 0, -1))
+    assert [m.name for m in eliminatorios] == ["embedding", "consensus"]
+    assert acumulativos == []